@@ -1,19 +1,35 @@
 from flask import Flask
-from extensions import csrf, limiter, login_manager
+from extensions import csrf, limiter, login_manager, contact_buffer, replica_router, skill_autocomplete, view_counter, link_clicks, request_metrics, query_inspector, request_profiler
 from models import db, User
 from config import Config
+from utils.database import engine_options, replica_binds, init_engine_events
+from utils.fulltext import init_message_search, init_people_search
+from migrations import init_schema
+from utils.profile_snapshot import init_profile_snapshots
+from utils.directory import init_directory
 import os
 
 def create_app():
     """Application factory pattern"""
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}), **replica_binds(app.config)}
     
     # Initialize extensions
     db.init_app(app)
+    init_engine_events(app, db)
+    request_metrics.init_app(app)  # First, so its before_request hook starts the clock
+    query_inspector.init_app(app)
+    request_profiler.init_app(app)
     csrf.init_app(app)
     limiter.init_app(app)
     login_manager.init_app(app)
+    contact_buffer.init_app(app)
+    replica_router.init_app(app)
+    skill_autocomplete.init_app(app)
+    view_counter.init_app(app)
+    link_clicks.init_app(app)
     
     @login_manager.user_loader
     def load_user(user_id):
@@ -49,9 +65,13 @@ def create_app():
     app.register_blueprint(profile_bp)
     app.register_blueprint(api_bp)
     
-    # Create database tables
+    # Create or migrate database tables
     with app.app_context():
-        db.create_all()
+        init_schema(app, db)
+        init_message_search(app)
+        init_people_search(app)
+    init_profile_snapshots(app)
+    init_directory(app)
     
     return app
 
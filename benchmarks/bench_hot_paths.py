@@ -0,0 +1,264 @@
+"""
+Hot path benchmark suite
+
+Times the request paths users hit most: public profiles (individual and
+business, small and large), username checks, the state/district lookups,
+login (bcrypt), file uploads and QR generation, against an app from
+create_app() on a temporary SQLite file. Uploads and QR codes are
+written to a temporary directory.
+
+Each run is compared with the latest run saved in --results-dir (or
+--baseline). The exit status is 1 if any case's median got slower by
+more than --threshold (and by more than --min-delta-ms, so
+sub-millisecond noise does not fail the run). Runs are saved there as
+JSON, except runs that regressed, which would otherwise become the
+baseline and let the slowdown pass next time: pass --accept to save one
+anyway once the slowdown is intended. Runs limited with --cases are not
+saved either, as they would leave the other cases without a baseline.
+
+    python benchmarks/bench_hot_paths.py
+    python benchmarks/bench_hot_paths.py --cases view_profile --samples 500
+    python benchmarks/bench_hot_paths.py --accept
+    python benchmarks/bench_hot_paths.py --baseline benchmarks/results/hot_paths-20260101T000000.json --threshold 0.1
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# One pixel PNG, enough for the upload path (it stores bytes, it does not decode them)
+PNG = bytes.fromhex('89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+                    '1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082')
+
+PASSWORD = 'bench-password'
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--samples', type=int, default=200, help='Timed calls per case (login uses at most 10)')
+    parser.add_argument('--warmup', type=int, default=20, help='Untimed calls per case first')
+    parser.add_argument('--cases', help='Only run cases whose name contains this text')
+    parser.add_argument('--results-dir', default=DEFAULT_RESULTS_DIR, help='Where run results are saved')
+    parser.add_argument('--baseline', help='Results file to compare with (default: latest in --results-dir)')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed median slowdown (default 0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05, help='Ignore slowdowns smaller than this')
+    parser.add_argument('--no-save', action='store_true', help='Compare but do not save this run')
+    parser.add_argument('--accept', action='store_true', help='Save this run even if it regressed (new baseline)')
+    return parser.parse_args()
+
+def build_app(database_url, files_dir):
+    # Config reads the environment at import time
+    os.environ['DATABASE_URL'] = database_url
+    for flag in ('CONTACT_INGEST_ENABLED', 'VIEW_COUNTER_ENABLED', 'LINK_CLICKS_ENABLED', 'METRICS_ENABLED'):
+        os.environ[flag] = 'False'
+    from config import Config
+    Config.UPLOAD_FOLDER = os.path.join(files_dir, 'uploads')
+    Config.QR_CODE_FOLDER = os.path.join(files_dir, 'qr_codes')
+    os.makedirs(Config.QR_CODE_FOLDER, exist_ok=True)
+
+    from app import create_app
+    from extensions import limiter
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    limiter.enabled = False  # Every request comes from the same address
+    return app
+
+def seed_individual(db, username, size):
+    from models import (User, Skill, SocialLink, Project, ProjectImage, ProjectLink, Experience, ExperienceLink,
+                        Education, GalleryImage, Other, OtherLink)
+    from utils.technologies import set_project_technologies
+
+    user = User(email=f'{username}@example.com', username=username, role='individual', full_name=username.title(),
+                tagline='Full-stack engineer', bio='Builds web apps and data pipelines. ' * 5)
+    user.set_password(PASSWORD)
+    db.session.add(user)
+    db.session.flush()
+    n = {'small': 1, 'large': 25}[size]
+    for i in range(n * 2):
+        db.session.add(Skill(user_id=user.id, name=f'Skill {i}', category=f'Category {i % 4}', order=i))
+    for i in range(min(n, 6)):
+        db.session.add(SocialLink(user_id=user.id, platform='github', url=f'https://github.com/{username}{i}', order=i))
+    for i in range(n):
+        project = Project(user_id=user.id, title=f'Project {i}', description='A project. ' * 20, order=i,
+                          youtube_url='https://youtu.be/dQw4w9WgXcQ' if i % 3 == 0 else None)
+        db.session.add(project)
+        db.session.flush()
+        set_project_technologies(project, 'Python, Flask, PostgreSQL')
+        db.session.add_all([ProjectImage(project_id=project.id, image_path=f'projects/{i}-{j}.png', order=j)
+                            for j in range(2)])
+        db.session.add(ProjectLink(project_id=project.id, label='Demo', url=f'https://example.com/{i}'))
+        experience = Experience(user_id=user.id, company_name=f'Company {i}', position='Engineer',
+                                description='Worked on things. ' * 10, order=i)
+        db.session.add(experience)
+        db.session.flush()
+        db.session.add(ExperienceLink(experience_id=experience.id, label='Case study', url=f'https://example.com/e{i}'))
+        db.session.add(Education(user_id=user.id, institute_name=f'Institute {i}', course='B.Tech', order=i))
+        db.session.add(GalleryImage(user_id=user.id, image_path=f'gallery/{i}.png', order=i))
+        other = Other(user_id=user.id, title=f'Award {i}', description='Recognition.', order=i)
+        db.session.add(other)
+        db.session.flush()
+        db.session.add(OtherLink(other_id=other.id, label='Link', url=f'https://example.com/o{i}'))
+    db.session.commit()
+
+def seed_business(db, username, size):
+    from models import User, SocialLink, Service, ServiceImage, PreviousWork, PreviousWorkImage, GalleryImage
+
+    user = User(email=f'{username}@example.com', username=username, role='business', full_name=username.title(),
+                business_category='Consulting', country='India', state='Kerala', district='Ernakulam',
+                bio='We help small businesses grow. ' * 5)
+    user.set_password(PASSWORD)
+    db.session.add(user)
+    db.session.flush()
+    n = {'small': 1, 'large': 25}[size]
+    for i in range(min(n, 6)):
+        db.session.add(SocialLink(user_id=user.id, platform='instagram', url=f'https://instagram.com/{username}{i}',
+                                  order=i))
+    for i in range(n):
+        service = Service(user_id=user.id, title=f'Service {i}', description='What we do. ' * 15, order=i)
+        work = PreviousWork(user_id=user.id, title=f'Work {i}', description='Delivered. ' * 10, order=i)
+        db.session.add_all([service, work])
+        db.session.flush()
+        db.session.add(ServiceImage(service_id=service.id, image_path=f'services/{i}.png'))
+        db.session.add(PreviousWorkImage(previous_work_id=work.id, image_path=f'previous_work/{i}.png'))
+        db.session.add(GalleryImage(user_id=user.id, image_path=f'gallery/b{i}.png', order=i))
+    db.session.commit()
+
+def build_cases(app, client):
+    """[(name, callable, samples cap)]; each callable performs one operation"""
+    from werkzeug.datastructures import FileStorage
+    from utils.file_handler import handle_file_upload
+    from utils.qr_generator import generate_qr_code
+
+    def get(path, status=200):
+        def call():
+            response = client.get(path, headers={'User-Agent': 'Mozilla/5.0 (bench)'})
+            assert response.status_code == status, (path, response.status_code)
+        return call
+
+    def login():
+        response = client.post('/login', data={'email_or_username': 'indie_small', 'password': PASSWORD})
+        assert response.status_code == 302, response.status_code
+
+    def upload():
+        with app.test_request_context():
+            handle_file_upload(FileStorage(io.BytesIO(PNG), 'photo.png'), 'profiles',
+                               app.config['MAX_IMAGE_SIZE'])
+
+    return [
+        ('view_profile/individual-small', get('/indie_small'), None),
+        ('view_profile/individual-large', get('/indie_large'), None),
+        ('view_profile/business-small', get('/biz_small'), None),
+        ('view_profile/business-large', get('/biz_large'), None),
+        ('check_username/taken', get('/api/check-username?username=indie_large'), None),
+        ('check_username/free', get('/api/check-username?username=nobody_here'), None),
+        ('get_states', get('/api/states'), None),
+        ('get_districts', get('/api/districts?state=Kerala'), None),
+        ('login', login, 10),
+        ('handle_file_upload', upload, None),
+        ('generate_qr_code', lambda: generate_qr_code('indie_small'), None),
+    ]
+
+def run_case(call, samples, warmup):
+    for _ in range(warmup):
+        call()
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        'samples': samples,
+        'median_ms': statistics.median(timings),
+        'p95_ms': timings[max(0, int(len(timings) * 0.95) - 1)],
+        'min_ms': timings[0],
+        'mean_ms': statistics.fmean(timings),
+    }
+
+def latest_results(results_dir):
+    paths = sorted(glob.glob(os.path.join(results_dir, 'hot_paths-*.json')))
+    return paths[-1] if paths else None
+
+def compare(current, baseline, threshold, min_delta_ms):
+    """Print a comparison table; returns the names of regressed cases"""
+    regressed = []
+    print(f"\n{'case':<32}{'before':>10}{'now':>10}{'change':>10}")
+    for name, result in current['cases'].items():
+        before = baseline['cases'].get(name)
+        if before is None:
+            print(f"{name:<32}{'-':>10}{result['median_ms']:>10.3f}{'new':>10}")
+            continue
+        old, new = before['median_ms'], result['median_ms']
+        change = (new - old) / old if old else 0.0
+        flag = ''
+        if change > threshold and new - old > min_delta_ms:
+            regressed.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<32}{old:>10.3f}{new:>10.3f}{change:>+10.1%}{flag}")
+    return regressed
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix='pehchaan-bench-')
+    app = build_app(f"sqlite:///{os.path.join(workdir, 'bench.db')}", workdir)
+    from models import db
+
+    with app.app_context():
+        seed_individual(db, 'indie_small', 'small')
+        seed_individual(db, 'indie_large', 'large')
+        seed_business(db, 'biz_small', 'small')
+        seed_business(db, 'biz_large', 'large')
+
+    client = app.test_client()
+    results = {
+        'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        'cases': {}
+    }
+    print(f"{'case':<32}{'median ms':>12}{'p95 ms':>10}{'min ms':>10}")
+    for name, call, cap in build_cases(app, client):
+        if args.cases and args.cases not in name:
+            continue
+        samples = min(args.samples, cap) if cap else args.samples
+        result = run_case(call, samples, min(args.warmup, samples))
+        results['cases'][name] = result
+        print(f"{name:<32}{result['median_ms']:>12.3f}{result['p95_ms']:>10.3f}{result['min_ms']:>10.3f}")
+
+    baseline_path = args.baseline or latest_results(args.results_dir)
+    regressed = []
+    if baseline_path:
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {baseline_path} ({baseline.get('created_at')})")
+        regressed = compare(results, baseline, args.threshold, args.min_delta_ms)
+
+    if args.no_save:
+        pass
+    elif args.cases:
+        print(f"\nNot saved: only cases matching {args.cases!r} were run")
+    elif regressed and not args.accept:
+        print("\nNot saved, so the baseline stays as it was (--accept saves a regressed run)")
+    else:
+        os.makedirs(args.results_dir, exist_ok=True)
+        path = os.path.join(args.results_dir, f"hot_paths-{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved {path}")
+
+    if regressed:
+        print(f"\n{len(regressed)} case(s) slower than the {args.threshold:.0%} threshold: {', '.join(regressed)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+Child-table index benchmark
+
+Seeds a throwaway database with N users and their child rows, then times
+the queries behind a public profile render and the message inbox twice:
+first with only the pre-existing indexes, then with the composite indexes
+declared in models.py. Query plans are printed for both runs.
+
+    python benchmarks/bench_indexes.py --users 100000
+    python benchmarks/bench_indexes.py --database-url postgresql://localhost/pehchaan_bench
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+CHUNK = 10000
+
+PLAN_QUERIES = [
+    ('skills by user', 'SELECT * FROM skills WHERE user_id = :id ORDER BY "order"'),
+    ('projects by user', 'SELECT * FROM projects WHERE user_id = :id ORDER BY "order"'),
+    ('project images', 'SELECT * FROM project_images WHERE project_id = :id ORDER BY "order"'),
+    ('experience links', 'SELECT * FROM experience_links WHERE experience_id = :id ORDER BY "order"'),
+    ('services by user', 'SELECT * FROM services WHERE user_id = :id ORDER BY "order"'),
+    ('unread count', 'SELECT count(*) FROM messages WHERE recipient_id = :id AND is_read = false'),
+    ('inbox page', 'SELECT * FROM messages WHERE recipient_id = :id ORDER BY created_at DESC, id DESC LIMIT 50'),
+]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=100000, help='Users to seed (default 100000)')
+    parser.add_argument('--samples', type=int, default=200, help='Profiles/inboxes timed per run')
+    parser.add_argument('--database-url', help='Empty database to use (default: temporary SQLite file)')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+def build_app(database_url):
+    # Config reads the environment at import time
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['CONTACT_INGEST_ENABLED'] = 'False'
+    from app import create_app
+    return create_app()
+
+def insert_rows(db, table, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(table.insert(), rows[start:start + CHUNK])
+    db.session.commit()
+
+def seed(db, users, rng):
+    """Bulk-insert users with a realistic spread of child rows; returns (individual ids, business ids)"""
+    from models import (
+        User, Skill, SocialLink, Project, ProjectImage, ProjectLink, Experience, ExperienceLink,
+        Education, GalleryImage, Other, OtherLink, Service, ServiceImage, PreviousWork,
+        PreviousWorkImage, PreviousWorkLink, Message
+    )
+
+    now = datetime.utcnow()
+    tables = {model: [] for model in (
+        User, Skill, SocialLink, Project, ProjectImage, ProjectLink, Experience, ExperienceLink,
+        Education, GalleryImage, Other, OtherLink, Service, ServiceImage, PreviousWork,
+        PreviousWorkImage, PreviousWorkLink, Message
+    )}
+    ids = {model: 0 for model in tables}
+
+    def add(model, **values):
+        ids[model] += 1
+        values['id'] = ids[model]
+        tables[model].append(values)
+        return ids[model]
+
+    individuals, businesses = [], []
+    for n in range(1, users + 1):
+        role = 'business' if rng.random() < 0.15 else 'individual'
+        user_id = add(User, email=f'user{n}@example.com', username=f'user{n}', password_hash='x',
+                      role=role, created_at=now, updated_at=now, unread_message_count=0)
+
+        if role == 'individual':
+            individuals.append(user_id)
+            for order in range(rng.randint(2, 8)):
+                add(Skill, user_id=user_id, name=f'skill{rng.randint(1, 500)}', order=order)
+            for order in range(rng.randint(0, 3)):
+                add(SocialLink, user_id=user_id, platform='github', url='https://github.com/x', order=order)
+            for order in range(rng.randint(0, 4)):
+                project_id = add(Project, user_id=user_id, title='Project', description='About', order=order)
+                add(ProjectImage, project_id=project_id, image_path='projects/x.png', order=0)
+                add(ProjectLink, project_id=project_id, label='Docs', url='https://example.com', order=0)
+            for order in range(rng.randint(0, 3)):
+                exp_id = add(Experience, user_id=user_id, company_name='Acme', position='Engineer',
+                             description='Work', order=order)
+                add(ExperienceLink, experience_id=exp_id, label='Proof', url='https://example.com', order=0)
+            for order in range(rng.randint(0, 2)):
+                add(Education, user_id=user_id, institute_name='Institute', course='BTech', order=order)
+            for order in range(rng.randint(0, 1)):
+                other_id = add(Other, user_id=user_id, title='Award', order=order)
+                add(OtherLink, other_id=other_id, label='Certificate', url='https://example.com', order=0)
+        else:
+            businesses.append(user_id)
+            for order in range(rng.randint(1, 5)):
+                service_id = add(Service, user_id=user_id, title='Service', description='About', order=order)
+                add(ServiceImage, service_id=service_id, image_path='services/x.png', order=0)
+            for order in range(rng.randint(0, 3)):
+                work_id = add(PreviousWork, user_id=user_id, title='Work', order=order)
+                add(PreviousWorkImage, previous_work_id=work_id, image_path='previous_work/x.png', order=0)
+                add(PreviousWorkLink, previous_work_id=work_id, label='Site', url='https://example.com', order=0)
+
+        for order in range(rng.randint(0, 3)):
+            add(GalleryImage, user_id=user_id, image_path='gallery/x.png', order=order)
+
+    # Messages are heavily skewed towards a few popular businesses
+    popular = businesses[:max(1, len(businesses) // 200)]
+    for i in range(users):
+        recipient = rng.choice(popular) if rng.random() < 0.6 else rng.choice(businesses or individuals)
+        add(Message, recipient_id=recipient, name='Visitor', email=f'v{i}@example.com', subject='Enquiry',
+            message='Hello', is_read=rng.random() < 0.7, created_at=now - timedelta(minutes=i))
+
+    for model, rows in tables.items():
+        insert_rows(db, model.__table__, rows)
+
+    return individuals, businesses, popular
+
+def load_profile(db, user_id):
+    """Touch every relationship a public profile template reads"""
+    from models import User
+    user = db.session.get(User, user_id)
+    collections = [user.skills, user.social_links, user.education, user.gallery_images]
+    for project in user.projects:
+        collections += [project.images, project.links]
+    for exp in user.experiences:
+        collections += [exp.images, exp.links]
+    for item in user.others:
+        collections += [item.images, item.links]
+    for service in user.services:
+        collections.append(service.images)
+    for work in user.previous_works:
+        collections += [work.images, work.links]
+    return sum(len(c) for c in collections)
+
+def time_calls(func, args_list):
+    timings = []
+    for args in args_list:
+        started = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        'p50': statistics.median(timings),
+        'p95': timings[int(len(timings) * 0.95) - 1],
+        'mean': statistics.fmean(timings)
+    }
+
+def explain(db, sql, params):
+    from sqlalchemy import text
+    if db.engine.dialect.name == 'sqlite':
+        rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}'), params).all()
+        return [row[-1] for row in rows]
+    rows = db.session.execute(text(f'EXPLAIN ANALYZE {sql}'), params).all()
+    return [row[0] for row in rows]
+
+def run_phase(db, label, individuals, businesses, popular, samples, rng):
+    from sqlalchemy import text
+    from utils.inbox import paginate_inbox
+    from models import Message
+
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+    profile_ids = [(db, uid) for uid in rng.sample(individuals + businesses, min(samples, len(individuals) + len(businesses)))]
+    inbox_ids = [(rid,) for rid in (popular * (samples // len(popular) + 1))[:samples]]
+
+    def unread(rid):
+        return Message.query.filter_by(recipient_id=rid, is_read=False).count()
+
+    def inbox(rid):
+        return paginate_inbox(rid)
+
+    results = {}
+    for name, func, args in (('profile load', load_profile, profile_ids),
+                             ('unread count', unread, inbox_ids),
+                             ('inbox page', inbox, inbox_ids)):
+        results[name] = time_calls(lambda *a: (func(*a), db.session.expunge_all()), args)
+
+    plan_params = {
+        'skills by user': individuals[0], 'projects by user': individuals[0], 'project images': 1,
+        'experience links': 1, 'services by user': businesses[0] if businesses else 1,
+        'unread count': popular[0], 'inbox page': popular[0]
+    }
+    plans = {name: explain(db, sql, {'id': plan_params[name]}) for name, sql in PLAN_QUERIES}
+
+    print(f"\n=== {label} ===")
+    for name, stats in results.items():
+        print(f"{name:<14} p50 {stats['p50']:8.2f} ms   p95 {stats['p95']:8.2f} ms   mean {stats['mean']:8.2f} ms")
+    print("\nQuery plans:")
+    for name, lines in plans.items():
+        print(f"  {name}:")
+        for line in lines:
+            print(f"    {line}")
+    return results
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+
+    tmpdir = None
+    database_url = args.database_url
+    if not database_url:
+        tmpdir = tempfile.mkdtemp(prefix='pehchaan-bench-')
+        database_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+
+    app = build_app(database_url)
+    from models import db
+
+    with app.app_context():
+        declared = [index for table in db.metadata.sorted_tables
+                    for index in table.indexes if table.name != 'users']
+
+        print(f"Seeding {args.users} users into {db.engine.url.render_as_string(hide_password=True)}...")
+        started = time.perf_counter()
+        for index in declared:
+            index.drop(bind=db.engine, checkfirst=True)
+        individuals, businesses, popular = seed(db, args.users, rng)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+        before = run_phase(db, 'Before: primary keys only', individuals, businesses, popular, args.samples, rng)
+
+        started = time.perf_counter()
+        for index in declared:
+            index.create(bind=db.engine, checkfirst=True)
+        print(f"\nBuilt {len(declared)} indexes in {time.perf_counter() - started:.1f}s")
+
+        after = run_phase(db, 'After: declared indexes', individuals, businesses, popular, args.samples, rng)
+
+        print("\n=== Speedup (p50) ===")
+        for name in before:
+            print(f"{name:<14} {before[name]['p50'] / max(after[name]['p50'], 1e-6):8.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Outbound link redirect benchmark
+
+Seeds a throwaway database with N users' social links and times
+/go/<token> requests through the WSGI stack. Tokens are signed in the
+parent process, as a profile render would, and clicked in --workers
+forked processes that never rendered them (with several app workers,
+clicks rarely land on the worker that rendered the page). Tokens past
+LINK_REDIRECT_CACHE_SECONDS are timed on a database lookup and on the
+cached lookup that follows, and a request that does no work gives the
+framework baseline. SQL statements are counted for every phase.
+
+    python benchmarks/bench_link_redirect.py --users 50000 --workers 4
+    python benchmarks/bench_link_redirect.py --database-url postgresql://localhost/pehchaan_bench
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from unittest import mock
+
+from itsdangerous import TimestampSigner
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+CHUNK = 10000
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=50000, help='Users to seed, one social link each (default 50000)')
+    parser.add_argument('--samples', type=int, default=5000, help='Requests timed per phase')
+    parser.add_argument('--workers', type=int, default=4, help='Forked worker processes clicking fresh tokens')
+    parser.add_argument('--database-url', help='Empty database to use (default: temporary SQLite file)')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+def build_app(database_url):
+    # Config reads the environment at import time
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['CONTACT_INGEST_ENABLED'] = 'False'
+    os.environ['LINK_CLICKS_ENABLED'] = 'False'
+    from app import create_app
+    from extensions import limiter
+    app = create_app()
+    limiter.enabled = False  # Every request comes from the same address
+    return app
+
+def seed(db, users):
+    from models import User, SocialLink
+
+    now = datetime.utcnow()
+    for start in range(1, users + 1, CHUNK):
+        ids = range(start, min(start + CHUNK, users + 1))
+        db.session.execute(User.__table__.insert(), [
+            {'id': n, 'email': f'user{n}@example.com', 'username': f'user{n}', 'password_hash': 'x',
+             'role': 'individual', 'created_at': now, 'updated_at': now, 'unread_message_count': 0}
+            for n in ids
+        ])
+        db.session.execute(SocialLink.__table__.insert(), [
+            {'id': n, 'user_id': n, 'platform': 'github', 'url': f'https://github.com/user{n}', 'order': 0,
+             'created_at': now}
+            for n in ids
+        ])
+        db.session.commit()
+
+# Set in main() before the workers fork, so they inherit them
+APP = None
+STATEMENTS = [0]
+
+def count_statement(*args):
+    STATEMENTS[0] += 1
+
+def time_requests(paths):
+    client = APP.test_client()
+    headers = {'User-Agent': 'Mozilla/5.0 (bench)'}
+    timings, before = [], STATEMENTS[0]
+    for path in paths:
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code in (302, 404), response.status_code
+    return timings, STATEMENTS[0] - before
+
+def report(label, timings, statements):
+    timings = sorted(timings)
+    print(f"{label:<34}p50 {statistics.median(timings):.3f} ms   p95 {timings[int(len(timings) * 0.95) - 1]:.3f} ms"
+          f"   {statements} SQL statements")
+    return statistics.median(timings)
+
+def start_worker():
+    from models import db
+
+    with APP.app_context():
+        db.engine.dispose(close=False)  # Connections belong to the parent
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+
+    database_url = args.database_url
+    if not database_url:
+        tmpdir = tempfile.mkdtemp(prefix='pehchaan-bench-')
+        database_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+
+    global APP
+    APP = app = build_app(database_url)
+    from sqlalchemy import event
+    from models import db
+    from extensions import link_clicks
+
+    with app.app_context():
+        print(f"Seeding {args.users} links into {db.engine.url.render_as_string(hide_password=True)}...")
+        seed(db, args.users)
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+
+    ids = [rng.randint(1, args.users) for _ in range(args.samples)]
+
+    def sign_all(age=0):
+        with mock.patch.object(TimestampSigner, 'get_timestamp', lambda signer: int(time.time()) - age):
+            return [f"/go/{link_clicks.sign('social', n, f'https://github.com/user{n}', n)}" for n in ids]
+
+    def in_workers(paths):
+        chunks = [paths[n::args.workers] for n in range(args.workers)]
+        with multiprocessing.get_context('fork').Pool(args.workers, initializer=start_worker) as pool:
+            results = pool.map(time_requests, chunks)
+        return [t for timings, _ in results for t in timings], sum(statements for _, statements in results)
+
+    fresh = report(f'Fresh token, {args.workers} other workers', *in_workers(sign_all()))
+    baseline = report(f'Baseline (static 404), {args.workers} workers',
+                      *in_workers(['/static/bench-missing'] * args.samples))
+    old = sign_all(age=link_clicks.cache_seconds + 60)  # A copied link or a page left open
+    report('Old token, lookup', *time_requests(old))
+    report('Old token, cached lookup', *time_requests(old))
+    print(f"\nAdded by the redirect on a worker that never rendered the link: {fresh - baseline:+.3f} ms at p50 "
+          f"({os.cpu_count()} CPU, {link_clicks.pending()} clicks buffered in the parent, none written)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,568 @@
+"""
+End-to-end load test
+
+Seeds a throwaway database with synthetic profiles (utils/seeding.py),
+starts the app under gunicorn with the Procfile's web command and drives
+it with concurrent virtual users over keep-alive HTTP connections. Each
+user loops through a weighted mix of what the site actually serves:
+profile views (mostly QR scans), username checks paced like typing,
+logins, profile edits, gallery uploads and contact form posts. CSRF
+tokens are read from the pages, as a browser would.
+
+Per endpoint it reports throughput and p50/p95/p99 latency. Each run is
+compared with the latest run saved in --results-dir with the same
+settings (or --baseline); the exit status is 1 if an endpoint's p95 got
+slower by more than --threshold, overall throughput dropped by more than
+it, or more than --max-error-rate of the requests failed. Runs are saved
+there as JSON unless they failed, so a regression keeps failing instead
+of becoming the next baseline; --accept saves one anyway. Everything
+runs against 127.0.0.1; static assets are not fetched.
+
+    python benchmarks/bench_load.py
+    python benchmarks/bench_load.py --users 20000 --concurrency 50 --duration 60 --workers 4
+    python benchmarks/bench_load.py --mix profile_qr=1,username_check=1
+    python benchmarks/bench_load.py --accept
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import platform
+import random
+import re
+import shlex
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urlencode
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Scenario weights; QR scans dominate profile traffic
+DEFAULT_MIX = {
+    'profile_qr': 40,
+    'profile_referred': 15,
+    'username_check': 12,
+    'contact': 8,
+    'login': 6,
+    'dashboard_edit': 12,
+    'gallery_upload': 7,
+}
+
+REFERRERS = ['https://www.google.com/', 'https://www.linkedin.com/feed/', 'https://t.co/x', 'https://wa.me/']
+
+PASSWORD = 'load-password'
+
+# One pixel PNG; uploads store bytes, they do not decode them
+PNG = bytes.fromhex('89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+                    '1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082')
+
+# The meta tag from base.html, or a form's hidden field on pages with their own layout
+CSRF_PATTERN = re.compile(rb'name="csrf[-_]token" (?:content|value)="([^"]+)"')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=2000, help='Synthetic profiles to seed (default 2000)')
+    parser.add_argument('--accounts', type=int, default=50, help='Seeded individuals that log in and edit')
+    parser.add_argument('--concurrency', type=int, default=20, help='Virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run, after the warmup')
+    parser.add_argument('--warmup', type=float, default=5, help='Seconds whose requests are not counted')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--mix', help='Scenario weights as name=weight,... (default: the built-in mix)')
+    parser.add_argument('--database-url', help='Database to seed and serve (default: temporary SQLite file)')
+    parser.add_argument('--port', type=int, help='Port to bind (default: a free one)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--results-dir', default=DEFAULT_RESULTS_DIR, help='Where run results are saved')
+    parser.add_argument('--baseline', help='Results file to compare with (default: latest in --results-dir)')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed p95 slowdown (default 0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='Ignore slowdowns smaller than this')
+    parser.add_argument('--max-error-rate', type=float, default=0.01, help='Allowed share of failed requests')
+    parser.add_argument('--no-save', action='store_true', help='Compare but do not save this run')
+    parser.add_argument('--accept', action='store_true', help='Save this run even if it failed (new baseline)')
+    return parser.parse_args()
+
+def parse_mix(raw):
+    if not raw:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in raw.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown scenario {name.strip()!r}; choose from {', '.join(DEFAULT_MIX)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+# Server
+
+def build_app(database_url):
+    # Config reads the environment at import time; the server gets its own copy (see start_server)
+    os.environ['DATABASE_URL'] = database_url
+    for flag in ('CONTACT_INGEST_ENABLED', 'VIEW_COUNTER_ENABLED', 'LINK_CLICKS_ENABLED', 'METRICS_ENABLED'):
+        os.environ[flag] = 'False'
+    from app import create_app
+    return create_app()
+
+def seed(app, users, accounts, seed_value):
+    """Seed profiles; returns (profile usernames, login accounts, last gallery image id)"""
+    from models import db, User, GalleryImage
+    from utils.seeding import seed_dataset
+
+    with app.app_context():
+        seed_dataset(users, seed=seed_value, log=lambda line: None)
+        usernames = db.session.execute(
+            db.select(User.username).where(User.deleted_at.is_(None)).order_by(User.id)
+        ).scalars().all()
+        # Real bcrypt cost for the accounts that log in (seeded hashes use the cheapest rounds)
+        chosen = User.query.filter_by(role='individual', deleted_at=None).order_by(User.id).limit(accounts).all()
+        for user in chosen:
+            user.set_password(PASSWORD)
+        db.session.commit()
+        logins = [user.username for user in chosen]
+        last_image = db.session.execute(db.select(db.func.max(GalleryImage.id))).scalar() or 0
+    return usernames, logins, last_image
+
+def procfile_command():
+    with open(os.path.join(ROOT, 'Procfile'), encoding='utf-8') as f:
+        for line in f:
+            name, _, command = line.partition(':')
+            if name.strip() == 'web':
+                args = shlex.split(command)
+                if args[0] == 'gunicorn':
+                    args[:1] = [sys.executable, '-m', 'gunicorn']  # Same interpreter as this script
+                return args
+    raise SystemExit('Procfile has no web command')
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(base_env, database_url, port, workers, workdir):
+    env = dict(base_env)
+    env.update({
+        'DATABASE_URL': database_url,
+        'RATELIMIT_ENABLED': 'False',  # Every virtual user shares one address
+        'SECRET_KEY': env.get('SECRET_KEY') or 'load-test-secret',
+        'CONTACT_INGEST_DIR': os.path.join(workdir, 'contact_ingest'),
+        'METRICS_DIR': os.path.join(workdir, 'metrics'),
+        'PROFILING_DIR': os.path.join(workdir, 'profiles'),
+    })
+    command = procfile_command() + ['--bind', f'127.0.0.1:{port}', '--workers', str(workers)]
+    log = open(os.path.join(workdir, 'gunicorn.log'), 'wb')
+    print(' '.join(command))
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    process.log_path = log.name
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1) as sock:
+                sock.sendall(b'GET /api/states HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n')
+                if sock.recv(64).startswith(b'HTTP/1.1 200'):
+                    return process
+        except OSError:
+            pass
+        time.sleep(0.25)
+    stop_server(process)
+    with open(process.log_path, encoding='utf-8', errors='replace') as f:
+        print(f.read()[-3000:])
+    raise SystemExit('gunicorn did not start')
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def cleanup_uploads(app, last_image):
+    """Delete the gallery files uploaded during the run (they land in the real upload folder)"""
+    from config import Config
+    from models import db, GalleryImage
+
+    with app.app_context():
+        paths = db.session.execute(
+            db.select(GalleryImage.image_path).where(GalleryImage.id > last_image)
+        ).scalars().all()
+    for path in paths:
+        try:
+            os.remove(os.path.join(Config.UPLOAD_FOLDER, path))
+        except OSError:
+            pass
+    return len(paths)
+
+# Client
+
+class HttpClient:
+    """Minimal HTTP/1.1 client on asyncio streams: one keep-alive connection and a cookie jar"""
+
+    def __init__(self, port):
+        self.port = port
+        self.cookies = {}
+        self._reader = self._writer = None
+
+    async def request(self, method, path, body=b'', headers=None):
+        """Returns (status, lowercased headers, body)"""
+        head = [f'{method} {path} HTTP/1.1', 'Host: localhost', 'User-Agent: Mozilla/5.0 (load test)']
+        if self.cookies:
+            head.append('Cookie: ' + '; '.join(f'{k}={v}' for k, v in self.cookies.items()))
+        for name, value in (headers or {}).items():
+            head.append(f'{name}: {value}')
+        if body or method == 'POST':
+            head.append(f'Content-Length: {len(body)}')
+        payload = ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+        for attempt in (0, 1):
+            reused = self._writer is not None
+            if not reused:
+                self._reader, self._writer = await asyncio.open_connection('127.0.0.1', self.port)
+            try:
+                self._writer.write(payload)
+                await self._writer.drain()
+                return await self._read_response()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.close()
+                if not reused or attempt:
+                    raise  # Only a stale keep-alive connection is retried
+
+    async def _read_response(self):
+        status_line = await self._reader.readuntil(b'\r\n')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = (await self._reader.readuntil(b'\r\n')).decode('latin-1').rstrip('\r\n')
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            name, value = name.strip().lower(), value.strip()
+            if name == 'set-cookie':
+                self._store_cookie(value)
+            headers[name] = value
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self._reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                if not size:
+                    await self._reader.readuntil(b'\r\n')
+                    break
+                chunks.append(await self._reader.readexactly(size + 2))
+            body = b''.join(chunk[:-2] for chunk in chunks)
+        elif 'content-length' in headers:
+            body = await self._reader.readexactly(int(headers['content-length']))
+        else:
+            body = await self._reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, headers, body
+
+    def _store_cookie(self, value):
+        pair = value.split(';', 1)[0]
+        name, _, cookie = pair.partition('=')
+        if cookie and 'max-age=0' not in value.lower():
+            self.cookies[name.strip()] = cookie.strip()
+        else:
+            self.cookies.pop(name.strip(), None)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+def form_body(fields):
+    return urlencode(fields).encode('utf-8'), {'Content-Type': 'application/x-www-form-urlencoded'}
+
+def multipart_body(fields, files):
+    boundary = f'----loadtest{random.getrandbits(64):016x}'
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, filename, content, mimetype in files:
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: {mimetype}\r\n\r\n'.encode() + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+
+# Traffic
+
+class Recorder:
+    def __init__(self, measure_from):
+        self.measure_from = measure_from
+        self.timings = {}
+        self.errors = {}
+
+    def add(self, name, elapsed_ms, error=None):
+        if time.monotonic() < self.measure_from:
+            return
+        self.timings.setdefault(name, []).append(elapsed_ms)
+        if error:
+            self.errors.setdefault(name, Counter())[error] += 1
+
+class VirtualUser:
+    """One browser session looping through the scenario mix"""
+
+    def __init__(self, number, ctx):
+        self.ctx = ctx
+        self.rng = random.Random(f'{ctx.seed}:vu:{number}')
+        self.account = ctx.accounts[number % len(ctx.accounts)]
+        self.client = HttpClient(ctx.port)
+        self.csrf = None
+        self.logged_in = False
+
+    async def call(self, name, method, path, expect, body=b'', headers=None, client=None):
+        client = client or self.client
+        started = time.perf_counter()
+        try:
+            status, response_headers, response = await client.request(method, path, body, headers)
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            self.ctx.recorder.add(name, (time.perf_counter() - started) * 1000, type(e).__name__)
+            return None, b''
+        self.ctx.recorder.add(name, (time.perf_counter() - started) * 1000,
+                              None if status == expect else f'HTTP {status}')
+        match = CSRF_PATTERN.search(response)
+        if match and client is self.client:
+            self.csrf = match.group(1).decode()
+        return status, response
+
+    def profile(self):
+        ctx = self.ctx
+        return self.rng.choices(ctx.usernames, cum_weights=ctx.popularity)[0]
+
+    async def run(self, deadline):
+        names, weights = zip(*self.ctx.mix.items())
+        while time.monotonic() < deadline:
+            await getattr(self, self.rng.choices(names, weights)[0])()
+        self.client.close()
+
+    async def profile_qr(self):
+        await self.call('profile_view', 'GET', f'/{self.profile()}?ref=qr', 200)
+
+    async def profile_referred(self):
+        await self.call('profile_view', 'GET', f'/{self.profile()}', 200,
+                        headers={'Referer': self.rng.choice(REFERRERS)})
+
+    async def username_check(self):
+        # Someone typing a username at signup; the page checks after each keystroke
+        name = f'{self.rng.choice("aeiou")}{self.rng.choice(self.ctx.usernames)[:8]}{self.rng.randint(0, 99)}'
+        for end in range(3, len(name) + 1):
+            await self.call('check_username', 'GET', f'/api/check-username?username={name[:end]}', 200)
+            await asyncio.sleep(self.rng.uniform(0.08, 0.25))
+
+    async def contact(self):
+        username = self.profile()
+        await self.call('profile_view', 'GET', f'/{username}', 200)
+        body, headers = form_body({
+            'csrf_token': self.csrf or '', 'name': 'Load Tester', 'email': f'visitor{self.rng.randrange(10 ** 6)}@example.com',
+            'subject': 'Enquiry', 'message': f'Hello, is this still available? #{self.rng.randrange(10 ** 9)}'
+        })
+        await self.call('contact_post', 'POST', f'/{username}/contact', 302, body, headers)
+
+    async def login(self, client=None):
+        # A separate browser unless logging this session in for dashboard work
+        own = client is None
+        client = client or HttpClient(self.ctx.port)
+        status, page = await self.call('login_page', 'GET', '/login', 200, client=client)
+        match = CSRF_PATTERN.search(page)
+        body, headers = form_body({'csrf_token': match.group(1).decode() if match else '',
+                                   'email_or_username': self.account, 'password': PASSWORD})
+        status, _ = await self.call('login_post', 'POST', '/login', 302, body, headers, client=client)
+        if own:
+            client.close()
+        return status == 302
+
+    async def ensure_login(self):
+        if not self.logged_in:
+            self.logged_in = await self.login(self.client)
+        return self.logged_in
+
+    async def dashboard_edit(self):
+        if not await self.ensure_login():
+            return
+        await self.call('dashboard_profile', 'GET', '/dashboard/profile', 200)
+        skills = self.rng.sample(['Python', 'Flask', 'SQL', 'React', 'Docker', 'Figma', 'Go', 'AWS'], 4)
+        body, headers = form_body({
+            'csrf_token': self.csrf or '', 'full_name': 'Load Tester', 'username': self.account,
+            'tagline': f'Edited at {time.time():.0f}', 'bio': 'Bio written by the load test.',
+            'skills': '|||'.join(json.dumps({'name': name, 'category': 'Load'}) for name in skills),
+            'social_platform_0': 'github', 'social_url_0': f'https://github.com/{self.account}'
+        })
+        await self.call('dashboard_profile_post', 'POST', '/dashboard/profile', 302, body, headers)
+
+    async def gallery_upload(self):
+        if not await self.ensure_login():
+            return
+        await self.call('dashboard_gallery', 'GET', '/dashboard/gallery', 200)
+        body, headers = multipart_body({'csrf_token': self.csrf or ''},
+                                       [('images', 'photo.png', PNG, 'image/png')])
+        await self.call('gallery_upload', 'POST', '/dashboard/gallery/upload', 302, body, headers)
+
+class Context:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+async def drive(ctx, concurrency, warmup, duration):
+    deadline = time.monotonic() + warmup + duration
+    users = [VirtualUser(n, ctx) for n in range(concurrency)]
+    await asyncio.gather(*(user.run(deadline) for user in users))
+
+# Results
+
+def percentile(values, q):
+    return values[max(0, int(len(values) * q + 0.5) - 1)]
+
+def summarize(recorder, duration):
+    endpoints = {}
+    for name, values in sorted(recorder.timings.items()):
+        values.sort()
+        errors = recorder.errors.get(name, Counter())
+        endpoints[name] = {
+            'requests': len(values),
+            'errors': sum(errors.values()),
+            'error_kinds': dict(errors),
+            'rps': len(values) / duration,
+            'p50_ms': percentile(values, 0.50),
+            'p95_ms': percentile(values, 0.95),
+            'p99_ms': percentile(values, 0.99),
+        }
+    total = sum(result['requests'] for result in endpoints.values())
+    return {
+        'requests': total,
+        'errors': sum(result['errors'] for result in endpoints.values()),
+        'rps': total / duration,
+        'endpoints': endpoints,
+    }
+
+def print_summary(summary):
+    print(f"\n{'endpoint':<26}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, result in summary['endpoints'].items():
+        print(f"{name:<26}{result['requests']:>10}{result['errors']:>8}{result['rps']:>9.1f}"
+              f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+        if result['error_kinds']:
+            print(f"{'':<26}  {', '.join(f'{kind} x{count}' for kind, count in result['error_kinds'].items())}")
+    print(f"{'all':<26}{summary['requests']:>10}{summary['errors']:>8}{summary['rps']:>9.1f}")
+
+def latest_results(results_dir, settings):
+    """Latest saved run with the same settings, else the latest run"""
+    paths = sorted(glob.glob(os.path.join(results_dir, 'load-*.json')))
+    for path in reversed(paths):
+        with open(path, encoding='utf-8') as f:
+            if json.load(f).get('settings') == settings:
+                return path
+    return paths[-1] if paths else None
+
+def compare(current, baseline, threshold, min_delta_ms):
+    """Print a comparison table; returns what regressed"""
+    regressed = []
+    print(f"\n{'endpoint':<26}{'p95 before':>12}{'p95 now':>10}{'change':>10}")
+    for name, result in current['endpoints'].items():
+        before = baseline['endpoints'].get(name)
+        if before is None:
+            print(f"{name:<26}{'-':>12}{result['p95_ms']:>10.2f}{'new':>10}")
+            continue
+        old, new = before['p95_ms'], result['p95_ms']
+        change = (new - old) / old if old else 0.0
+        flag = ''
+        if change > threshold and new - old > min_delta_ms:
+            regressed.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<26}{old:>12.2f}{new:>10.2f}{change:>+10.1%}{flag}")
+
+    old, new = baseline['rps'], current['rps']
+    change = (new - old) / old if old else 0.0
+    flag = ''
+    if change < -threshold:
+        regressed.append('throughput')
+        flag = '  REGRESSION'
+    print(f"{'throughput (req/s)':<26}{old:>12.1f}{new:>10.1f}{change:>+10.1%}{flag}")
+    return regressed
+
+def main():
+    args = parse_args()
+    mix = parse_mix(args.mix)
+    base_env = dict(os.environ)
+
+    workdir = tempfile.mkdtemp(prefix='pehchaan-load-')
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'load.db')}"
+    app = build_app(database_url)
+    print(f"Seeding {args.users} profiles...")
+    usernames, accounts, last_image = seed(app, args.users, args.accounts, args.seed)
+    if not usernames or not accounts:
+        raise SystemExit('Nothing to load: the seeded database has no profiles')
+
+    # A few profiles get most of the scans, like shared QR codes do
+    popularity, total = [], 0.0
+    for rank in range(len(usernames)):
+        total += 1.0 / (rank + 10)
+        popularity.append(total)
+    random.Random(args.seed).shuffle(usernames)
+
+    port = args.port or free_port()
+    server = start_server(base_env, database_url, port, args.workers, workdir)
+    recorder = Recorder(time.monotonic() + args.warmup)
+    ctx = Context(port=port, seed=args.seed, mix=mix, usernames=usernames, popularity=popularity,
+                  accounts=accounts, recorder=recorder)
+    print(f"Running {args.concurrency} virtual users for {args.warmup:g}s warmup + {args.duration:g}s "
+          f"against {args.workers} gunicorn worker(s)...")
+    try:
+        asyncio.run(drive(ctx, args.concurrency, args.warmup, args.duration))
+    finally:
+        stop_server(server)
+        uploaded = cleanup_uploads(app, last_image)
+        if uploaded:
+            print(f"Removed {uploaded} uploaded gallery file(s)")
+
+    summary = summarize(recorder, args.duration)
+    print_summary(summary)
+    results = {
+        'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        'settings': {'users': args.users, 'concurrency': args.concurrency, 'duration': args.duration,
+                     'workers': args.workers, 'mix': mix, 'database': app.config['SQLALCHEMY_DATABASE_URI'].split(':')[0]},
+        **summary
+    }
+
+    baseline_path = args.baseline or latest_results(args.results_dir, results['settings'])
+    regressed = []
+    if baseline_path:
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {baseline_path} ({baseline.get('created_at')})")
+        if baseline.get('settings') != results['settings']:
+            print("Note: the baseline ran with different settings")
+        regressed = compare(results, baseline, args.threshold, args.min_delta_ms)
+
+    error_rate = summary['errors'] / summary['requests'] if summary['requests'] else 1.0
+    failed = regressed or error_rate > args.max_error_rate
+    if args.no_save:
+        pass
+    elif failed and not args.accept:
+        print("\nNot saved, so the baseline stays as it was (--accept saves a failed run)")
+    else:
+        os.makedirs(args.results_dir, exist_ok=True)
+        path = os.path.join(args.results_dir, f"load-{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved {path}")
+
+    if error_rate > args.max_error_rate:
+        print(f"\n{error_rate:.1%} of requests failed (allowed {args.max_error_rate:.1%})")
+        sys.exit(1)
+    if regressed:
+        print(f"\nSlower than the {args.threshold:.0%} threshold: {', '.join(regressed)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
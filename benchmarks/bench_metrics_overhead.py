@@ -0,0 +1,150 @@
+"""
+Request metrics overhead benchmark
+
+Runs the same requests against two fresh app processes, one with
+METRICS_ENABLED=False and one with it on, and compares per-endpoint
+latency through the WSGI stack. Endpoints cover a rendered profile
+(SQL + template), a JSON API query and a redirect with no SQL. Since
+whole-request timings vary between processes by more than the metrics
+cost, the hooks are also timed directly for a request with three SQL
+statements and one template.
+
+    python benchmarks/bench_metrics_overhead.py
+    python benchmarks/bench_metrics_overhead.py --users 2000 --samples 5000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=500, help='Profiles to seed (default 500)')
+    parser.add_argument('--samples', type=int, default=3000, help='Requests timed per endpoint')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--child', choices=['on', 'off'], help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+def build_app(database_url, metrics):
+    # Config reads the environment at import time
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['CONTACT_INGEST_ENABLED'] = 'False'
+    os.environ['VIEW_COUNTER_ENABLED'] = 'False'
+    os.environ['LINK_CLICKS_ENABLED'] = 'False'
+    os.environ['METRICS_ENABLED'] = 'True' if metrics else 'False'
+    os.environ['METRICS_DIR'] = os.path.join(os.path.dirname(database_url[len('sqlite:///'):]), 'metrics')
+    from app import create_app
+    from extensions import limiter
+    app = create_app()
+    limiter.enabled = False  # Every request comes from the same address
+    return app
+
+def seed(db, users):
+    from models import User, SocialLink, Skill
+
+    now = datetime.utcnow()
+    db.session.execute(User.__table__.insert(), [
+        {'id': n, 'email': f'user{n}@example.com', 'username': f'user{n}', 'password_hash': 'x',
+         'role': 'individual', 'full_name': f'User {n}', 'bio': 'Builds things', 'created_at': now,
+         'updated_at': now, 'unread_message_count': 0}
+        for n in range(1, users + 1)
+    ])
+    db.session.execute(SocialLink.__table__.insert(), [
+        {'id': n, 'user_id': n, 'platform': 'github', 'url': f'https://github.com/user{n}', 'order': 0,
+         'created_at': now}
+        for n in range(1, users + 1)
+    ])
+    db.session.execute(Skill.__table__.insert(), [
+        {'user_id': n, 'name': name, 'category': 'Languages', 'order': i}
+        for n in range(1, users + 1) for i, name in enumerate(('Python', 'SQL', 'Flask'))
+    ])
+    db.session.commit()
+
+def hook_cost(app, samples=20000):
+    """Microseconds the metrics hooks add to one request with 3 SQL statements and 1 template"""
+    import timeit
+    from flask import Response, request
+    from extensions import request_metrics
+    from utils.metrics import _before_cursor_execute, _after_cursor_execute
+
+    response = Response('x' * 1000)
+    with app.test_request_context('/user1'):
+        request.url_rule = next(app.url_map.iter_rules('profile.view_profile'))
+
+        def one_request():
+            request_metrics._start_request()
+            for _ in range(3):
+                _before_cursor_execute(None, None, None, None, None, False)
+                _after_cursor_execute(None, None, None, None, None, False)
+            request_metrics._template_started(app, None, None)
+            request_metrics._template_finished(app, None, None)
+            request_metrics._finish_request(response)
+
+        return min(timeit.repeat(one_request, number=samples, repeat=5)) / samples * 1e6
+
+def run_child(args, metrics):
+    rng = random.Random(args.seed)
+    database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='pehchaan-bench-'), 'bench.db')}"
+    app = build_app(database_url, metrics)
+    from models import db
+    from extensions import link_clicks
+
+    with app.app_context():
+        seed(db, args.users)
+    client = app.test_client()
+    ids = [rng.randint(1, args.users) for _ in range(args.samples)]
+    endpoints = {
+        'profile page': [f'/user{n}' for n in ids],
+        'people search api': [f'/api/people/search?q=user+{n % 10}' for n in ids],
+        'link redirect': [f"/go/{link_clicks.sign('social', n, f'https://github.com/user{n}', n)}" for n in ids],
+    }
+
+    headers = {'User-Agent': 'Mozilla/5.0 (bench)'}
+    results = {}
+    for label, paths in endpoints.items():
+        for path in paths[:200]:
+            client.get(path, headers=headers)  # Warm caches and snapshots
+        timings = []
+        for path in paths:
+            started = time.perf_counter()
+            client.get(path, headers=headers)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results[label] = {'p50': statistics.median(timings), 'p95': timings[int(len(timings) * 0.95) - 1]}
+    if metrics:
+        results['hooks_us'] = hook_cost(app)
+    print(json.dumps(results))
+
+def main():
+    args = parse_args()
+    if args.child:
+        run_child(args, args.child == 'on')
+        return
+
+    results = {}
+    for mode in ('off', 'on'):
+        output = subprocess.run(
+            [sys.executable, '-W', 'ignore', os.path.abspath(__file__), '--child', mode, '--users', str(args.users),
+             '--samples', str(args.samples), '--seed', str(args.seed)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+    hooks_us = results['on'].pop('hooks_us')
+
+    print(f"{'endpoint':<20}{'off p50':>10}{'on p50':>10}{'added':>10}{'off p95':>10}{'on p95':>10}   (ms)")
+    for label in results['off']:
+        off, on = results['off'][label], results['on'][label]
+        print(f"{label:<20}{off['p50']:>10.3f}{on['p50']:>10.3f}{on['p50'] - off['p50']:>+10.3f}"
+              f"{off['p95']:>10.3f}{on['p95']:>10.3f}")
+    print(f"\nMetrics hooks, timed directly: {hooks_us:.1f} us per request (3 SQL statements, 1 template)")
+
+if __name__ == '__main__':
+    main()
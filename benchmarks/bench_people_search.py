@@ -0,0 +1,180 @@
+"""
+People search benchmark
+
+Seeds a throwaway database with N individuals' search documents (through
+the people_search_docs triggers, as the app writes them) and times ranked
+searches. A fixed set of single-term, prefix and multi-term queries shows
+the worst cases (broad terms). A generated stream of mostly distinct
+queries - skills, name and word prefixes as typed, long-tail words and
+two-term combinations - is timed ranked from scratch, then through the
+result cache, whose hit rate on that stream is reported.
+
+    python benchmarks/bench_people_search.py --users 100000
+    python benchmarks/bench_people_search.py --database-url postgresql://localhost/pehchaan_bench
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+CHUNK = 10000
+
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Diya', 'Ananya', 'Ishaan', 'Meera', 'Kabir', 'Riya', 'Arjun']
+LAST_NAMES = ['Sharma', 'Iyer', 'Nair', 'Reddy', 'Gupta', 'Das', 'Menon', 'Singh', 'Rao', 'Patel']
+SKILLS = ['Python', 'JavaScript', 'React', 'Node.js', 'Django', 'Flask', 'PostgreSQL', 'Docker', 'Kubernetes',
+          'Figma', 'Photoshop', 'Rust', 'Go', 'Java', 'Spring', 'Kotlin', 'Swift', 'AWS', 'Terraform', 'Pandas']
+COMPANIES = ['Infosys', 'TCS', 'Wipro', 'Zoho', 'Flipkart', 'Swiggy', 'Razorpay', 'Freshworks', 'Acme', 'Ola']
+POSITIONS = ['Engineer', 'Senior Engineer', 'Designer', 'Data Analyst', 'Product Manager', 'Intern']
+WORDS = ['scalable', 'dashboard', 'payments', 'analytics', 'mobile', 'search', 'realtime', 'pipeline',
+         'inventory', 'booking', 'chat', 'recommendation', 'open', 'source', 'compiler', 'game']
+
+# Free text follows a Zipf-like distribution over a large vocabulary, so common
+# words appear in many profiles and most words in few (as in real bios)
+VOCABULARY = WORDS + [f'w{n:04d}' for n in range(5000)]
+VOCABULARY_WEIGHTS = [1.0 / (rank + 5) for rank in range(len(VOCABULARY))]
+
+QUERIES = ['python', 'react', 'pyth', 'kube', 'figma designer', 'razorpay engineer', 'rust compiler',
+           'flask postgresql', 'payments', 'meera', 'nair', 'data analyst pandas', 'go', 'swiggy']
+
+def realistic_query(rng):
+    """One query of a mostly distinct stream, shaped like what people type into the search box"""
+    kind = rng.random()
+    if kind < 0.25:
+        return rng.choice(SKILLS).lower()
+    if kind < 0.45:
+        word = rng.choice(SKILLS + FIRST_NAMES + LAST_NAMES + COMPANIES).lower()
+        return word[:rng.randint(2, max(2, len(word)))]  # Typed so far
+    if kind < 0.65:
+        return rng.choices(VOCABULARY, VOCABULARY_WEIGHTS)[0]
+    if kind < 0.85:
+        return f'{rng.choice(SKILLS)} {rng.choice(POSITIONS + WORDS)}'.lower()
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'.lower()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=100000, help='Individuals to seed (default 100000)')
+    parser.add_argument('--samples', type=int, default=500, help='Searches timed')
+    parser.add_argument('--database-url', help='Empty database to use (default: temporary SQLite file)')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+def build_app(database_url):
+    # Config reads the environment at import time
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['CONTACT_INGEST_ENABLED'] = 'False'
+    from app import create_app
+    return create_app()
+
+def seed(db, users, rng):
+    from models import User, PeopleSearchDocument
+
+    now = datetime.utcnow()
+    for start in range(1, users + 1, CHUNK):
+        user_rows, doc_rows = [], []
+        for n in range(start, min(start + CHUNK, users + 1)):
+            name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+            skills = rng.sample(SKILLS, rng.randint(2, 8))
+            user_rows.append({'id': n, 'email': f'user{n}@example.com', 'username': f'user{n}', 'password_hash': 'x',
+                              'role': 'individual', 'full_name': name, 'created_at': now, 'updated_at': now,
+                              'unread_message_count': 0})
+            doc_rows.append({
+                'user_id': n, 'full_name': name,
+                'tagline': f'{rng.choice(POSITIONS)} at {rng.choice(COMPANIES)}',
+                'bio': ' '.join(rng.choices(VOCABULARY, VOCABULARY_WEIGHTS, k=30)),
+                'skills': ' '.join(skills),
+                'projects': ' '.join(' '.join(rng.choices(VOCABULARY, VOCABULARY_WEIGHTS, k=12)) + ' ' +
+                                     ' '.join(rng.sample(skills, 2))
+                                     for _ in range(rng.randint(0, 4))),
+                'experience': ' '.join(f'{rng.choice(COMPANIES)} {rng.choice(POSITIONS)}'
+                                       for _ in range(rng.randint(0, 3))),
+                'updated_at': now
+            })
+        db.session.execute(User.__table__.insert(), user_rows)
+        db.session.execute(PeopleSearchDocument.__table__.insert(), doc_rows)
+        db.session.commit()
+
+def summary(values):
+    values = sorted(values)
+    return (f"p50 {statistics.median(values):.2f} ms, p95 {values[int(len(values) * 0.95) - 1]:.2f} ms, "
+            f"max {values[-1]:.2f} ms")
+
+def run_fixed(db, samples, backend, rng):
+    from utils.fulltext import search_people
+
+    timings = {query: [] for query in QUERIES}
+    for _ in range(samples):
+        query = rng.choice(QUERIES)
+        started = time.perf_counter()
+        search_people(query, page=rng.choice([1, 1, 1, 2]), backend=backend)
+        timings[query].append((time.perf_counter() - started) * 1000)
+        db.session.expunge_all()
+
+    print("\n=== Fixed queries, ranked on every search ===")
+    print(f"{'query':<22}{'n':>5}{'p50 ms':>10}{'p95 ms':>10}")
+    for query, values in timings.items():
+        if values:
+            values.sort()
+            print(f"{query:<22}{len(values):>5}{statistics.median(values):>10.2f}"
+                  f"{values[max(0, int(len(values) * 0.95) - 1)]:>10.2f}")
+    print(f"all fixed queries: {summary([value for values in timings.values() for value in values])}")
+
+def run_stream(db, label, queries, backend, cache):
+    from utils.fulltext import search_people
+
+    timings = []
+    for query, page in queries:
+        started = time.perf_counter()
+        search_people(query, page=page, backend=backend, cache=cache)
+        timings.append((time.perf_counter() - started) * 1000)
+        db.session.expunge_all()
+    print(f"{label}: {summary(timings)}")
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+
+    database_url = args.database_url
+    if not database_url:
+        tmpdir = tempfile.mkdtemp(prefix='pehchaan-bench-')
+        database_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+
+    app = build_app(database_url)
+    from models import db
+    from utils.fulltext import SearchResultCache
+
+    with app.app_context():
+        backend = app.config['PEOPLE_SEARCH_BACKEND']
+        print(f"Seeding {args.users} profiles into {db.engine.url.render_as_string(hide_password=True)} ({backend})...")
+        started = time.perf_counter()
+        seed(db, args.users, rng)
+        print(f"Seeded and indexed in {time.perf_counter() - started:.1f}s")
+
+        run_fixed(db, args.samples, backend, rng)
+
+        queries = [(realistic_query(rng), rng.choice([1, 1, 1, 2])) for _ in range(args.samples)]
+        distinct = len(set(queries))
+        print(f"\n=== Realistic stream: {len(queries)} searches, {distinct} distinct ({distinct / len(queries):.0%}) ===")
+        run_stream(db, 'ranked on every search', queries, backend, None)
+
+        class CountingCache(SearchResultCache):
+            lookups = hits = 0
+
+            def get(self, key):
+                value = super().get(key)
+                self.lookups += 1
+                self.hits += value is not None
+                return value
+
+        cache = CountingCache(ttl=app.config['PEOPLE_SEARCH_CACHE_SECONDS'],
+                              size=app.config['PEOPLE_SEARCH_CACHE_SIZE'])
+        run_stream(db, 'with result cache     ', queries, backend, cache)
+        print(f"cache hit rate: {cache.hits / max(1, cache.lookups):.0%}")
+
+if __name__ == '__main__':
+    main()
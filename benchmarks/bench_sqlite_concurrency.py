@@ -0,0 +1,171 @@
+"""
+Concurrent read/write benchmark for the SQLite engine profile
+
+Runs reader processes loading public profiles while writer processes replay
+dashboard saves (profile update plus a skills rewrite), first on a plain
+engine with rollback journaling and no pragmas, then on the engine built by
+utils/database.py (WAL, synchronous=NORMAL, mmap, cache, busy_timeout).
+Reader latency percentiles show whether reads still queue behind writes.
+
+    python benchmarks/bench_sqlite_concurrency.py
+    python benchmarks/bench_sqlite_concurrency.py --readers 16 --writers 4 --duration 20
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readers', type=int, default=8, help='Reader processes (default 8)')
+    parser.add_argument('--writers', type=int, default=2, help='Writer processes (default 2)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per run (default 10)')
+    parser.add_argument('--users', type=int, default=2000, help='Profiles to seed (default 2000)')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+def baseline_engine(url):
+    """Engine as configured before: default pool, rollback journal, no pragmas"""
+    return create_engine(url, pool_pre_ping=True, pool_recycle=300)
+
+def tuned_engine(url):
+    """Engine built through utils/database.py with the production Config values"""
+    from config import Config
+    from utils.database import engine_options, register_sqlite_pragmas
+
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    config['SQLALCHEMY_DATABASE_URI'] = url
+    engine = create_engine(url, **engine_options(config))
+    register_sqlite_pragmas(engine, config)
+    return engine
+
+def seed(engine, users, rng):
+    from models import db, User, Skill, Project
+
+    db.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {'id': n, 'email': f'user{n}@example.com', 'username': f'user{n}', 'password_hash': 'x',
+             'role': 'individual', 'bio': 'Hello', 'created_at': now, 'updated_at': now}
+            for n in range(1, users + 1)
+        ])
+        conn.execute(Skill.__table__.insert(), [
+            {'user_id': n, 'name': f'skill{rng.randint(1, 300)}', 'order': order}
+            for n in range(1, users + 1) for order in range(6)
+        ])
+        conn.execute(Project.__table__.insert(), [
+            {'user_id': n, 'title': 'Project', 'description': 'About ' * 40, 'order': order}
+            for n in range(1, users + 1) for order in range(3)
+        ])
+
+def read_profile(conn, user_id):
+    conn.execute(text('SELECT * FROM users WHERE id = :id'), {'id': user_id}).first()
+    conn.execute(text('SELECT * FROM skills WHERE user_id = :id ORDER BY "order"'), {'id': user_id}).all()
+    conn.execute(text('SELECT * FROM projects WHERE user_id = :id ORDER BY "order"'), {'id': user_id}).all()
+
+def save_profile(conn, user_id, rng):
+    """Same statements the dashboard issues when a user edits bio and skills"""
+    conn.execute(text('UPDATE users SET bio = :bio, updated_at = :now WHERE id = :id'),
+                 {'bio': f'Updated {rng.random()}', 'now': datetime.utcnow(), 'id': user_id})
+    conn.execute(text('DELETE FROM skills WHERE user_id = :id'), {'id': user_id})
+    conn.execute(text('INSERT INTO skills (user_id, name, "order") VALUES (:id, :name, :order)'),
+                 [{'id': user_id, 'name': f'skill{rng.randint(1, 300)}', 'order': order} for order in range(6)])
+
+def worker(kind, factory, url, args, seed, stop, results):
+    """One reader or writer process with its own engine; reports (kind, latencies, errors)"""
+    engine = factory(url)
+    rng = random.Random(seed)
+    latencies, failed = [], 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            if kind == 'read':
+                with engine.connect() as conn:
+                    read_profile(conn, rng.randint(1, args.users))
+            else:
+                with engine.begin() as conn:
+                    save_profile(conn, rng.randint(1, args.users), rng)
+            latencies.append((time.perf_counter() - started) * 1000)
+        except OperationalError:
+            failed += 1
+    engine.dispose()
+    results.put((kind, latencies, failed))
+
+def summary(latencies, duration):
+    if not latencies:
+        return {'ops/s': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    latencies = sorted(latencies)
+    return {
+        'ops/s': len(latencies) / duration,
+        'p50': statistics.median(latencies),
+        'p95': latencies[int(len(latencies) * 0.95) - 1],
+        'p99': latencies[int(len(latencies) * 0.99) - 1],
+        'max': latencies[-1]
+    }
+
+def run(factory, url, args, label):
+    stop = multiprocessing.Event()
+    queue = multiprocessing.Queue()
+    kinds = ['read'] * args.readers + ['write'] * args.writers
+    processes = [multiprocessing.Process(target=worker, args=(kind, factory, url, args, args.seed + i, stop, queue))
+                 for i, kind in enumerate(kinds)]
+    for process in processes:
+        process.start()
+    time.sleep(args.duration)
+    stop.set()
+
+    latencies = {'read': [], 'write': []}
+    errors = {'read': 0, 'write': 0}
+    for _ in processes:
+        kind, values, failed = queue.get()
+        latencies[kind].extend(values)
+        errors[kind] += failed
+    for process in processes:
+        process.join()
+
+    engine = factory(url)
+    with engine.connect() as conn:
+        journal = conn.execute(text('PRAGMA journal_mode')).scalar()
+    engine.dispose()
+
+    results = {kind: summary(values, args.duration) for kind, values in latencies.items()}
+    print(f"\n=== {label} (journal_mode={journal}) ===")
+    for kind, stats in results.items():
+        print(f"{kind + 's':<7} {stats['ops/s']:9.1f} ops/s   p50 {stats['p50']:7.2f} ms   p95 {stats['p95']:7.2f} ms"
+              f"   p99 {stats['p99']:7.2f} ms   max {stats['max']:8.2f} ms   errors {errors[kind]}")
+    return results
+
+def main():
+    args = parse_args()
+    tmpdir = tempfile.mkdtemp(prefix='pehchaan-bench-')
+    print(f"{args.readers} readers, {args.writers} writers, {args.duration:.0f}s per run, {args.users} profiles")
+
+    results = {}
+    for label, factory in (('Before: rollback journal, no pragmas', baseline_engine),
+                           ('After: utils/database.py profile', tuned_engine)):
+        url = f"sqlite:///{os.path.join(tmpdir, factory.__name__ + '.db')}"
+        engine = factory(url)
+        seed(engine, args.users, random.Random(args.seed))
+        engine.dispose()
+        results[label] = run(factory, url, args, label)
+
+    before, after = results.values()
+    print("\n=== Reader latency ===")
+    for key in ('p50', 'p95', 'p99', 'max'):
+        print(f"{key:<4} {before['read'][key]:8.2f} ms -> {after['read'][key]:8.2f} ms")
+    print(f"reads  {before['read']['ops/s']:.1f} -> {after['read']['ops/s']:.1f} ops/s")
+    print(f"writes {before['write']['ops/s']:.1f} -> {after['write']['ops/s']:.1f} commits/s")
+
+if __name__ == '__main__':
+    main()
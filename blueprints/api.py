@@ -1,11 +1,13 @@
 from flask import Blueprint, jsonify, request
 from flask_login import current_user
+from utils.replicas import read_only
 import json
 import os
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 @api_bp.route('/check-username')
+@read_only
 def check_username():
     """Check if a username is available"""
     from utils.security import check_username_availability
@@ -27,7 +29,101 @@ def check_username():
     available, message = check_username_availability(username)
     return jsonify({'available': available, 'message': message, 'is_current': False})
 
+@api_bp.route('/technologies')
+@read_only
+def get_technologies():
+    """Most used project technologies with their project counts"""
+    from utils.technologies import technology_counts
+    
+    prefix = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 50, type=int) or 50, 200)
+    counts = technology_counts(prefix=prefix or None, limit=limit)
+    return jsonify({'technologies': [{'name': name, 'projects': projects} for name, projects in counts]})
+
+@api_bp.route('/technologies/<name>/people')
+@read_only
+def get_technology_people(name):
+    """Users with a project tagged with a technology, paginated by after=<last id>"""
+    from utils.technologies import users_with_technology
+    
+    limit = min(request.args.get('limit', 50, type=int) or 50, 200)
+    users = users_with_technology(name, limit=limit, after_id=request.args.get('after', 0, type=int))
+    return jsonify({
+        'people': [{'id': u.id, 'username': u.username, 'full_name': u.full_name or ''} for u in users],
+        'next': users[-1].id if len(users) == limit else None
+    })
+
+@api_bp.route('/skills/autocomplete')
+@read_only
+def skill_autocomplete_suggestions():
+    """Most used skill names (or categories with field=category) starting with q"""
+    from extensions import skill_autocomplete
+    
+    field = request.args.get('field', 'name')
+    limit = min(max(request.args.get('limit', 8, type=int) or 8, 1), 10)
+    suggestions = skill_autocomplete.suggest(request.args.get('q', ''), field=field, limit=limit)
+    response = jsonify({'suggestions': [{'name': name, 'uses': uses} for name, uses in suggestions]})
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    return response
+
+@api_bp.route('/people/search')
+@read_only
+def people_search():
+    """Find individuals by name, skills, projects, experience or bio"""
+    from flask import current_app, url_for
+    from utils.fulltext import search_people, people_search_cache
+    
+    page = max(1, request.args.get('page', 1, type=int) or 1)
+    results, has_more = search_people(
+        request.args.get('q', ''), page=page,
+        backend=current_app.config['PEOPLE_SEARCH_BACKEND'],
+        cache=people_search_cache,
+        max_candidates=current_app.config['PEOPLE_SEARCH_MAX_CANDIDATES']
+    )
+    return jsonify({
+        'people': [{
+            'username': user.username,
+            'name': user.full_name or user.username,
+            'tagline': user.tagline or '',
+            'profile_image': url_for('static', filename='uploads/' + user.profile_image) if user.profile_image else None,
+            'url': url_for('profile.view_profile', username=user.username),
+            'snippet': str(snippet)
+        } for user, snippet in results],
+        'page': page,
+        'has_more': has_more
+    })
+
+@api_bp.route('/directory')
+@read_only
+def business_directory():
+    """Browse listed businesses by category, state and district, newest first"""
+    from flask import url_for
+    from utils.directory import list_businesses, directory_facets, DIRECTORY_PAGE_SIZE, DIRECTORY_MAX_PAGE_SIZE
+    
+    category = request.args.get('category', '').strip() or None
+    state = request.args.get('state', '').strip() or None
+    district = request.args.get('district', '').strip() or None
+    limit = min(request.args.get('limit', DIRECTORY_PAGE_SIZE, type=int) or DIRECTORY_PAGE_SIZE, DIRECTORY_MAX_PAGE_SIZE)
+    
+    businesses, next_cursor = list_businesses(category, state, district,
+                                              after_id=request.args.get('after', type=int), limit=limit)
+    return jsonify({
+        'businesses': [{
+            'username': user.username,
+            'name': user.full_name or user.username,
+            'tagline': user.tagline or '',
+            'category': user.business_category or '',
+            'state': user.state or '',
+            'district': user.district or '',
+            'profile_image': url_for('static', filename='uploads/' + user.profile_image) if user.profile_image else None,
+            'url': url_for('profile.view_profile', username=user.username)
+        } for user in businesses],
+        'next': next_cursor,
+        'facets': directory_facets(category, state, district)
+    })
+
 @api_bp.route('/states')
+@read_only
 def get_states():
     """Get list of states for a country"""
     country = 'india'  # Default to India for now
@@ -44,6 +140,7 @@ def get_states():
         return jsonify({'error': str(e)}), 500
 
 @api_bp.route('/districts')
+@read_only
 def get_districts():
     """Get list of districts for a state"""
     state = request.args.get('state', '')
@@ -5,6 +5,7 @@ from blueprints.forms import IndividualSignupForm, BusinessSignupForm, LoginForm
 from utils.qr_generator import generate_qr_code
 from utils.security import check_username_availability
 from extensions import limiter
+from utils.replicas import read_only
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -171,6 +172,7 @@ def logout():
     return redirect(url_for('main.index'))
 
 @auth_bp.route('/check-username')
+@read_only
 def check_username():
     """AJAX endpoint to check username availability"""
     username = request.args.get('username', '')
@@ -2,6 +2,7 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request,
 from flask_login import login_required, current_user
 from models import db, User
 from blueprints.forms import ProfileEditForm
+from extensions import limiter
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/dashboard')
 
@@ -120,6 +121,44 @@ def profile():
     
     return render_template('dashboard/profile.html', form=form)
 
+@dashboard_bp.route('/api/snapshot')
+@login_required
+def snapshot():
+    """All dashboard sections of the current user in one cacheable response"""
+    from utils.serializers import build_dashboard_snapshot, snapshot_etag
+    
+    data = build_dashboard_snapshot(current_user)
+    response = jsonify(data)
+    response.set_etag(snapshot_etag(data))
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+@dashboard_bp.route('/api/stats/views')
+@login_required
+def view_stats():
+    """Profile views of the current user per day and referrer, from the daily aggregates"""
+    from flask import current_app
+    from utils.view_counter import profile_view_stats
+    
+    days = request.args.get('days', 30, type=int)
+    days = max(1, min(days, current_app.config.get('VIEW_STATS_MAX_DAYS', 365)))
+    response = jsonify(profile_view_stats(current_user.id, days))
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@dashboard_bp.route('/api/stats/links')
+@login_required
+def link_stats():
+    """Clicks on each of the current user's profile links, from the daily aggregates"""
+    from flask import current_app
+    from utils.link_clicks import link_click_stats
+    
+    days = request.args.get('days', 30, type=int)
+    days = max(1, min(days, current_app.config.get('VIEW_STATS_MAX_DAYS', 365)))
+    response = jsonify(link_click_stats(current_user.id, days))
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
 # PROJECTS CRUD
 @dashboard_bp.route('/projects')
 @login_required
@@ -140,6 +179,7 @@ def projects():
 def add_project():
     from models import Project, ProjectImage
     from utils.file_handler import handle_file_upload
+    from utils.technologies import set_project_technologies
     
     project = Project(
         user_id=current_user.id,
@@ -147,9 +187,9 @@ def add_project():
         description=request.form.get('description'),
         live_demo_url=request.form.get('demo_url'),
         github_url=request.form.get('github_url'),
-        youtube_url=request.form.get('youtube_url'),
-        technologies=request.form.get('technologies')  # Save directly to column
+        youtube_url=request.form.get('youtube_url')
     )
+    set_project_technologies(project, request.form.get('technologies'))
     
     db.session.add(project)
     db.session.commit()
@@ -177,22 +217,16 @@ def add_project():
 @login_required
 def get_project(project_id):
     from models import Project
+    from utils.serializers import serialize_project
     project = Project.query.filter_by(id=project_id, user_id=current_user.id).first_or_404()
-    return jsonify({
-        'id': project.id,
-        'title': project.title,
-        'description': project.description,
-        'demo_url': project.live_demo_url or '',
-        'github_url': project.github_url or '',
-        'youtube_url': project.youtube_url or '',
-        'technologies': project.technologies or ''
-    })
+    return jsonify(serialize_project(project))
 
 @dashboard_bp.route('/projects/edit', methods=['POST'])
 @login_required
 def edit_project():
     from models import Project, ProjectImage
     from utils.file_handler import handle_file_upload
+    from utils.technologies import set_project_technologies
     
     project_id = request.form.get('project_id')
     print(f"DEBUG: Editing Project ID: {project_id}")
@@ -203,7 +237,7 @@ def edit_project():
     project.live_demo_url = request.form.get('demo_url')
     project.github_url = request.form.get('github_url')
     project.youtube_url = request.form.get('youtube_url')
-    project.technologies = request.form.get('technologies')
+    set_project_technologies(project, request.form.get('technologies'))
     
     # Handle media: YouTube OR Image
     youtube_url = request.form.get('youtube_url')
@@ -298,17 +332,9 @@ def add_experience():
 @login_required
 def get_experience(exp_id):
     from models import Experience
+    from utils.serializers import serialize_experience
     exp = Experience.query.filter_by(id=exp_id, user_id=current_user.id).first_or_404()
-    return jsonify({
-        'id': exp.id,
-        'company_name': exp.company_name,
-        'position': exp.position,
-        'description': exp.description or '',
-        'start_date': exp.start_date or '',
-        'end_date': exp.end_date or 'Present',
-        'youtube_url': exp.youtube_url or '',
-        'links': [{'label': link.label, 'url': link.url} for link in exp.links]
-    })
+    return jsonify(serialize_experience(exp))
 
 @dashboard_bp.route('/experience/edit', methods=['POST'])
 @login_required
@@ -390,16 +416,9 @@ def add_education():
 @login_required
 def get_education(edu_id):
     from models import Education
+    from utils.serializers import serialize_education
     edu = Education.query.filter_by(id=edu_id, user_id=current_user.id).first_or_404()
-    return jsonify({
-        'id': edu.id,
-        'institute_name': edu.institute_name,
-        'course': edu.course,
-        'start_date': edu.start_date or '',
-        'end_date': edu.end_date or 'Present',
-        'grade': edu.grade or '',
-        'description': edu.description or ''
-    })
+    return jsonify(serialize_education(edu))
 
 @dashboard_bp.route('/education/edit', methods=['POST'])
 @login_required
@@ -528,15 +547,9 @@ def add_other():
 @login_required
 def get_other(item_id):
     from models import Other
+    from utils.serializers import serialize_other
     item = Other.query.filter_by(id=item_id, user_id=current_user.id).first_or_404()
-    return jsonify({
-        'id': item.id,
-        'title': item.title,
-        'description': item.description or '',
-        'achieved_date': item.achieved_date or '',
-        'youtube_url': item.youtube_url or '',
-        'links': [{'label': link.label, 'url': link.url} for link in item.links]
-    })
+    return jsonify(serialize_other(item))
 
 @dashboard_bp.route('/others/edit', methods=['POST'])
 @login_required
@@ -605,26 +618,132 @@ def delete_other(item_id):
 @dashboard_bp.route('/messages')
 @login_required
 def messages():
-    from models import Message
-    messages = Message.query.filter_by(recipient_id=current_user.id).order_by(Message.created_at.desc()).all()
-    return render_template('dashboard/messages.html', messages=messages)
+    from flask import current_app
+    from utils.inbox import paginate_inbox
+    from utils.fulltext import search_messages
+    
+    query = request.args.get('q', '').strip()
+    if query:
+        page = request.args.get('page', 1, type=int)
+        messages, has_more = search_messages(
+            current_user.id, query, page=page,
+            backend=current_app.config['MESSAGE_SEARCH_BACKEND']
+        )
+        return render_template('dashboard/messages.html', messages=messages, folder='search',
+                               query=query, page=page, has_more=has_more)
+    
+    cursor = request.args.get('before')
+    folder = 'archived' if request.args.get('folder') == 'archived' else 'inbox'
+    messages, next_cursor = paginate_inbox(current_user.id, cursor=cursor, archived=folder == 'archived')
+    return render_template('dashboard/messages.html', messages=messages, folder=folder,
+                           next_cursor=next_cursor, is_first_page=not cursor)
 
 @dashboard_bp.route('/messages/<int:message_id>/read', methods=['POST'])
 @login_required
 def mark_message_read(message_id):
     from models import Message
-    message = Message.query.filter_by(id=message_id, recipient_id=current_user.id).first_or_404()
-    message.is_read = True
-    db.session.commit()
-    message.is_read = True
+    from utils.inbox import adjust_unread_count
+    
+    # Conditional UPDATE so concurrent reads of the same message only decrement once
+    updated = Message.query.filter_by(id=message_id, recipient_id=current_user.id, is_read=False).update(
+        {Message.is_read: True}, synchronize_session=False
+    )
+    if updated:
+        adjust_unread_count(current_user.id, -updated)
+        db.session.commit()
+    else:
+        Message.query.filter_by(id=message_id, recipient_id=current_user.id).first_or_404()
+    return jsonify({'success': True, 'unread_count': current_user.unread_message_count})
+
+@dashboard_bp.route('/messages/bulk', methods=['POST'])
+@login_required
+def bulk_messages():
+    """Mark read/unread, archive or delete many messages in one statement"""
+    from datetime import datetime
+    from utils.inbox import bulk_update_messages, BULK_MAX_ROWS
+    
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'message': 'Expected a JSON object'}), 400
+    
+    ids, sender, limit = data.get('ids'), data.get('sender'), data.get('limit')
+    if ids is not None and not (isinstance(ids, list) and
+                                all(isinstance(message_id, int) and not isinstance(message_id, bool) for message_id in ids)):
+        return jsonify({'success': False, 'message': 'ids must be a list of message ids'}), 400
+    if sender is not None and not isinstance(sender, str):
+        return jsonify({'success': False, 'message': 'sender must be an email address'}), 400
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool)):
+        return jsonify({'success': False, 'message': 'limit must be a number'}), 400
+    limit = max(1, min(limit or BULK_MAX_ROWS, BULK_MAX_ROWS))
+    
+    try:
+        older_than = datetime.fromisoformat(data['older_than']) if data.get('older_than') else None
+    except (TypeError, ValueError):  # Not a string, or not a date
+        return jsonify({'success': False, 'message': 'older_than must be an ISO date'}), 400
+    
+    try:
+        affected = bulk_update_messages(
+            current_user.id,
+            data.get('action'),
+            ids=ids,
+            older_than=older_than,
+            sender=sender,
+            limit=limit
+        )
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
     db.session.commit()
-    return jsonify({'success': True})
+    return jsonify({
+        'success': True,
+        'affected': affected,
+        'capped': affected >= limit,  # More matching messages may remain
+        'unread_count': current_user.unread_message_count
+    })
+
+@dashboard_bp.route('/messages/export')
+@login_required
+@limiter.limit("20 per hour")
+def export_messages():
+    """Stream the inbox as CSV or JSON Lines, optionally limited to a date range"""
+    from datetime import datetime, timedelta
+    from flask import Response, stream_with_context
+    from utils.inbox import iter_message_export, EXPORT_FORMATS
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'message': f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    try:
+        start = datetime.fromisoformat(request.args['start']) if request.args.get('start') else None
+        # End date is inclusive: export up to the end of that day
+        end = datetime.fromisoformat(request.args['end']) + timedelta(days=1) if request.args.get('end') else None
+    except ValueError:
+        return jsonify({'success': False, 'message': 'start and end must be ISO dates'}), 400
+    
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    filename = f"{current_user.username}_messages.{fmt}"
+    
+    # No Content-Length, so the WSGI server sends the body chunked as it is generated
+    return Response(
+        stream_with_context(iter_message_export(current_user.id, fmt, start=start, end=end)),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no'
+        }
+    )
 
 @dashboard_bp.route('/messages/delete-all', methods=['POST'])
 @login_required
 def delete_all_messages():
     from models import Message
     Message.query.filter_by(recipient_id=current_user.id).delete()
+    current_user.unread_message_count = 0
     db.session.commit()
     flash('All messages deleted successfully.', 'success')
     return redirect(url_for('dashboard.messages'))
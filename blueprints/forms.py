@@ -155,11 +155,13 @@ class ContactMessageForm(FlaskForm):
     ])
     email = StringField('Email', validators=[
         DataRequired(message='Email is required'),
-        Email(message='Please enter a valid email address')
+        Email(message='Please enter a valid email address'),
+        Length(max=120)
     ])
     phone = StringField('Phone', validators=[
         Optional(),
-        PhoneNumber()
+        PhoneNumber(),
+        Length(max=15)
     ])
     subject = StringField('Subject', validators=[
         DataRequired(message='Subject is required'),
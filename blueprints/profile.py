@@ -1,28 +1,62 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, send_file
+from flask import Blueprint, render_template, redirect, url_for, flash, request, send_file, abort, g
 from flask_login import current_user
-from models import db, User, Message
+from models import db, User, ProfileSnapshot
 from blueprints.forms import ContactMessageForm
-from extensions import limiter
+from extensions import limiter, contact_buffer, view_counter, link_clicks
+from utils.replicas import read_only
 import os
 from config import Config
 
 profile_bp = Blueprint('profile', __name__)
 
 @profile_bp.route('/<username>')
+@read_only
 def view_profile(username):
     """View public profile by username"""
-    user = User.query.filter_by(username=username.lower()).first_or_404()
+    from utils.profile_snapshot import load_profile_snapshot
+    
+    # One row: the user and its materialized profile snapshot
+    row = db.session.query(User, ProfileSnapshot).outerjoin(
+        ProfileSnapshot, ProfileSnapshot.user_id == User.id
+    ).filter(User.username == username.lower()).first()
+    if row is None:
+        abort(404)
+    user, snapshot = row
     
     # Check if account is soft-deleted
     if user.deleted_at:
         flash('This profile is not available.', 'warning')
         return redirect(url_for('main.index'))
     
+    # Never store a snapshot built from a possibly lagging replica
+    profile = load_profile_snapshot(user, snapshot, persist=not g.get('db_use_replica'))
+    
+    # Counted in memory and flushed in batches; owners and crawlers are not counted
+    if not (current_user.is_authenticated and current_user.id == user.id):
+        from utils.view_counter import classify_view_source, is_bot
+        if not is_bot(request.user_agent.string):
+            view_counter.record(user.id, classify_view_source(request.args, request.referrer, request.host))
+    
     # Render appropriate template based on user role
     if user.role == 'individual':
-        return render_template('public/individual_profile.html', user=user)
+        return render_template('public/individual_profile.html', user=profile)
     else:
-        return render_template('public/business_profile.html', user=user)
+        return render_template('public/business_profile.html', user=profile)
+
+@profile_bp.route('/go/<token>')
+@read_only
+def go(token):
+    """Redirect to a profile link and count the click"""
+    from utils.view_counter import is_bot
+    
+    link = link_clicks.unsign(token)
+    target = link_clicks.resolve(*link) if link else None
+    if target is None:
+        abort(404)
+    url, user_id = target
+    if not is_bot(request.user_agent.string):
+        link_clicks.record(user_id, *link[:2])
+    return redirect(url, code=302)
 
 @profile_bp.after_request
 def add_header(response):
@@ -39,36 +73,30 @@ def add_header(response):
 def contact(username):
     """Handle contact form submissions"""
     user = User.query.filter_by(username=username.lower()).first_or_404()
+    form = ContactMessageForm()
     
-    # Get form data
-    name = request.form.get('name')
-    email = request.form.get('email')
-    phone = request.form.get('phone')
-    subject = request.form.get('subject')
-    message_text = request.form.get('message')
-    
-    # Basic validation
-    if not all([name, email, subject, message_text]):
-        flash('Please fill in all required fields.', 'danger')
+    # Validate here: the buffer accepts the message before the database sees it
+    if not form.validate_on_submit():
+        for errors in form.errors.values():
+            for error in errors:
+                flash(error, 'danger')
         return redirect(url_for('profile.view_profile', username=username))
     
-    # Create message
-    message = Message(
+    # Queue message; the ingest buffer batch-inserts it shortly and drops duplicates
+    contact_buffer.submit(
         recipient_id=user.id,
-        name=name,
-        email=email,
-        phone=phone,
-        subject=subject,
-        message=message_text
+        name=form.name.data,
+        email=form.email.data,
+        phone=form.phone.data or None,
+        subject=form.subject.data,
+        message=form.message.data
     )
     
-    db.session.add(message)
-    db.session.commit()
-    
     flash('Your message has been sent successfully!', 'success')
     return redirect(url_for('profile.view_profile', username=username))
 
 @profile_bp.route('/resume/<int:user_id>')
+@read_only
 def download_resume(user_id):
     """Download user resume"""
     user = User.query.get_or_404(user_id)
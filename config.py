@@ -18,6 +18,31 @@ class Config:
         'pool_recycle': 300,
     }
     
+    # Read replicas (see utils/replicas.py); comma-separated, same schema as the primary
+    SQLALCHEMY_REPLICA_URIS = [
+        uri.strip().replace("postgres://", "postgresql://", 1)
+        for uri in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if uri.strip()
+    ]
+    REPLICA_READ_YOUR_WRITES_SECONDS = int(os.environ.get('REPLICA_READ_YOUR_WRITES_SECONDS', 10))  # Primary-only reads after a write
+    REPLICA_HEALTH_CHECK_INTERVAL = 5  # seconds between checks of a healthy replica
+    REPLICA_RETRY_AFTER = 30  # seconds before a failed replica is tried again
+    
+    # Backend-specific engine tuning (see utils/database.py)
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # bytes
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -64000))  # negative = KiB per connection
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))  # ms to wait for a lock
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))  # Postgres connections kept per worker
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))  # Extra connections under burst
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds to wait for a free connection
+    DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 30000))  # ms; 0 disables
+    
+    # Schema migrations (see migrations/__init__.py)
+    AUTO_MIGRATE = os.environ.get('AUTO_MIGRATE', 'False') == 'True'  # Apply pending migrations on boot (single process only)
+    MIGRATION_BATCH_SIZE = int(os.environ.get('MIGRATION_BATCH_SIZE', 1000))  # Rows per backfill transaction
+    MIGRATION_BATCH_PAUSE = float(os.environ.get('MIGRATION_BATCH_PAUSE', 0.05))  # seconds between batches
+    
     # Upload folder configuration
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'static', 'uploads')
@@ -32,6 +57,66 @@ class Config:
     PREVIOUS_WORK_UPLOAD_FOLDER = os.path.join(UPLOAD_FOLDER, 'previous_work')
     QR_CODE_FOLDER = os.path.join(BASE_DIR, 'static', 'qr_codes')
     
+    # Contact form write-behind buffer (see utils/ingest.py)
+    CONTACT_INGEST_ENABLED = os.environ.get('CONTACT_INGEST_ENABLED', 'True') == 'True'
+    CONTACT_INGEST_DIR = os.environ.get('CONTACT_INGEST_DIR') or os.path.join(BASE_DIR, 'instance', 'contact_ingest')
+    CONTACT_INGEST_FLUSH_INTERVAL = float(os.environ.get('CONTACT_INGEST_FLUSH_INTERVAL', 2.0))  # seconds
+    CONTACT_INGEST_BATCH_SIZE = 200  # Flush early once this many submissions are waiting
+    CONTACT_INGEST_DEDUPE_WINDOW = 600  # seconds; same sender + body inside this window is dropped
+    CONTACT_INGEST_FSYNC = True  # fsync every append so acknowledged submissions survive a crash
+    
+    # People search (see utils/fulltext.py)
+    PEOPLE_SEARCH_CACHE_SECONDS = int(os.environ.get('PEOPLE_SEARCH_CACHE_SECONDS', 60))  # 0 disables the result cache
+    PEOPLE_SEARCH_CACHE_SIZE = 1024  # Ranked pages kept per worker
+    PEOPLE_SEARCH_MAX_CANDIDATES = int(os.environ.get('PEOPLE_SEARCH_MAX_CANDIDATES', 5000))  # Matches ranked per search
+    
+    # Skill autocomplete (see utils/autocomplete.py)
+    SKILL_AUTOCOMPLETE_REFRESH_SECONDS = int(os.environ.get('SKILL_AUTOCOMPLETE_REFRESH_SECONDS', 600))  # Reload to see other workers' skills
+    SKILL_AUTOCOMPLETE_TOP_K = 10  # Completions cached per prefix
+    SKILL_AUTOCOMPLETE_MIN_USES = 2  # Names used less often are not suggested
+    
+    # Profile view counters (see utils/view_counter.py)
+    VIEW_COUNTER_ENABLED = os.environ.get('VIEW_COUNTER_ENABLED', 'True') == 'True'  # False: counts are only written by flush()
+    VIEW_COUNTER_FLUSH_INTERVAL = float(os.environ.get('VIEW_COUNTER_FLUSH_INTERVAL', 30.0))  # seconds
+    VIEW_COUNTER_MAX_PENDING = 5000  # Flush early once this many (user, day, source) counters are waiting
+    VIEW_STATS_MAX_DAYS = 365  # Longest window the dashboard stats endpoints return
+    
+    # Outbound link redirects and click counters (see utils/link_clicks.py)
+    LINK_CLICKS_ENABLED = os.environ.get('LINK_CLICKS_ENABLED', 'True') == 'True'  # False: clicks are only written by flush()
+    LINK_CLICKS_FLUSH_INTERVAL = float(os.environ.get('LINK_CLICKS_FLUSH_INTERVAL', 30.0))  # seconds
+    LINK_CLICKS_MAX_PENDING = 5000  # Flush early once this many clicks are waiting
+    LINK_REDIRECT_CACHE_SECONDS = 300  # How long a signed or cached link target is trusted
+    LINK_REDIRECT_CACHE_SIZE = 50000  # Link targets cached per worker
+    
+    # Request metrics (see utils/metrics.py)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'False') == 'True'  # Off: no hooks, no files, no /metrics
+    METRICS_DIR = os.environ.get('METRICS_DIR') or os.path.join(BASE_DIR, 'instance', 'metrics')  # Shared by all workers
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # Bearer token for /metrics; unset answers 404
+    METRICS_WRITE_INTERVAL = float(os.environ.get('METRICS_WRITE_INTERVAL', 5.0))  # seconds between worker file writes
+    
+    # Query debugging for development and staging (see utils/query_debug.py)
+    QUERY_DEBUG_ENABLED = os.environ.get('QUERY_DEBUG_ENABLED', 'False') == 'True'  # Walks the stack per statement
+    QUERY_DEBUG_REPEAT_THRESHOLD = int(os.environ.get('QUERY_DEBUG_REPEAT_THRESHOLD', 5))  # Same shape this often in one request = N+1
+    QUERY_DEBUG_SLOW_MS = float(os.environ.get('QUERY_DEBUG_SLOW_MS', 100))  # Statements slower than this are logged
+    QUERY_DEBUG_EXPLAIN = True  # Log the query plan of slow SELECTs
+    QUERY_DEBUG_STRICT = os.environ.get('QUERY_DEBUG_STRICT', 'False') == 'True'  # Raise on N+1 so tests fail
+    
+    # Live request profiling (see utils/profiling.py)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'False') == 'True'  # False registers no hooks at all
+    PROFILING_MODE = os.environ.get('PROFILING_MODE', 'sampler')  # 'sampler' or 'cprofile'
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0.0))  # Fraction of requests; 0 = header only
+    PROFILING_ENDPOINTS = [e for e in os.environ.get('PROFILING_ENDPOINTS', '').split(',') if e]  # Sampled endpoints; empty = all
+    PROFILING_INTERVAL_MS = float(os.environ.get('PROFILING_INTERVAL_MS', 5))  # Stack sampling interval
+    PROFILING_DIR = os.environ.get('PROFILING_DIR') or os.path.join(BASE_DIR, 'instance', 'profiles')
+    PROFILING_MAX_BYTES = int(os.environ.get('PROFILING_MAX_BYTES', 50 * 1024 * 1024))  # Oldest profiles deleted beyond this
+    PROFILING_MAX_FILES = 500
+    PROFILING_TOKEN_MAX_AGE = 3600  # seconds a scripts/profile_token.py token stays valid
+    
+    # Soft-deleted accounts (see utils/purge.py)
+    ACCOUNT_DELETION_GRACE_DAYS = 30  # Username stays reserved and data is kept this long
+    PURGE_JOURNAL_DIR = os.path.join(BASE_DIR, 'instance', 'purge_journal')
+    PURGE_METRICS_FILE = os.path.join(BASE_DIR, 'instance', 'purge_metrics.json')
+    
     # File upload configuration
     MAX_CONTENT_LENGTH = 32 * 1024 * 1024  # 32MB max request size
     ALLOWED_IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'webp'}
@@ -51,6 +136,7 @@ class Config:
     WTF_CSRF_SSL_STRICT = False  # Set to True in production with HTTPS
     
     # Rate limiting configuration (Flask-Limiter)
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'True') == 'True'  # Off only for local load tests
     RATELIMIT_STORAGE_URL = 'memory://'  # Use Redis in production
     RATELIMIT_STRATEGY = 'fixed-window'
     
@@ -63,5 +149,5 @@ class Config:
         'www', 'mail', 'ftp', 'blog', 'shop', 'store', 'account',
         'billing', 'pay', 'payment', 'subscribe', 'download',
         'cdn', 'assets', 'media', 'images', 'css', 'js', 'fonts',
-        'root', 'administrator', 'moderator', 'guest', 'pehchaan'
+        'root', 'administrator', 'moderator', 'guest', 'pehchaan', 'go', 'metrics'
     }
@@ -2,6 +2,14 @@ from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
+from utils.autocomplete import SkillAutocomplete
+from utils.ingest import ContactIngestBuffer
+from utils.link_clicks import LinkClickBuffer
+from utils.metrics import RequestMetrics
+from utils.profiling import RequestProfiler
+from utils.query_debug import QueryInspector
+from utils.replicas import ReplicaRouter
+from utils.view_counter import ProfileViewCounter
 
 # Initialize extensions
 csrf = CSRFProtect()
@@ -14,3 +22,11 @@ login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
 login_manager.login_message = 'Please log in to access this page.'
 login_manager.login_message_category = 'info'
+contact_buffer = ContactIngestBuffer()
+replica_router = ReplicaRouter()
+skill_autocomplete = SkillAutocomplete()
+view_counter = ProfileViewCounter()
+link_clicks = LinkClickBuffer()
+request_metrics = RequestMetrics()
+query_inspector = QueryInspector()
+request_profiler = RequestProfiler()
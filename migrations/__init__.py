@@ -0,0 +1,317 @@
+"""
+Versioned schema migrations for SQLite and Postgres
+
+Each file in migrations/versions named NNNN_description.py defines
+upgrade(ctx) and is applied once, in order, and recorded in the
+schema_migrations table. Steps must be idempotent (the ctx helpers are), so
+a migration interrupted halfway can simply be run again.
+
+Online operation:
+    - Indexes are built with CREATE INDEX CONCURRENTLY on Postgres.
+    - DDL on Postgres runs with a short lock_timeout and retries, so it never
+      queues behind a long transaction and stalls traffic on the table.
+    - Data backfills walk tables in primary-key batches, each in its own
+      short transaction, with a pause between batches and a checkpoint
+      stored in schema_migration_checkpoints so they resume where they
+      stopped.
+
+Usage:
+    python -m migrations status
+    python -m migrations upgrade
+"""
+import glob
+import importlib.util
+import os
+import time
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.exc import OperationalError
+
+VERSIONS_DIR = os.path.join(os.path.dirname(__file__), 'versions')
+
+# Arbitrary constant identifying the migration advisory lock on Postgres
+ADVISORY_LOCK_KEY = 7_340_021
+
+meta = MetaData()
+
+schema_migrations = Table(
+    'schema_migrations', meta,
+    Column('version', String(128), primary_key=True),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+schema_migration_checkpoints = Table(
+    'schema_migration_checkpoints', meta,
+    Column('name', String(128), primary_key=True),
+    Column('last_id', Integer, nullable=False),
+    Column('updated_at', DateTime, nullable=False),
+)
+
+class MigrationContext:
+    """Helpers handed to each migration's upgrade()"""
+
+    def __init__(self, engine, metadata, batch_size=1000, pause=0.05, lock_timeout='5s', log=print):
+        self.engine = engine
+        self.metadata = metadata
+        self.dialect = engine.dialect.name
+        self.batch_size = batch_size
+        self.pause = pause
+        self.lock_timeout = lock_timeout
+        self.log = log
+
+    # Introspection (fresh inspector each call, since migrations change the schema)
+
+    def has_table(self, table):
+        return inspect(self.engine).has_table(table)
+
+    def has_column(self, table, column):
+        return column in {c['name'] for c in inspect(self.engine).get_columns(table)}
+
+    def has_index(self, table, name):
+        return name in {i['name'] for i in inspect(self.engine).get_indexes(table)}
+
+    def is_generated(self, table, column):
+        """Whether a Postgres column is GENERATED ALWAYS (its value cannot be written)"""
+        with self.engine.connect() as conn:
+            return conn.execute(text(
+                """SELECT 1 FROM information_schema.columns
+                   WHERE table_name = :table AND column_name = :column AND is_generated = 'ALWAYS'"""
+            ), {'table': table, 'column': column}).first() is not None
+
+    # DDL
+
+    def execute(self, sql, params=None):
+        """Run one DDL/DML statement in its own transaction, with lock_timeout on Postgres"""
+        for attempt in range(5):
+            try:
+                with self.engine.begin() as conn:
+                    if self.dialect == 'postgresql':
+                        conn.execute(text(f"SET LOCAL lock_timeout = '{self.lock_timeout}'"))
+                        conn.execute(text('SET LOCAL statement_timeout = 0'))
+                    conn.execute(text(sql), params or {})
+                return
+            except OperationalError as e:
+                if self.dialect != 'postgresql' or 'lock timeout' not in str(e).lower() or attempt == 4:
+                    raise
+                self.log(f"  lock timeout, retrying ({attempt + 1}/5)...")
+                time.sleep(2 ** attempt)
+
+    def create_missing_tables(self):
+        """Create every model table the database lacks (no-op for existing tables)"""
+        missing = [t for t in self.metadata.sorted_tables if not self.has_table(t.name)]
+        for table in missing:
+            self.log(f"  creating table {table.name}")
+        self.metadata.create_all(bind=self.engine, tables=missing)
+
+    def add_column(self, table, column, ddl):
+        """ALTER TABLE ... ADD COLUMN unless it exists; ddl is the type and constraints"""
+        if self.has_column(table, column):
+            return
+        self.log(f"  adding column {table}.{column}")
+        self.execute(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}')
+
+    def create_index(self, name, table, columns, unique=False, where=None, using=None):
+        """
+        Create an index without blocking writes
+
+        On Postgres this is CREATE INDEX CONCURRENTLY outside a transaction;
+        an INVALID leftover from an interrupted concurrent build is dropped
+        and rebuilt. columns is a list of column names or SQL expressions.
+        """
+        quoted = ', '.join(f'"{c}"' if c.isidentifier() else c for c in columns)
+        unique_sql = 'UNIQUE ' if unique else ''
+        using_sql = f' USING {using}' if using else ''
+        where_sql = f' WHERE {where}' if where else ''
+
+        if self.dialect == 'postgresql':
+            with self.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                # Concurrent builds on large tables outlast the app's statement_timeout
+                conn.execute(text('SET statement_timeout = 0'))
+                try:
+                    invalid = conn.execute(text(
+                        """SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                           WHERE c.relname = :name AND NOT i.indisvalid"""
+                    ), {'name': name}).first()
+                    if invalid:
+                        self.log(f"  dropping invalid index {name}")
+                        conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS {name}'))
+                    if self.has_index(table, name):
+                        return
+                    self.log(f"  creating index {name} concurrently")
+                    conn.execute(text(
+                        f'CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table}{using_sql} ({quoted}){where_sql}'
+                    ))
+                finally:
+                    conn.execute(text('RESET statement_timeout'))
+        else:
+            if self.has_index(table, name):
+                return
+            self.log(f"  creating index {name}")
+            self.execute(f'CREATE {unique_sql}INDEX IF NOT EXISTS {name} ON {table} ({quoted}){where_sql}')
+
+    # Backfills
+
+    def _checkpoint(self, conn, name):
+        row = conn.execute(
+            select(schema_migration_checkpoints.c.last_id).where(schema_migration_checkpoints.c.name == name)
+        ).first()
+        return row[0] if row else 0
+
+    def _save_checkpoint(self, conn, name, last_id):
+        values = {'last_id': last_id, 'updated_at': datetime.utcnow()}
+        updated = conn.execute(
+            schema_migration_checkpoints.update()
+            .where(schema_migration_checkpoints.c.name == name).values(**values)
+        ).rowcount
+        if not updated:
+            conn.execute(schema_migration_checkpoints.insert().values(name=name, **values))
+
+    def backfill(self, name, table, process, columns=None, where=None, key='id'):
+        """
+        Walk table in primary-key batches and call process(conn, rows) for each
+
+        Every batch runs in its own transaction together with its checkpoint
+        update, then the runner sleeps for `pause` seconds so normal traffic
+        can take the write lock. Re-running resumes after the last checkpoint.
+
+        Args:
+            name: Unique checkpoint name
+            table: Table to walk (must have an integer primary key)
+            process: Callable(conn, rows) doing the batch's writes
+            columns: Columns to fetch for each row, key first (default: just the key)
+            where: Optional SQL filter limiting the rows visited
+            key: Integer primary key column to walk by
+        """
+        column_sql = ', '.join(columns or (key,))
+        where_sql = f' AND ({where})' if where else ''
+        total = 0
+
+        while True:
+            with self.engine.begin() as conn:
+                if self.dialect == 'postgresql':
+                    conn.execute(text(f"SET LOCAL lock_timeout = '{self.lock_timeout}'"))
+                    conn.execute(text('SET LOCAL statement_timeout = 0'))
+                last_id = self._checkpoint(conn, name)
+                rows = conn.execute(text(
+                    f'SELECT {column_sql} FROM {table} WHERE {key} > :last_id{where_sql} ORDER BY {key} LIMIT :limit'
+                ), {'last_id': last_id, 'limit': self.batch_size}).all()
+                if not rows:
+                    break
+                process(conn, rows)
+                self._save_checkpoint(conn, name, rows[-1][0])
+
+            total += len(rows)
+            if total % (self.batch_size * 20) < self.batch_size:
+                self.log(f"  {name}: {total} rows")
+            time.sleep(self.pause)
+
+        self.log(f"  {name}: done ({total} rows)")
+        return total
+
+    def backfill_sql(self, name, table, assignments, where=None, key='id'):
+        """Batched UPDATE table SET assignments over key ranges; assignments may reference the row"""
+        where_sql = f' AND ({where})' if where else ''
+
+        def process(conn, rows):
+            conn.execute(text(
+                f'UPDATE {table} SET {assignments} WHERE {key} >= :first AND {key} <= :last{where_sql}'
+            ), {'first': rows[0][0], 'last': rows[-1][0]})
+
+        return self.backfill(name, table, process, where=where, key=key)
+
+def discover():
+    """All migration modules as (version, path), in order"""
+    paths = sorted(glob.glob(os.path.join(VERSIONS_DIR, '[0-9][0-9][0-9][0-9]_*.py')))
+    return [(os.path.splitext(os.path.basename(path))[0], path) for path in paths]
+
+def load(path):
+    spec = importlib.util.spec_from_file_location(f"migrations.versions.{os.path.basename(path)[:-3]}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def applied_versions(engine):
+    meta.create_all(bind=engine)
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(select(schema_migrations.c.version))}
+
+def pending_versions(engine):
+    applied = applied_versions(engine)
+    return [(version, path) for version, path in discover() if version not in applied]
+
+def stamp(engine, versions):
+    """Record versions as applied without running them"""
+    meta.create_all(bind=engine)
+    with engine.begin() as conn:
+        applied = {row[0] for row in conn.execute(select(schema_migrations.c.version))}
+        for version in versions:
+            if version not in applied:
+                conn.execute(schema_migrations.insert().values(version=version, applied_at=datetime.utcnow()))
+
+def _advisory_lock(engine):
+    """Serialize migration runs across workers on Postgres; returns the held connection"""
+    if engine.dialect.name != 'postgresql':
+        return None
+    conn = engine.connect().execution_options(isolation_level='AUTOCOMMIT')
+    conn.execute(text('SET statement_timeout = 0'))
+    conn.execute(text('SELECT pg_advisory_lock(:key)'), {'key': ADVISORY_LOCK_KEY})
+    return conn
+
+def upgrade(engine, metadata, batch_size=1000, pause=0.05, log=print):
+    """Apply every pending migration in order; returns the versions applied"""
+    lock = _advisory_lock(engine)
+    try:
+        ctx = MigrationContext(engine, metadata, batch_size=batch_size, pause=pause, log=log)
+        applied = []
+        # Re-read inside the lock: another worker may have just finished
+        for version, path in pending_versions(engine):
+            log(f"Applying {version}...")
+            started = time.perf_counter()
+            load(path).upgrade(ctx)
+            stamp(engine, [version])
+            applied.append(version)
+            log(f"Applied {version} in {time.perf_counter() - started:.1f}s")
+        return applied
+    finally:
+        if lock is not None:
+            lock.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': ADVISORY_LOCK_KEY})
+            lock.execute(text('RESET statement_timeout'))
+            lock.close()
+
+def init_schema(app, db):
+    """
+    Bring the database schema up to date on boot
+
+    A brand-new database gets every model table from create_all(), runs the
+    migrations that set CREATE_WITH_SCHEMA (objects the models cannot
+    describe, such as full-text indexes; instant on empty tables) and has
+    all migrations stamped as applied. An existing database is migrated only if
+    AUTO_MIGRATE is set, which is off by default: every gunicorn worker runs
+    this at import, and only Postgres serializes them (advisory lock), so
+    SQLite workers would race on the DDL. Otherwise pending migrations are
+    reported and must be applied with `python -m migrations upgrade` (the
+    Procfile release step and render.yaml preDeployCommand).
+    """
+    engine = db.engine
+
+    if not inspect(engine).has_table('users'):
+        db.create_all()
+        ctx = MigrationContext(engine, db.metadata)
+        for version, path in discover():
+            module = load(path)
+            if getattr(module, 'CREATE_WITH_SCHEMA', False):
+                module.upgrade(ctx)
+        stamp(engine, [version for version, _ in discover()])
+        return
+
+    pending = pending_versions(engine)
+    if not pending:
+        return
+
+    if app.config.get('AUTO_MIGRATE'):
+        upgrade(engine, db.metadata,
+                batch_size=app.config.get('MIGRATION_BATCH_SIZE', 1000),
+                pause=app.config.get('MIGRATION_BATCH_PAUSE', 0.05))
+    else:
+        names = ', '.join(version for version, _ in pending)
+        print(f"WARNING: {len(pending)} pending migration(s): {names}. Run `python -m migrations upgrade`.")
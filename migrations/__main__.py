@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Importing app boots it; leave pending migrations for this command to apply and report
+os.environ.setdefault('AUTO_MIGRATE', 'False')
+
+from migrations import discover, applied_versions, pending_versions, stamp, upgrade
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m migrations', description='Versioned schema migrations')
+    parser.add_argument('command', choices=['status', 'upgrade', 'stamp'],
+                        help='status: list migrations; upgrade: apply pending; stamp: mark all as applied')
+    parser.add_argument('--batch-size', type=int, help='Rows per backfill batch')
+    parser.add_argument('--pause', type=float, help='Seconds to sleep between backfill batches')
+    args = parser.parse_args()
+
+    from app import app
+    from models import db
+
+    with app.app_context():
+        engine = db.engine
+
+        if args.command == 'status':
+            applied = applied_versions(engine)
+            for version, _ in discover():
+                print(f"[{'x' if version in applied else ' '}] {version}")
+            print(f"{len(pending_versions(engine))} pending.")
+
+        elif args.command == 'upgrade':
+            applied = upgrade(
+                engine, db.metadata,
+                batch_size=args.batch_size or app.config['MIGRATION_BATCH_SIZE'],
+                pause=args.pause if args.pause is not None else app.config['MIGRATION_BATCH_PAUSE']
+            )
+            print(f"{len(applied)} migration(s) applied." if applied else "Database is up to date.")
+
+        elif args.command == 'stamp':
+            stamp(engine, [version for version, _ in discover()])
+            print("All migrations marked as applied.")
+
+if __name__ == '__main__':
+    main()
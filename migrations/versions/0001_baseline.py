@@ -0,0 +1,5 @@
+"""Baseline: every model table, plus projects.technologies (was scripts/add_technologies_column.py)"""
+
+def upgrade(ctx):
+    ctx.create_missing_tables()
+    ctx.add_column('projects', 'technologies', 'VARCHAR(255)')
@@ -0,0 +1,13 @@
+"""Inbox keyset index and denormalized unread counter (was scripts/add_message_inbox_indexes.py)"""
+
+def upgrade(ctx):
+    ctx.add_column('users', 'unread_message_count', 'INTEGER NOT NULL DEFAULT 0')
+    ctx.create_index('ix_messages_recipient_created_id', 'messages', ['recipient_id', 'created_at', 'id'])
+
+    ctx.backfill_sql(
+        '0002_unread_message_count', 'users',
+        """unread_message_count = (
+            SELECT COUNT(*) FROM messages
+            WHERE messages.recipient_id = users.id AND messages.is_read = false
+        )"""
+    )
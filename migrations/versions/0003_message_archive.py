@@ -0,0 +1,4 @@
+"""Archive folder for messages (was scripts/add_message_archive_column.py)"""
+
+def upgrade(ctx):
+    ctx.add_column('messages', 'archived_at', 'TIMESTAMP')
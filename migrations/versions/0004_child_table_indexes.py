@@ -0,0 +1,27 @@
+"""(parent, order) indexes on every child table and the unread-count index (was scripts/add_missing_indexes.py)"""
+
+INDEXES = [
+    ('ix_skills_user_id_order', 'skills', ['user_id', 'order']),
+    ('ix_social_links_user_id_order', 'social_links', ['user_id', 'order']),
+    ('ix_projects_user_id_order', 'projects', ['user_id', 'order']),
+    ('ix_project_links_project_id_order', 'project_links', ['project_id', 'order']),
+    ('ix_project_images_project_id_order', 'project_images', ['project_id', 'order']),
+    ('ix_experiences_user_id_order', 'experiences', ['user_id', 'order']),
+    ('ix_experience_images_experience_id_order', 'experience_images', ['experience_id', 'order']),
+    ('ix_experience_links_experience_id_order', 'experience_links', ['experience_id', 'order']),
+    ('ix_education_user_id_order', 'education', ['user_id', 'order']),
+    ('ix_gallery_images_user_id_order', 'gallery_images', ['user_id', 'order']),
+    ('ix_others_user_id_order', 'others', ['user_id', 'order']),
+    ('ix_other_images_other_id_order', 'other_images', ['other_id', 'order']),
+    ('ix_other_links_other_id_order', 'other_links', ['other_id', 'order']),
+    ('ix_services_user_id_order', 'services', ['user_id', 'order']),
+    ('ix_service_images_service_id_order', 'service_images', ['service_id', 'order']),
+    ('ix_previous_works_user_id_order', 'previous_works', ['user_id', 'order']),
+    ('ix_previous_work_images_previous_work_id_order', 'previous_work_images', ['previous_work_id', 'order']),
+    ('ix_previous_work_links_previous_work_id_order', 'previous_work_links', ['previous_work_id', 'order']),
+    ('ix_messages_recipient_read_created', 'messages', ['recipient_id', 'is_read', 'created_at']),
+]
+
+def upgrade(ctx):
+    for name, table, columns in INDEXES:
+        ctx.create_index(name, table, columns)
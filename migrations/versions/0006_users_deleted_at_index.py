@@ -0,0 +1,4 @@
+"""Partial index over soft-deleted accounts for the purge job"""
+
+def upgrade(ctx):
+    ctx.create_index('ix_users_deleted_at', 'users', ['deleted_at'], where='deleted_at IS NOT NULL')
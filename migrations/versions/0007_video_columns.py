@@ -0,0 +1,33 @@
+"""Parsed video provider/id columns on every table with a youtube_url"""
+import re
+from sqlalchemy import text
+
+TABLES = ('projects', 'experiences', 'others', 'services', 'previous_works')
+
+# The URL formats utils/media.py recognised when this migration shipped; kept
+# here so later changes to the app's parser do not change what it backfills
+YOUTUBE_URL = re.compile(
+    r'^(?:https?://)?(?:www\.|m\.|music\.)?'
+    r'(?:youtube(?:-nocookie)?\.com/(?:watch\?(?:[^#]*&)?v=|embed/|shorts/|live/|v/)|youtu\.be/)'
+    r'([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])',
+    re.IGNORECASE
+)
+
+def parse_video_url(url):
+    match = YOUTUBE_URL.match((url or '').strip())
+    return ('youtube', match.group(1)) if match else (None, None)
+
+def upgrade(ctx):
+    for table in TABLES:
+        ctx.add_column(table, 'video_provider', 'VARCHAR(20)')
+        ctx.add_column(table, 'video_id', 'VARCHAR(32)')
+
+    for table in TABLES:
+        def process(conn, rows, table=table):
+            conn.execute(
+                text(f'UPDATE {table} SET video_provider = :provider, video_id = :video_id WHERE id = :id'),
+                [dict(zip(('provider', 'video_id'), parse_video_url(url)), id=row_id) for row_id, url in rows]
+            )
+
+        ctx.backfill(f'0007_video_{table}', table, process, columns=('id', 'youtube_url'),
+                     where="youtube_url IS NOT NULL AND youtube_url <> ''")
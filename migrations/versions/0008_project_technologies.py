@@ -0,0 +1,67 @@
+"""Normalize the comma-separated projects.technologies into technologies + project_technologies"""
+from datetime import datetime
+from sqlalchemy import bindparam, text
+
+# Tag rules of utils/technologies.py when this migration shipped, kept here so
+# later changes to the app's parser do not change what it backfills
+MAX_TECHNOLOGIES = 20
+MAX_NAME_LENGTH = 50
+MAX_DISPLAY_LENGTH = 255
+
+def technology_key(name):
+    return ' '.join(name.split()).lower()
+
+def parse_technologies(raw):
+    names, seen, length = [], set(), 0
+    for part in (raw or '').split(','):
+        name = ' '.join(part.split())[:MAX_NAME_LENGTH]
+        key = technology_key(name)
+        if not key or key in seen:
+            continue
+        length += len(name) + (2 if names else 0)
+        if len(names) >= MAX_TECHNOLOGIES or length > MAX_DISPLAY_LENGTH:
+            break
+        seen.add(key)
+        names.append(name)
+    return names
+
+def ensure_technologies(conn, names):
+    """technology_key -> id for names, inserting the missing tags (SQLite 3.24+ and Postgres)"""
+    wanted = {technology_key(name): name for name in names}
+    if not wanted:
+        return {}
+    now = datetime.utcnow()
+    conn.execute(text(
+        'INSERT INTO technologies (name, name_key, created_at) VALUES (:name, :name_key, :created_at) '
+        'ON CONFLICT (name_key) DO NOTHING'
+    ), [{'name': name, 'name_key': key, 'created_at': now} for key, name in wanted.items()])
+    lookup = text('SELECT name_key, id FROM technologies WHERE name_key IN :keys') \
+        .bindparams(bindparam('keys', expanding=True))
+    return dict(conn.execute(lookup, {'keys': list(wanted)}).all())
+
+def upgrade(ctx):
+    ctx.create_missing_tables()
+    ctx.create_index('ix_project_technologies_technology_project', 'project_technologies',
+                     ['technology_id', 'project_id'])
+
+    def process(conn, rows):
+        parsed = {project_id: parse_technologies(raw) for project_id, raw in rows}
+        ids = ensure_technologies(conn, [name for names in parsed.values() for name in names])
+        links = [
+            {'project_id': project_id, 'technology_id': ids[technology_key(name)], 'order': order}
+            for project_id, names in parsed.items() for order, name in enumerate(names)
+        ]
+        # Re-running a batch after a crash must not duplicate its links
+        conn.execute(text('DELETE FROM project_technologies WHERE project_id >= :first AND project_id <= :last'),
+                     {'first': rows[0][0], 'last': rows[-1][0]})
+        if links:
+            conn.execute(text(
+                'INSERT INTO project_technologies (project_id, technology_id, "order") '
+                'VALUES (:project_id, :technology_id, :order)'
+            ), links)
+        conn.execute(text('UPDATE projects SET technologies = :display WHERE id = :id'), [
+            {'id': project_id, 'display': ', '.join(names) or None} for project_id, names in parsed.items()
+        ])
+
+    ctx.backfill('0008_project_technologies', 'projects', process, columns=('id', 'technologies'),
+                 where="technologies IS NOT NULL AND technologies <> ''")
@@ -0,0 +1,22 @@
+"""Business directory: partial listing indexes and the directory_facets counters"""
+from sqlalchemy import text
+
+LISTED = "role = 'business' AND deleted_at IS NULL"
+
+# The listing rule as of this migration (models.DIRECTORY_LISTED may change later)
+RECOUNT = f"""
+INSERT INTO directory_facets (category, state, district, business_count)
+SELECT coalesce(business_category, ''), coalesce(state, ''), coalesce(district, ''), count(*)
+FROM users WHERE {LISTED}
+GROUP BY coalesce(business_category, ''), coalesce(state, ''), coalesce(district, '')
+"""
+
+def upgrade(ctx):
+    ctx.create_missing_tables()
+    ctx.create_index('ix_users_directory', 'users', ['business_category', 'state', 'district', 'id'], where=LISTED)
+    ctx.create_index('ix_users_directory_category', 'users', ['business_category', 'id'], where=LISTED)
+    ctx.create_index('ix_users_directory_location', 'users', ['state', 'district', 'id'], where=LISTED)
+
+    with ctx.engine.begin() as conn:
+        conn.execute(text('DELETE FROM directory_facets'))
+        ctx.log(f"  directory_facets: {conn.execute(text(RECOUNT)).rowcount} rows")
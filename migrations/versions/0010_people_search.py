@@ -0,0 +1,53 @@
+"""People search documents for every individual (the FTS index over them is built by 0014)"""
+from datetime import datetime
+from sqlalchemy import bindparam, text
+
+# Documents are assembled from the tables as they stand at this version, not
+# through the models, which may select columns later migrations add
+LISTED = "role = 'individual' AND deleted_at IS NULL"
+
+def _select(sql):
+    return text(sql).bindparams(bindparam('ids', expanding=True))
+
+USERS = _select(f"SELECT id, full_name, tagline, bio FROM users WHERE id IN :ids AND {LISTED}")
+PARTS = {
+    'skills': _select('SELECT user_id, name, category FROM skills WHERE user_id IN :ids ORDER BY "order", id'),
+    'projects': _select('SELECT user_id, title, description, technologies FROM projects '
+                        'WHERE user_id IN :ids ORDER BY "order", id'),
+    'experience': _select('SELECT user_id, company_name, position FROM experiences '
+                          'WHERE user_id IN :ids ORDER BY "order", id'),
+}
+DELETE = _select('DELETE FROM people_search_docs WHERE user_id IN :ids')
+INSERT = text(
+    'INSERT INTO people_search_docs (user_id, full_name, tagline, bio, skills, projects, experience, updated_at) '
+    'VALUES (:user_id, :full_name, :tagline, :bio, :skills, :projects, :experience, :updated_at)'
+)
+
+def join(*parts):
+    return ' '.join(part for part in parts if part)
+
+def upgrade(ctx):
+    ctx.create_missing_tables()
+
+    def process(conn, rows):
+        ids = [user_id for (user_id,) in rows]
+        now = datetime.utcnow()
+        documents = {
+            user_id: {'user_id': user_id, 'full_name': full_name or '', 'tagline': tagline or '', 'bio': bio or '',
+                      'skills': [], 'projects': [], 'experience': [], 'updated_at': now}
+            for user_id, full_name, tagline, bio in conn.execute(USERS, {'ids': ids})
+        }
+        for field, query in PARTS.items():
+            for user_id, *parts in conn.execute(query, {'ids': ids}):
+                if user_id in documents:
+                    documents[user_id][field].append(join(*parts))
+        for document in documents.values():
+            for field in PARTS:
+                document[field] = join(*document[field])
+
+        # Replacing the batch's documents makes a re-run after a crash harmless
+        conn.execute(DELETE, {'ids': ids})
+        if documents:
+            conn.execute(INSERT, list(documents.values()))
+
+    ctx.backfill('0010_people_search_docs', 'users', process, where=LISTED)
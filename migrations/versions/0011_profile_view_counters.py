@@ -0,0 +1,4 @@
+"""Daily profile view aggregates written by the buffered view counters"""
+
+def upgrade(ctx):
+    ctx.create_missing_tables()
@@ -0,0 +1,4 @@
+"""Daily click aggregates for outbound profile links (/go/<token> redirects)"""
+
+def upgrade(ctx):
+    ctx.create_missing_tables()
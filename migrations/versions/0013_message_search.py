@@ -0,0 +1,72 @@
+"""Full-text index over messages (was DDL run by init_message_search on every boot)"""
+from sqlalchemy.exc import OperationalError
+
+# The models cannot describe these objects, so create_all() on a new database needs this too
+CREATE_WITH_SCHEMA = True
+
+# SQLite: external-content FTS5 table kept in step with messages by triggers,
+# so ORM writes and the set-based bulk statements are both covered.
+# recipient_id is indexed too, which lets MATCH scope a search to one inbox.
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+        recipient_id, subject, message, name, email,
+        content='messages', content_rowid='id'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts(rowid, recipient_id, subject, message, name, email)
+        VALUES (new.id, new.recipient_id, new.subject, new.message, new.name, new.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, recipient_id, subject, message, name, email)
+        VALUES ('delete', old.id, old.recipient_id, old.subject, old.message, old.name, old.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS messages_fts_update
+        AFTER UPDATE OF recipient_id, subject, message, name, email ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, recipient_id, subject, message, name, email)
+        VALUES ('delete', old.id, old.recipient_id, old.subject, old.message, old.name, old.email);
+        INSERT INTO messages_fts(rowid, recipient_id, subject, message, name, email)
+        VALUES (new.id, new.recipient_id, new.subject, new.message, new.name, new.email);
+    END""",
+]
+
+# Postgres: a plain tsvector column maintained by a trigger. Adding it is a
+# catalog-only change, unlike a STORED generated column, which rewrites the
+# table under an exclusive lock; existing rows are filled in batches instead.
+POSTGRES_VECTOR = """
+    setweight(to_tsvector('simple', coalesce({row}subject, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce({row}name, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce({row}email, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce({row}message, '')), 'C')"""
+
+POSTGRES_FUNCTION = f"""CREATE OR REPLACE FUNCTION messages_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {POSTGRES_VECTOR.format(row='NEW.')};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql"""
+
+POSTGRES_TRIGGER = """DROP TRIGGER IF EXISTS messages_search_vector ON messages;
+CREATE TRIGGER messages_search_vector BEFORE INSERT OR UPDATE OF subject, name, email, message ON messages
+    FOR EACH ROW EXECUTE FUNCTION messages_search_vector_update()"""
+
+def upgrade(ctx):
+    if ctx.dialect == 'sqlite':
+        exists = ctx.has_table('messages_fts')
+        try:
+            for statement in SQLITE_DDL:
+                ctx.execute(statement)
+        except OperationalError as e:
+            ctx.log(f"  FTS5 unavailable, message search will use LIKE: {e}")
+            return
+        if not exists:
+            ctx.execute("INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')")
+
+    elif ctx.dialect == 'postgresql':
+        ctx.add_column('messages', 'search_vector', 'tsvector')
+        # Databases that ran the old boot-time DDL have a generated column, which needs no trigger
+        if not ctx.is_generated('messages', 'search_vector'):
+            ctx.execute(POSTGRES_FUNCTION)
+            ctx.execute(POSTGRES_TRIGGER)
+            ctx.backfill_sql('0013_messages_search_vector', 'messages',
+                             f"search_vector = {POSTGRES_VECTOR.format(row='')}", where='search_vector IS NULL')
+        ctx.create_index('ix_messages_search_vector', 'messages', ['search_vector'], using='gin')
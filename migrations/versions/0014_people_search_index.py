@@ -0,0 +1,72 @@
+"""Full-text index over people_search_docs (was DDL run by init_people_search on every boot)"""
+from sqlalchemy.exc import OperationalError
+
+# The models cannot describe these objects, so create_all() on a new database needs this too
+CREATE_WITH_SCHEMA = True
+
+# SQLite: same external-content pattern as messages_fts, over people_search_docs.
+# prefix='2 3' keeps short prefix queries (typing "py") off the full-term scan.
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS people_fts USING fts5(
+        full_name, tagline, bio, skills, projects, experience,
+        content='people_search_docs', content_rowid='user_id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS people_fts_insert AFTER INSERT ON people_search_docs BEGIN
+        INSERT INTO people_fts(rowid, full_name, tagline, bio, skills, projects, experience)
+        VALUES (new.user_id, new.full_name, new.tagline, new.bio, new.skills, new.projects, new.experience);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS people_fts_delete AFTER DELETE ON people_search_docs BEGIN
+        INSERT INTO people_fts(people_fts, rowid, full_name, tagline, bio, skills, projects, experience)
+        VALUES ('delete', old.user_id, old.full_name, old.tagline, old.bio, old.skills, old.projects, old.experience);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS people_fts_update AFTER UPDATE ON people_search_docs BEGIN
+        INSERT INTO people_fts(people_fts, rowid, full_name, tagline, bio, skills, projects, experience)
+        VALUES ('delete', old.user_id, old.full_name, old.tagline, old.bio, old.skills, old.projects, old.experience);
+        INSERT INTO people_fts(rowid, full_name, tagline, bio, skills, projects, experience)
+        VALUES (new.user_id, new.full_name, new.tagline, new.bio, new.skills, new.projects, new.experience);
+    END""",
+]
+
+# Postgres: trigger-maintained tsvector, batched backfill and concurrent GIN build, as in 0013
+POSTGRES_VECTOR = """
+    setweight(to_tsvector('simple', {row}full_name), 'A') ||
+    setweight(to_tsvector('simple', {row}skills), 'A') ||
+    setweight(to_tsvector('simple', {row}tagline), 'B') ||
+    setweight(to_tsvector('simple', {row}experience), 'B') ||
+    setweight(to_tsvector('simple', {row}projects), 'C') ||
+    setweight(to_tsvector('simple', {row}bio), 'D')"""
+
+POSTGRES_FUNCTION = f"""CREATE OR REPLACE FUNCTION people_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {POSTGRES_VECTOR.format(row='NEW.')};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql"""
+
+POSTGRES_TRIGGER = """DROP TRIGGER IF EXISTS people_search_vector ON people_search_docs;
+CREATE TRIGGER people_search_vector
+    BEFORE INSERT OR UPDATE OF full_name, tagline, bio, skills, projects, experience ON people_search_docs
+    FOR EACH ROW EXECUTE FUNCTION people_search_vector_update()"""
+
+def upgrade(ctx):
+    if ctx.dialect == 'sqlite':
+        exists = ctx.has_table('people_fts')
+        try:
+            for statement in SQLITE_DDL:
+                ctx.execute(statement)
+        except OperationalError as e:
+            ctx.log(f"  FTS5 unavailable, people search will use LIKE: {e}")
+            return
+        if not exists:
+            ctx.execute("INSERT INTO people_fts(people_fts) VALUES ('rebuild')")
+
+    elif ctx.dialect == 'postgresql':
+        ctx.add_column('people_search_docs', 'search_vector', 'tsvector')
+        if not ctx.is_generated('people_search_docs', 'search_vector'):
+            ctx.execute(POSTGRES_FUNCTION)
+            ctx.execute(POSTGRES_TRIGGER)
+            ctx.backfill_sql('0014_people_search_vector', 'people_search_docs',
+                             f"search_vector = {POSTGRES_VECTOR.format(row='')}",
+                             where='search_vector IS NULL', key='user_id')
+        ctx.create_index('ix_people_search_docs_search_vector', 'people_search_docs', ['search_vector'], using='gin')
@@ -3,8 +3,13 @@ from flask_login import UserMixin
 from datetime import datetime
 import bcrypt
 import re
+from utils.media import parse_video_url
+from utils.replicas import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Users listed in the business directory (also the predicate of its partial indexes)
+DIRECTORY_LISTED = "role = 'business' AND deleted_at IS NULL"
 
 def slugify_username(username):
     """Convert username to lowercase and sanitize"""
@@ -21,6 +26,19 @@ def slugify_username(username):
 class User(UserMixin, db.Model):
     """User model for both Individual and Business accounts"""
     __tablename__ = 'users'
+    __table_args__ = (
+        # Partial: only soft-deleted accounts are indexed, for the purge job
+        db.Index('ix_users_deleted_at', 'deleted_at',
+                 sqlite_where=db.text('deleted_at IS NOT NULL'),
+                 postgresql_where=db.text('deleted_at IS NOT NULL')),
+        # Business directory: newest-first keyset pages within a category and/or location
+        db.Index('ix_users_directory', 'business_category', 'state', 'district', 'id',
+                 sqlite_where=db.text(DIRECTORY_LISTED), postgresql_where=db.text(DIRECTORY_LISTED)),
+        db.Index('ix_users_directory_category', 'business_category', 'id',
+                 sqlite_where=db.text(DIRECTORY_LISTED), postgresql_where=db.text(DIRECTORY_LISTED)),
+        db.Index('ix_users_directory_location', 'state', 'district', 'id',
+                 sqlite_where=db.text(DIRECTORY_LISTED), postgresql_where=db.text(DIRECTORY_LISTED)),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
@@ -50,13 +68,16 @@ class User(UserMixin, db.Model):
     # Soft delete
     deleted_at = db.Column(db.DateTime, nullable=True)
     
+    # Denormalized inbox counter, kept in step with Message.is_read by utils.inbox
+    unread_message_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # Relationships
-    skills = db.relationship('Skill', backref='user', lazy=True, cascade='all, delete-orphan')
-    social_links = db.relationship('SocialLink', backref='user', lazy=True, cascade='all, delete-orphan')
+    skills = db.relationship('Skill', backref='user', lazy=True, cascade='all, delete-orphan', order_by='Skill.order')
+    social_links = db.relationship('SocialLink', backref='user', lazy=True, cascade='all, delete-orphan', order_by='SocialLink.order')
     projects = db.relationship('Project', backref='user', lazy=True, cascade='all, delete-orphan', order_by='Project.order')
     experiences = db.relationship('Experience', backref='user', lazy=True, cascade='all, delete-orphan', order_by='Experience.order')
     gallery_images = db.relationship('GalleryImage', backref='user', lazy=True, cascade='all, delete-orphan', order_by='GalleryImage.order')
@@ -64,6 +85,7 @@ class User(UserMixin, db.Model):
     others = db.relationship('Other', backref='user', lazy=True, cascade='all, delete-orphan', order_by='Other.order')
     services = db.relationship('Service', backref='user', lazy=True, cascade='all, delete-orphan', order_by='Service.order')
     previous_works = db.relationship('PreviousWork', backref='user', lazy=True, cascade='all, delete-orphan', order_by='PreviousWork.order')
+    profile_snapshot = db.relationship('ProfileSnapshot', uselist=False, lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
         """Hash and set password using bcrypt"""
@@ -76,9 +98,64 @@ class User(UserMixin, db.Model):
     def __repr__(self):
         return f'<User {self.username}>'
 
+class ProfileSnapshot(db.Model):
+    """Materialized public-profile payload, rebuilt by utils.profile_snapshot on every profile write"""
+    __tablename__ = 'profile_snapshots'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    format = db.Column(db.Integer, nullable=False)  # SNAPSHOT_FORMAT the payload was built with
+    version = db.Column(db.Integer, nullable=False, default=1)  # Incremented on every rebuild
+    data = db.Column(db.Text, nullable=False)  # Canonical JSON
+    built_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class PeopleSearchDocument(db.Model):
+    """Searchable text of an individual's profile, written with its snapshot by utils.fulltext"""
+    __tablename__ = 'people_search_docs'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    full_name = db.Column(db.Text, nullable=False, default='')
+    tagline = db.Column(db.Text, nullable=False, default='')
+    bio = db.Column(db.Text, nullable=False, default='')
+    skills = db.Column(db.Text, nullable=False, default='')  # Skill names and categories
+    projects = db.Column(db.Text, nullable=False, default='')  # Titles, descriptions, technologies
+    experience = db.Column(db.Text, nullable=False, default='')  # Companies and positions
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class DirectoryFacet(db.Model):
+    """Listed businesses per (category, state, district), kept current by utils.directory"""
+    __tablename__ = 'directory_facets'
+    
+    # Empty string stands for "not set" so the columns can form the primary key
+    category = db.Column(db.String(50), primary_key=True)
+    state = db.Column(db.String(50), primary_key=True)
+    district = db.Column(db.String(50), primary_key=True)
+    business_count = db.Column(db.Integer, nullable=False, default=0)
+
+class ProfileViewDaily(db.Model):
+    """Profile views per user, UTC day and referrer source, written in batches by utils.view_counter"""
+    __tablename__ = 'profile_view_daily'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    source = db.Column(db.String(10), primary_key=True)  # qr, direct, search, social, internal, other
+    views = db.Column(db.Integer, nullable=False, default=0)
+
+class LinkClickDaily(db.Model):
+    """Clicks per profile link and UTC day, written in batches by utils.link_clicks"""
+    __tablename__ = 'link_click_daily'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    kind = db.Column(db.String(20), primary_key=True)  # social, project, experience, other, previous_work
+    link_id = db.Column(db.Integer, primary_key=True)  # Id in the kind's link table
+    clicks = db.Column(db.Integer, nullable=False, default=0)
+
 class Skill(db.Model):
     """Skills/Tools for Individual users"""
     __tablename__ = 'skills'
+    __table_args__ = (
+        db.Index('ix_skills_user_id_order', 'user_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -91,6 +168,9 @@ class Skill(db.Model):
 class SocialLink(db.Model):
     """Social media links for users"""
     __tablename__ = 'social_links'
+    __table_args__ = (
+        db.Index('ix_social_links_user_id_order', 'user_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -100,9 +180,27 @@ class SocialLink(db.Model):
     order = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-class Project(db.Model):
+class VideoEmbedMixin:
+    """
+    Video columns for rows with a youtube_url
+
+    The URL is parsed once when it is assigned, so templates read the
+    stored video_provider/video_id instead of matching regexes per render.
+    """
+    video_provider = db.Column(db.String(20), nullable=True)
+    video_id = db.Column(db.String(32), nullable=True)
+
+    @db.validates('youtube_url')
+    def _parse_youtube_url(self, key, url):
+        self.video_provider, self.video_id = parse_video_url(url)
+        return url
+
+class Project(VideoEmbedMixin, db.Model):
     """Projects for Individual users"""
     __tablename__ = 'projects'
+    __table_args__ = (
+        db.Index('ix_projects_user_id_order', 'user_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -111,35 +209,44 @@ class Project(db.Model):
     live_demo_url = db.Column(db.String(255), nullable=True)
     github_url = db.Column(db.String(255), nullable=True)
     youtube_url = db.Column(db.String(255), nullable=True)
-    technologies = db.Column(db.String(255), nullable=True)  # Comma-separated list of technologies
+    technologies = db.Column(db.String(255), nullable=True)  # Display copy of the project's tags, comma-separated
     order = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    @property
-    def youtube_id(self):
-        """Extract YouTube ID from URL"""
-        if not self.youtube_url:
-            return None
-        import re
-        patterns = [
-            r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
-            r'embed\/([0-9A-Za-z_-]{11})',
-            r'youtu\.be\/([0-9A-Za-z_-]{11})'
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, self.youtube_url)
-            if match:
-                return match.group(1)
-        return None
-
     
     # Relationships
     images = db.relationship('ProjectImage', backref='project', lazy=True, cascade='all, delete-orphan', order_by='ProjectImage.order')
     links = db.relationship('ProjectLink', backref='project', lazy=True, cascade='all, delete-orphan', order_by='ProjectLink.order')
+    technology_links = db.relationship('ProjectTechnology', backref='project', lazy=True, cascade='all, delete-orphan', order_by='ProjectTechnology.order')
+
+class Technology(db.Model):
+    """Technology tag shared by all projects, unique case-insensitively"""
+    __tablename__ = 'technologies'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False)  # Spelling of the first project that used it
+    name_key = db.Column(db.String(50), unique=True, nullable=False)  # Lowercased, whitespace-collapsed
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ProjectTechnology(db.Model):
+    """Tags of a project (edit through utils.technologies.set_project_technologies)"""
+    __tablename__ = 'project_technologies'
+    __table_args__ = (
+        # "Projects using X" and tag counts read this index alone
+        db.Index('ix_project_technologies_technology_project', 'technology_id', 'project_id'),
+    )
+    
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), primary_key=True)
+    technology_id = db.Column(db.Integer, db.ForeignKey('technologies.id'), primary_key=True)
+    order = db.Column(db.Integer, default=0)
+    
+    technology = db.relationship('Technology', lazy='joined')
 
 class ProjectLink(db.Model):
     """Proof links/Additional links for projects"""
     __tablename__ = 'project_links'
+    __table_args__ = (
+        db.Index('ix_project_links_project_id_order', 'project_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
@@ -167,20 +274,13 @@ class ProjectLink(db.Model):
     def demo_url(self, value):
         """Setter for demo_url property"""
         self.live_demo_url = value
-    
-    @property
-    def technologies(self):
-        """Get technologies as string (placeholder for now)"""
-        return getattr(self, '_technologies', '')
-    
-    @technologies.setter
-    def technologies(self, value):
-        """Set technologies string"""
-        self._technologies = value
 
 class ProjectImage(db.Model):
     """Multiple images for a project"""
     __tablename__ = 'project_images'
+    __table_args__ = (
+        db.Index('ix_project_images_project_id_order', 'project_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
@@ -188,9 +288,12 @@ class ProjectImage(db.Model):
     order = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-class Experience(db.Model):
+class Experience(VideoEmbedMixin, db.Model):
     """Experience/Work history for Individual users"""
     __tablename__ = 'experiences'
+    __table_args__ = (
+        db.Index('ix_experiences_user_id_order', 'user_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -218,23 +321,6 @@ class Experience(db.Model):
         """Alias for order for template sorting"""
         return self.order
     
-    @property
-    def youtube_id(self):
-        """Extract YouTube ID from URL"""
-        if not self.youtube_url:
-            return None
-        import re
-        patterns = [
-            r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
-            r'embed\/([0-9A-Za-z_-]{11})',
-            r'youtu\.be\/([0-9A-Za-z_-]{11})'
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, self.youtube_url)
-            if match:
-                return match.group(1)
-        return None
-
     
     # Relationships
     images = db.relationship('ExperienceImage', backref='experience', lazy=True, cascade='all, delete-orphan', order_by='ExperienceImage.order')
@@ -243,6 +329,9 @@ class Experience(db.Model):
 class ExperienceImage(db.Model):
     """Multiple images for experience"""
     __tablename__ = 'experience_images'
+    __table_args__ = (
+        db.Index('ix_experience_images_experience_id_order', 'experience_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     experience_id = db.Column(db.Integer, db.ForeignKey('experiences.id'), nullable=False)
@@ -253,6 +342,9 @@ class ExperienceImage(db.Model):
 class ExperienceLink(db.Model):
     """Proof links for experience"""
     __tablename__ = 'experience_links'
+    __table_args__ = (
+        db.Index('ix_experience_links_experience_id_order', 'experience_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     experience_id = db.Column(db.Integer, db.ForeignKey('experiences.id'), nullable=False)
@@ -263,6 +355,9 @@ class ExperienceLink(db.Model):
 class Education(db.Model):
     """Education history for Individual users"""
     __tablename__ = 'education'
+    __table_args__ = (
+        db.Index('ix_education_user_id_order', 'user_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -278,6 +373,9 @@ class Education(db.Model):
 class GalleryImage(db.Model):
     """Gallery images for users"""
     __tablename__ = 'gallery_images'
+    __table_args__ = (
+        db.Index('ix_gallery_images_user_id_order', 'user_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -285,9 +383,12 @@ class GalleryImage(db.Model):
     order = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-class Other(db.Model):
+class Other(VideoEmbedMixin, db.Model):
     """Achievements, certifications, custom items"""
     __tablename__ = 'others'
+    __table_args__ = (
+        db.Index('ix_others_user_id_order', 'user_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -297,24 +398,6 @@ class Other(db.Model):
     youtube_url = db.Column(db.String(255), nullable=True)
     order = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    @property
-    def youtube_id(self):
-        """Extract YouTube ID from URL"""
-        if not self.youtube_url:
-            return None
-        import re
-        patterns = [
-            r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
-            r'embed\/([0-9A-Za-z_-]{11})',
-            r'youtu\.be\/([0-9A-Za-z_-]{11})'
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, self.youtube_url)
-            if match:
-                return match.group(1)
-        return None
-
     
     # Relationships
     images = db.relationship('OtherImage', backref='other', lazy=True, cascade='all, delete-orphan', order_by='OtherImage.order')
@@ -323,6 +406,9 @@ class Other(db.Model):
 class OtherImage(db.Model):
     """Multiple images for other items"""
     __tablename__ = 'other_images'
+    __table_args__ = (
+        db.Index('ix_other_images_other_id_order', 'other_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     other_id = db.Column(db.Integer, db.ForeignKey('others.id'), nullable=False)
@@ -333,6 +419,9 @@ class OtherImage(db.Model):
 class OtherLink(db.Model):
     """Links for other items"""
     __tablename__ = 'other_links'
+    __table_args__ = (
+        db.Index('ix_other_links_other_id_order', 'other_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     other_id = db.Column(db.Integer, db.ForeignKey('others.id'), nullable=False)
@@ -340,9 +429,12 @@ class OtherLink(db.Model):
     url = db.Column(db.String(255), nullable=False)
     order = db.Column(db.Integer, default=0)
 
-class Service(db.Model):
+class Service(VideoEmbedMixin, db.Model):
     """Services for Business users"""
     __tablename__ = 'services'
+    __table_args__ = (
+        db.Index('ix_services_user_id_order', 'user_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -353,24 +445,6 @@ class Service(db.Model):
     youtube_url = db.Column(db.String(255), nullable=True)
     order = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    @property
-    def youtube_id(self):
-        """Extract YouTube ID from URL"""
-        if not self.youtube_url:
-            return None
-        import re
-        patterns = [
-            r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
-            r'embed\/([0-9A-Za-z_-]{11})',
-            r'youtu\.be\/([0-9A-Za-z_-]{11})'
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, self.youtube_url)
-            if match:
-                return match.group(1)
-        return None
-
     
     # Relationships
     images = db.relationship('ServiceImage', backref='service', lazy=True, cascade='all, delete-orphan', order_by='ServiceImage.order')
@@ -378,6 +452,9 @@ class Service(db.Model):
 class ServiceImage(db.Model):
     """Multiple images for service"""
     __tablename__ = 'service_images'
+    __table_args__ = (
+        db.Index('ix_service_images_service_id_order', 'service_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     service_id = db.Column(db.Integer, db.ForeignKey('services.id'), nullable=False)
@@ -385,9 +462,12 @@ class ServiceImage(db.Model):
     order = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-class PreviousWork(db.Model):
+class PreviousWork(VideoEmbedMixin, db.Model):
     """Previous work/portfolio for Business users"""
     __tablename__ = 'previous_works'
+    __table_args__ = (
+        db.Index('ix_previous_works_user_id_order', 'user_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -397,24 +477,6 @@ class PreviousWork(db.Model):
     youtube_url = db.Column(db.String(255), nullable=True)
     order = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    @property
-    def youtube_id(self):
-        """Extract YouTube ID from URL"""
-        if not self.youtube_url:
-            return None
-        import re
-        patterns = [
-            r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
-            r'embed\/([0-9A-Za-z_-]{11})',
-            r'youtu\.be\/([0-9A-Za-z_-]{11})'
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, self.youtube_url)
-            if match:
-                return match.group(1)
-        return None
-
     
     # Relationships
     images = db.relationship('PreviousWorkImage', backref='previous_work', lazy=True, cascade='all, delete-orphan', order_by='PreviousWorkImage.order')
@@ -423,6 +485,9 @@ class PreviousWork(db.Model):
 class PreviousWorkImage(db.Model):
     """Multiple images for previous work"""
     __tablename__ = 'previous_work_images'
+    __table_args__ = (
+        db.Index('ix_previous_work_images_previous_work_id_order', 'previous_work_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     previous_work_id = db.Column(db.Integer, db.ForeignKey('previous_works.id'), nullable=False)
@@ -433,6 +498,9 @@ class PreviousWorkImage(db.Model):
 class PreviousWorkLink(db.Model):
     """Links for previous work"""
     __tablename__ = 'previous_work_links'
+    __table_args__ = (
+        db.Index('ix_previous_work_links_previous_work_id_order', 'previous_work_id', 'order'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     previous_work_id = db.Column(db.Integer, db.ForeignKey('previous_works.id'), nullable=False)
@@ -443,6 +511,12 @@ class PreviousWorkLink(db.Model):
 class Message(db.Model):
     """Contact form submissions"""
     __tablename__ = 'messages'
+    __table_args__ = (
+        # Inbox keyset pagination: WHERE recipient_id = ? ORDER BY created_at DESC, id DESC
+        db.Index('ix_messages_recipient_created_id', 'recipient_id', 'created_at', 'id'),
+        # Unread counts and unread-first listings per recipient
+        db.Index('ix_messages_recipient_read_created', 'recipient_id', 'is_read', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     recipient_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)  # Recipient
@@ -452,4 +526,5 @@ class Message(db.Model):
     subject = db.Column(db.String(200), nullable=False)
     message = db.Column(db.Text, nullable=False)
     is_read = db.Column(db.Boolean, default=False)
+    archived_at = db.Column(db.DateTime, nullable=True)  # Archived messages are always read
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
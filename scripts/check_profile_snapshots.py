@@ -0,0 +1,24 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from utils.profile_snapshot import check_profile_snapshots
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild profile snapshots that drifted from the normalized tables')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--dry-run', action='store_true', help='Only report drifted snapshots')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        stats = check_profile_snapshots(batch_size=args.batch_size, repair=not args.dry_run)
+
+    print(f"Checked {stats['checked']} profiles: {stats['missing']} missing, "
+          f"{stats['drifted']} drifted, {stats['repaired']} rebuilt.")
+
+if __name__ == '__main__':
+    main()
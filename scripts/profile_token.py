@@ -0,0 +1,23 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from utils.profiling import PROFILE_HEADER, profile_token
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Print a signed header that makes the app profile a request',
+        epilog='Example: curl -H "$(python scripts/profile_token.py)" https://pehchaan-h9ub.onrender.com/someone'
+    )
+    parser.add_argument('--value-only', action='store_true', help='Print only the token, not "Header: token"')
+    args = parser.parse_args()
+
+    # Valid for PROFILING_TOKEN_MAX_AGE seconds; the response names its profile in X-Profile-Id
+    token = profile_token(Config.SECRET_KEY)
+    print(token if args.value_only else f"{PROFILE_HEADER}: {token}")
+
+if __name__ == '__main__':
+    main()
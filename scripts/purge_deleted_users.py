@@ -0,0 +1,31 @@
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from utils.purge import purge_expired_users
+
+def main():
+    parser = argparse.ArgumentParser(description='Permanently delete accounts past the soft-delete grace period')
+    parser.add_argument('--batch-size', type=int, default=100, help='Users per transaction')
+    parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+    parser.add_argument('--pause', type=float, default=0.1, help='Seconds between batches')
+    parser.add_argument('--dry-run', action='store_true', help='Only count expired accounts')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        metrics = purge_expired_users(
+            batch_size=args.batch_size,
+            max_batches=args.max_batches,
+            pause=args.pause,
+            dry_run=args.dry_run
+        )
+
+    print(json.dumps(metrics.as_dict(), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from models import db
+from utils.directory import rebuild_directory_facets
+
+def main():
+    parser = argparse.ArgumentParser(description='Recount the business directory facet counters from the users table')
+    parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        rows = rebuild_directory_facets()
+        db.session.commit()
+
+    print(f"Rebuilt {rows} directory facet rows.")
+
+if __name__ == '__main__':
+    main()
@@ -142,6 +142,81 @@ function autosave(formId) {
     });
 }
 
+// Client-side cache of /dashboard/api/snapshot, revalidated by ETag
+const DashboardSnapshot = (function () {
+    const STORAGE_KEY = 'pehchaan-dashboard-snapshot';
+    let pending = null;
+
+    function read() {
+        try {
+            return JSON.parse(sessionStorage.getItem(STORAGE_KEY));
+        } catch (e) {
+            return null;
+        }
+    }
+
+    function write(entry) {
+        try {
+            sessionStorage.setItem(STORAGE_KEY, JSON.stringify(entry));
+        } catch (e) {
+            // Storage full or disabled - keep working without the cache
+        }
+    }
+
+    function load() {
+        const cached = read();
+        if (cached && !cached.stale) return Promise.resolve(cached.data);
+        if (pending) return pending;
+
+        const headers = {};
+        if (cached && cached.etag) headers['If-None-Match'] = cached.etag;
+
+        pending = fetch('/dashboard/api/snapshot', { headers: headers, credentials: 'same-origin' })
+            .then(res => {
+                if (res.status === 304 && cached) {
+                    write({ etag: cached.etag, data: cached.data, stale: false });
+                    return cached.data;
+                }
+                if (!res.ok) throw new Error('Failed to load dashboard data');
+                const etag = res.headers.get('ETag');
+                return res.json().then(data => {
+                    write({ etag: etag, data: data, stale: false });
+                    return data;
+                });
+            })
+            .finally(() => {
+                pending = null;
+            });
+        return pending;
+    }
+
+    // Mark the cache stale after an edit; the next load revalidates it
+    function invalidate() {
+        const cached = read();
+        if (cached) {
+            cached.stale = true;
+            write(cached);
+        }
+    }
+
+    function find(section, id) {
+        const match = data => (data[section] || []).find(item => String(item.id) === String(id));
+        return load().then(data => {
+            const item = match(data);
+            if (item) return item;
+            invalidate();
+            return load().then(match);
+        });
+    }
+
+    return { load: load, find: find, invalidate: invalidate };
+})();
+
+// Any dashboard form submission is an edit
+document.addEventListener('submit', function () {
+    DashboardSnapshot.invalidate();
+});
+
 // Initialize on page load
 document.addEventListener('DOMContentLoaded', function () {
     initSkillsTagInput();
@@ -0,0 +1,207 @@
+import threading
+import time
+from collections import Counter
+from sqlalchemy import event, func, select
+
+def normalize_skill(name):
+    """Case- and whitespace-insensitive identity of a skill or category name"""
+    return ' '.join((name or '').split()).lower()
+
+class _Node:
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children = None  # Created on the first child; most nodes are leaves
+        self.top = ()  # Best (count, key) pairs below this node, most used first
+
+class FrequencyTrie:
+    """
+    Prefix trie whose every node caches its most used completions
+
+    Lookups walk len(prefix) nodes and slice the cached list, so they never
+    depend on how many names share the prefix. Names used fewer than
+    min_count times are counted but kept out of the trie, which keeps
+    one-off typos from costing memory. A name pushed out of a node's list
+    by others only returns to it on the next build, if its count recovers.
+    """
+
+    def __init__(self, top_k=10, min_count=2):
+        self.top_k = top_k
+        self.min_count = min_count
+        self.root = _Node()
+        self.counts = Counter()
+        self.display = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(1 for count in self.counts.values() if count >= self.min_count)
+
+    def add(self, key, delta=1, display=None):
+        """Shift a normalized name's use count and refresh the cached completions on its path"""
+        if not key or not delta:
+            return
+        with self._lock:
+            count = max(0, self.counts[key] + delta)
+            if count:
+                self.counts[key] = count
+                self.display.setdefault(key, display or key)
+            else:
+                self.counts.pop(key, None)
+                self.display.pop(key, None)
+
+            listed = count >= self.min_count
+            node = self.root
+            for char in key:
+                child = node.children.get(char) if node.children else None
+                if child is None:
+                    if not listed:
+                        return
+                    if node.children is None:
+                        node.children = {}
+                    child = node.children[char] = _Node()
+                node = child
+                self._rank(node, key, count if listed else 0)
+
+    def _rank(self, node, key, count):
+        entries = [entry for entry in node.top if entry[1] != key]
+        if count:
+            entries.append((count, key))
+        entries.sort(key=lambda entry: (-entry[0], entry[1]))
+        # Replaced whole, so lock-free readers always see a consistent tuple
+        node.top = tuple(entries[:self.top_k])
+
+    def complete(self, prefix, limit=None):
+        """Most used names starting with prefix, as [(display name, count)]"""
+        node = self.root
+        for char in normalize_skill(prefix):
+            node = node.children.get(char) if node.children else None
+            if node is None:
+                return []
+        return [(self.display.get(key, key), count) for count, key in node.top[:limit or self.top_k]]
+
+    @classmethod
+    def build(cls, rows, top_k=10, min_count=2):
+        """Trie from (name, count) rows; the most used spelling of each name is shown"""
+        counts, spellings = Counter(), {}
+        for name, count in rows:
+            key = normalize_skill(name)
+            if key:
+                counts[key] += count
+                spellings.setdefault(key, Counter())[' '.join(name.split())] += count
+
+        trie = cls(top_k=top_k, min_count=min_count)
+        for key, count in counts.items():
+            trie.add(key, count, spellings[key].most_common(1)[0][0])
+        return trie
+
+class SkillAutocomplete:
+    """
+    In-memory autocomplete for Skill names and categories
+
+    Each worker loads both tries with one GROUP BY on first use, applies
+    the Skill rows its own commits add or delete, and reloads in the
+    background every SKILL_AUTOCOMPLETE_REFRESH_SECONDS to pick up the
+    other workers' writes. Suggestions never query the database.
+    """
+
+    FIELDS = ('name', 'category')
+
+    def __init__(self, app=None):
+        self.app = None
+        self.tries = None
+        self.loaded_at = 0.0
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from models import db
+
+        self.app = app
+        self.refresh_interval = app.config.get('SKILL_AUTOCOMPLETE_REFRESH_SECONDS', 600)
+        self.top_k = app.config.get('SKILL_AUTOCOMPLETE_TOP_K', 10)
+        self.min_count = app.config.get('SKILL_AUTOCOMPLETE_MIN_USES', 2)
+
+        session_class = db.session.session_factory.class_
+        for name, handler in (('after_flush', self._track_flush), ('do_orm_execute', self._track_bulk),
+                              ('after_commit', self._apply_pending), ('after_rollback', self._discard_pending)):
+            if not event.contains(session_class, name, handler):
+                event.listen(session_class, name, handler)
+
+    def suggest(self, prefix, field='name', limit=8):
+        """Most used skill names (or categories) starting with prefix, as [(name, uses)]"""
+        if field not in self.FIELDS or not normalize_skill(prefix):
+            return []
+        if self.tries is None:
+            self.load()
+        elif time.monotonic() - self.loaded_at > self.refresh_interval and not self._refreshing:
+            self._refreshing = True
+            threading.Thread(target=self._refresh, name='skill-autocomplete-refresh', daemon=True).start()
+        return self.tries[field].complete(prefix, limit)
+
+    def load(self):
+        """(Re)build both tries from the skills table and swap them in"""
+        from models import db, Skill
+
+        with self._load_lock:
+            tries = {}
+            for field in self.FIELDS:
+                column = getattr(Skill, field)
+                rows = db.session.execute(
+                    select(column, func.count()).where(column.isnot(None), column != '').group_by(column)
+                ).all()
+                tries[field] = FrequencyTrie.build(rows, top_k=self.top_k, min_count=self.min_count)
+            self.tries = tries
+            self.loaded_at = time.monotonic()
+            return tries
+
+    def _refresh(self):
+        try:
+            with self.app.app_context():
+                self.load()
+        except Exception as e:
+            print(f"Error refreshing skill autocomplete: {e}")
+            self.loaded_at = time.monotonic()  # Retry after another interval
+        finally:
+            self._refreshing = False
+
+    # Incremental updates from this worker's commits
+
+    def _pending(self, session):
+        return session.info.setdefault('skill_autocomplete_deltas', [])
+
+    def _track_flush(self, session, flush_context):
+        from models import Skill
+
+        for objects, delta in ((session.new, 1), (session.deleted, -1)):
+            for obj in objects:
+                if isinstance(obj, Skill):
+                    self._pending(session).append((obj.name, obj.category, delta))
+
+    def _track_bulk(self, orm_execute_state):
+        # The profile editor replaces all skills with Query.delete(); read what it removes
+        from models import Skill
+
+        if not orm_execute_state.is_delete or self.tries is None:
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is None or mapper.class_ is not Skill:
+            return
+        whereclause = orm_execute_state.statement.whereclause
+        query = select(Skill.name, Skill.category)
+        if whereclause is not None:
+            query = query.where(whereclause)
+        removed = orm_execute_state.session.execute(query).all()
+        self._pending(orm_execute_state.session).extend((name, category, -1) for name, category in removed)
+
+    def _apply_pending(self, session):
+        deltas = session.info.pop('skill_autocomplete_deltas', None)
+        if not deltas or self.tries is None:
+            return
+        for name, category, delta in deltas:
+            for field, value in (('name', name), ('category', category)):
+                self.tries[field].add(normalize_skill(value), delta, ' '.join((value or '').split()))
+
+    def _discard_pending(self, session, previous_transaction=None):
+        session.info.pop('skill_autocomplete_deltas', None)
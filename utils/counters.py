@@ -0,0 +1,98 @@
+import atexit
+import os
+import threading
+from utils.database import dialect_insert
+
+def upsert_increments(session, table, rows, key_columns, counter_column):
+    """
+    Add rows' counts to an aggregate table in one statement
+
+    Inserts rows whose key is new and adds counter_column to existing ones
+    (SQLite/PostgreSQL ON CONFLICT, executemany); other dialects fall back
+    to update-then-insert per row. The caller commits.
+    """
+    if not rows:
+        return
+    insert = dialect_insert(session)
+    counter = table.c[counter_column]
+    if insert is not None:
+        statement = insert(table)
+        session.execute(statement.on_conflict_do_update(
+            index_elements=[table.c[name] for name in key_columns],
+            set_={counter_column: counter + statement.excluded[counter_column]}
+        ), rows)
+    else:
+        for row in rows:
+            updated = session.execute(
+                table.update().where(*[table.c[name] == row[name] for name in key_columns])
+                .values({counter_column: counter + row[counter_column]})
+            ).rowcount
+            if not updated:
+                session.execute(table.insert().values(**row))
+
+class BatchFlusher:
+    """
+    Base for per-process buffers written to the database by a background thread
+
+    Subclasses implement _flush_pending(). The thread wakes every
+    flush_interval seconds, or when _wakeup is set, and is re-created in a
+    forked worker on first use there. An atexit hook flushes what is left.
+    """
+
+    thread_name = 'batch-flusher'
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.flush_interval = 10.0
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+        self._atexit_registered = False
+
+    def _start(self, app, enabled, flush_interval):
+        self.app = app
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+        if self.enabled:
+            self._ensure_flusher()
+
+    def _forked(self):
+        """True (once per process) when running in a child forked after the buffer started"""
+        if self._thread_pid == os.getpid():
+            return False
+        if self.enabled:
+            self._ensure_flusher()
+        else:
+            self._thread_pid = os.getpid()
+        return True
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of events written"""
+        with self._flush_lock:
+            if self.app is None:
+                return 0
+            return self._flush_pending()
+
+    def _flush_pending(self):
+        raise NotImplementedError
+
+    def _ensure_flusher(self):
+        if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        self._thread_pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error in {self.thread_name}: {e}")
@@ -0,0 +1,99 @@
+from functools import partial
+from sqlalchemy import event
+
+def database_backend(database_uri):
+    """Dialect family of a database URI: 'sqlite', 'postgresql' or 'other'"""
+    if database_uri.startswith('sqlite'):
+        return 'sqlite'
+    if database_uri.startswith('postgresql'):
+        return 'postgresql'
+    return 'other'
+
+def dialect_insert(executor):
+    """
+    The executor's dialect insert() with ON CONFLICT support, or None
+
+    SQLite and PostgreSQL share on_conflict_do_nothing/do_update; callers
+    fall back to plain statements on other dialects. Works on a Session or
+    a Core Connection.
+    """
+    dialect = getattr(executor, 'dialect', None) or executor.get_bind().dialect
+    if dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    if dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    return None
+
+def is_memory_database(database_uri):
+    return database_uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in database_uri
+
+def engine_options(config, database_uri=None):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS tuned for the configured backend
+
+    Postgres gets an explicitly sized pool and a server-side statement
+    timeout. SQLite gets a driver-level lock wait matching busy_timeout;
+    its pragmas are applied per connection by init_engine_events().
+
+    Args:
+        config: Flask config (or any mapping with the DB_* / SQLITE_* keys)
+        database_uri: URI to tune for (default: SQLALCHEMY_DATABASE_URI)
+
+    Returns:
+        New options dict; the configured SQLALCHEMY_ENGINE_OPTIONS are kept
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    backend = database_backend(database_uri or config['SQLALCHEMY_DATABASE_URI'])
+
+    if backend == 'postgresql':
+        options.setdefault('pool_size', config['DB_POOL_SIZE'])
+        options.setdefault('max_overflow', config['DB_MAX_OVERFLOW'])
+        options.setdefault('pool_timeout', config['DB_POOL_TIMEOUT'])
+        if config.get('DB_STATEMENT_TIMEOUT'):
+            connect_args = dict(options.get('connect_args') or {})
+            connect_args.setdefault('options', f"-c statement_timeout={int(config['DB_STATEMENT_TIMEOUT'])}")
+            options['connect_args'] = connect_args
+    elif backend == 'sqlite':
+        connect_args = dict(options.get('connect_args') or {})
+        connect_args.setdefault('timeout', config['SQLITE_BUSY_TIMEOUT'] / 1000)
+        options['connect_args'] = connect_args
+
+    return options
+
+def replica_binds(config):
+    """SQLALCHEMY_BINDS entries ('replica_0', 'replica_1', ...) for SQLALCHEMY_REPLICA_URIS"""
+    return {
+        f'replica_{i}': dict(engine_options(config, uri), url=uri)
+        for i, uri in enumerate(config.get('SQLALCHEMY_REPLICA_URIS') or [])
+    }
+
+def set_sqlite_pragmas(dbapi_connection, connection_record, config=None, memory=False):
+    """Connection hook: WAL journaling and cache/mmap/lock-wait tuning"""
+    cursor = dbapi_connection.cursor()
+    try:
+        if not memory:
+            # WAL lets readers proceed while a writer holds the write lock
+            cursor.execute(f"PRAGMA journal_mode = {config['SQLITE_JOURNAL_MODE']}")
+            cursor.execute(f"PRAGMA mmap_size = {int(config['SQLITE_MMAP_SIZE'])}")
+        # NORMAL is durable across application crashes in WAL mode; only an OS
+        # crash can lose the last commits
+        cursor.execute(f"PRAGMA synchronous = {config['SQLITE_SYNCHRONOUS']}")
+        cursor.execute(f"PRAGMA cache_size = {int(config['SQLITE_CACHE_SIZE'])}")
+        cursor.execute(f"PRAGMA busy_timeout = {int(config['SQLITE_BUSY_TIMEOUT'])}")
+    finally:
+        cursor.close()
+
+def register_sqlite_pragmas(engine, config):
+    """Apply set_sqlite_pragmas() to every new connection of a SQLite engine"""
+    if engine.dialect.name != 'sqlite':
+        return
+    memory = is_memory_database(str(engine.url))
+    event.listen(engine, 'connect', partial(set_sqlite_pragmas, config=config, memory=memory))
+
+def init_engine_events(app, db):
+    """Register per-connection hooks on every engine of the app"""
+    with app.app_context():
+        for engine in db.engines.values():
+            register_sqlite_pragmas(engine, app.config)
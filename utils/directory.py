@@ -0,0 +1,143 @@
+from collections import Counter
+from sqlalchemy import event, func, inspect, select, text
+from models import db, User, DirectoryFacet, DIRECTORY_LISTED
+from utils.counters import upsert_increments
+
+DIRECTORY_PAGE_SIZE = 24
+DIRECTORY_MAX_PAGE_SIZE = 100
+
+# User columns that place a business in the directory
+FACET_FIELDS = ('role', 'deleted_at', 'business_category', 'state', 'district')
+
+_DELTAS_KEY = 'directory_facet_deltas'
+
+def _facet_key(role, deleted_at, category, state, district):
+    """Facet row a user counts towards, or None if the user is not listed"""
+    if role != 'business' or deleted_at is not None:
+        return None
+    return (category or '', state or '', district or '')
+
+def list_businesses(category=None, state=None, district=None, after_id=None, limit=DIRECTORY_PAGE_SIZE):
+    """
+    One newest-first page of listed businesses
+
+    Served by the partial ix_users_directory* indexes, which hold only
+    listed businesses. A district only narrows the results together with
+    its state.
+
+    Returns:
+        (users, next_cursor) where next_cursor is the after_id of the next page or None
+    """
+    query = select(User).where(text(DIRECTORY_LISTED))
+    if category:
+        query = query.where(User.business_category == category)
+    if state:
+        query = query.where(User.state == state)
+        if district:
+            query = query.where(User.district == district)
+    if after_id:
+        query = query.where(User.id < after_id)
+
+    # Fetch one extra row to learn whether another page exists
+    users = db.session.scalars(query.order_by(User.id.desc()).limit(limit + 1)).all()
+    next_cursor = users[limit - 1].id if len(users) > limit else None
+    return users[:limit], next_cursor
+
+def _facet_counts(column, filters):
+    query = select(column, func.sum(DirectoryFacet.business_count)) \
+        .where(DirectoryFacet.business_count > 0, column != '', *filters) \
+        .group_by(column).order_by(func.sum(DirectoryFacet.business_count).desc(), column)
+    return [{'value': value, 'count': int(count)} for value, count in db.session.execute(query)]
+
+def directory_facets(category=None, state=None, district=None):
+    """
+    Business counts for each filter value, given the other active filters
+
+    Read from the directory_facets counters (one row per category/location
+    combination), never from the users table.
+    """
+    by_category = [DirectoryFacet.state == state] if state else []
+    if state and district:
+        by_category.append(DirectoryFacet.district == district)
+    by_location = [DirectoryFacet.category == category] if category else []
+
+    facets = {
+        'categories': _facet_counts(DirectoryFacet.category, by_category),
+        'states': _facet_counts(DirectoryFacet.state, by_location),
+        'districts': []
+    }
+    if state:
+        facets['districts'] = _facet_counts(DirectoryFacet.district, by_location + [DirectoryFacet.state == state])
+    return facets
+
+# Incremental maintenance
+
+def _previous_value(state, field):
+    history = state.attrs[field].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return state.attrs[field].value
+
+def _track_flush(session, flush_context):
+    deltas = None
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, User):
+            continue
+        state = inspect(obj)
+        if obj in session.new:
+            before = None
+        else:
+            before = _facet_key(*[_previous_value(state, field) for field in FACET_FIELDS])
+        after = None if obj in session.deleted else _facet_key(*[getattr(obj, field) for field in FACET_FIELDS])
+        if before == after:
+            continue
+        deltas = deltas if deltas is not None else session.info.setdefault(_DELTAS_KEY, Counter())
+        if before is not None:
+            deltas[before] -= 1
+        if after is not None:
+            deltas[after] += 1
+
+def _apply_pending(session):
+    session.flush()
+    deltas = session.info.pop(_DELTAS_KEY, None)
+    rows = [dict(zip(('category', 'state', 'district'), key), business_count=delta)
+            for key, delta in sorted((deltas or {}).items()) if delta]
+    upsert_increments(session, DirectoryFacet.__table__, rows, ('category', 'state', 'district'), 'business_count')
+
+def _discard_pending(session, previous_transaction=None):
+    session.info.pop(_DELTAS_KEY, None)
+
+def init_directory(app):
+    """Keep directory_facets in step with every commit that adds, moves or removes a business"""
+    session_class = db.session.session_factory.class_
+    for name, handler in (('after_flush', _track_flush), ('before_commit', _apply_pending),
+                          ('after_rollback', _discard_pending)):
+        if not event.contains(session_class, name, handler):
+            event.listen(session_class, name, handler)
+
+def rebuild_directory_facets(executor=None):
+    """
+    Recount directory_facets from the users table in one transaction
+
+    For the initial fill and to repair drift after bulk SQL that bypassed
+    the ORM. Works on a Session (caller commits) or a Core Connection.
+
+    Returns:
+        Number of facet rows written
+    """
+    executor = executor or db.session
+    table = DirectoryFacet.__table__
+    users = User.__table__
+    counts = select(
+        func.coalesce(users.c.business_category, ''), func.coalesce(users.c.state, ''),
+        func.coalesce(users.c.district, ''), func.count()
+    ).where(text(DIRECTORY_LISTED)).group_by(
+        func.coalesce(users.c.business_category, ''), func.coalesce(users.c.state, ''),
+        func.coalesce(users.c.district, '')
+    )
+    executor.execute(table.delete())
+    return executor.execute(
+        table.insert().from_select(['category', 'state', 'district', 'business_count'], counts)
+    ).rowcount
@@ -0,0 +1,332 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from markupsafe import Markup, escape
+from sqlalchemy import inspect, text, or_
+from models import db, Message, User, PeopleSearchDocument
+
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_TERMS = 8
+
+# Matches ranked per people search; broad terms rank only the newest profiles
+MAX_RANKED_CANDIDATES = 5000
+
+# Snippet highlight markers; control characters cannot occur in profile text
+_MARK_START, _MARK_END = '\x02', '\x03'
+
+_TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+def search_backend(database_uri):
+    """Pick the full-text backend for a database URI: 'sqlite', 'postgresql' or 'like'"""
+    if database_uri.startswith('sqlite'):
+        return 'sqlite'
+    if database_uri.startswith('postgresql'):
+        return 'postgresql'
+    return 'like'
+
+def search_terms(query):
+    """Split free text into at most MAX_SEARCH_TERMS lowercase word tokens"""
+    return [term.lower() for term in _TERM_PATTERN.findall(query or '')][:MAX_SEARCH_TERMS]
+
+def search_index_ready(backend, table, fts_table):
+    """Whether the migrations have built the full-text index search_backend() would use"""
+    inspector = inspect(db.engine)
+    if backend == 'sqlite':
+        return inspector.has_table(fts_table)
+    if backend == 'postgresql':
+        return inspector.has_table(table) and 'search_vector' in {c['name'] for c in inspector.get_columns(table)}
+    return False
+
+def init_message_search(app):
+    """
+    Pick the message search backend for the configured database
+
+    Only inspects the schema: the index is built by migration
+    0013_message_search. Until it has run (or where SQLite lacks FTS5)
+    search falls back to LIKE.
+    """
+    backend = search_backend(app.config['SQLALCHEMY_DATABASE_URI'])
+    if backend != 'like' and not search_index_ready(backend, 'messages', 'messages_fts'):
+        print("Message search index missing (see `python -m migrations status`), falling back to LIKE")
+        backend = 'like'
+    app.config.setdefault('MESSAGE_SEARCH_BACKEND', backend)
+
+def search_messages(recipient_id, query, page=1, per_page=SEARCH_PAGE_SIZE, backend='like'):
+    """
+    Ranked full-text search over one recipient's messages
+
+    Every term must match (as a prefix) in the subject, body, sender name
+    or sender email. Subject hits rank above sender hits, which rank above
+    body hits.
+
+    Args:
+        recipient_id: Inbox owner
+        query: Free-text search string
+        page: 1-based page number
+        per_page: Results per page
+        backend: Value of search_backend() for the current database
+
+    Returns:
+        (messages, has_more) - messages in rank order
+    """
+    terms = search_terms(query)
+    if not terms:
+        return [], False
+
+    page = max(1, page)
+    params = {
+        'recipient_id': recipient_id,
+        'limit': per_page + 1,
+        'offset': (page - 1) * per_page
+    }
+
+    if backend == 'sqlite':
+        # bm25 weights follow the column order: recipient_id, subject, message, name, email
+        params['match'] = 'recipient_id:{rid} AND {{subject message name email}} : ({terms})'.format(
+            rid=int(recipient_id),
+            terms=' AND '.join(f'"{term}"*' for term in terms)
+        )
+        ids = db.session.execute(text(
+            """SELECT m.id FROM messages_fts
+               JOIN messages m ON m.id = messages_fts.rowid
+               WHERE messages_fts MATCH :match AND m.recipient_id = :recipient_id
+               ORDER BY bm25(messages_fts, 0.0, 4.0, 1.0, 2.0, 2.0), m.id DESC
+               LIMIT :limit OFFSET :offset"""
+        ), params).scalars().all()
+    elif backend == 'postgresql':
+        params['tsquery'] = ' & '.join(f'{term}:*' for term in terms)
+        ids = db.session.execute(text(
+            """SELECT id FROM messages
+               WHERE recipient_id = :recipient_id
+                 AND search_vector @@ to_tsquery('simple', :tsquery)
+               ORDER BY ts_rank_cd(search_vector, to_tsquery('simple', :tsquery)) DESC, id DESC
+               LIMIT :limit OFFSET :offset"""
+        ), params).scalars().all()
+    else:
+        conditions = Message.query.filter(Message.recipient_id == recipient_id)
+        for term in terms:
+            pattern = f'%{term}%'
+            conditions = conditions.filter(or_(
+                Message.subject.ilike(pattern), Message.message.ilike(pattern),
+                Message.name.ilike(pattern), Message.email.ilike(pattern)
+            ))
+        ids = [row.id for row in conditions.with_entities(Message.id)
+               .order_by(Message.created_at.desc(), Message.id.desc())
+               .limit(params['limit']).offset(params['offset'])]
+
+    has_more = len(ids) > per_page
+    ids = ids[:per_page]
+    if not ids:
+        return [], has_more
+
+    by_id = {message.id: message for message in Message.query.filter(Message.id.in_(ids))}
+    return [by_id[message_id] for message_id in ids if message_id in by_id], has_more
+
+# People search
+
+PEOPLE_SEARCH_FIELDS = ('full_name', 'tagline', 'bio', 'skills', 'projects', 'experience')
+
+# bm25 column weights, in people_fts column order
+_SQLITE_PEOPLE_WEIGHTS = '10.0, 4.0, 1.0, 6.0, 2.0, 3.0'
+
+def init_people_search(app):
+    """
+    Pick the people search backend and size the result cache
+
+    Like init_message_search, the index itself comes from a migration
+    (0014_people_search_index); search uses LIKE until it exists.
+    """
+    backend = search_backend(app.config['SQLALCHEMY_DATABASE_URI'])
+    if backend != 'like' and not search_index_ready(backend, 'people_search_docs', 'people_fts'):
+        print("People search index missing (see `python -m migrations status`), falling back to LIKE")
+        backend = 'like'
+    app.config.setdefault('PEOPLE_SEARCH_BACKEND', backend)
+    people_search_cache.ttl = app.config.get('PEOPLE_SEARCH_CACHE_SECONDS', 60)
+    people_search_cache.size = app.config.get('PEOPLE_SEARCH_CACHE_SIZE', 1024)
+
+def people_search_document(payload):
+    """Searchable text of a profile snapshot payload, or None if it should not be searchable"""
+    if payload is None or payload['role'] != 'individual':
+        return None
+
+    def join(*parts):
+        return ' '.join(part for part in parts if part)
+
+    return {
+        'full_name': payload['full_name'] or '',
+        'tagline': payload['tagline'] or '',
+        'bio': payload['bio'] or '',
+        'skills': join(*(join(skill['name'], skill['category']) for skill in payload['skills'])),
+        'projects': join(*(join(project['title'], project['description'], project['technologies'])
+                           for project in payload['projects'])),
+        'experience': join(*(join(exp['company_name'], exp['position']) for exp in payload['experiences']))
+    }
+
+def save_people_search_document(user_id, payload, session=None):
+    """Upsert (or drop) a user's search document inside the current transaction"""
+    session = session or db.session
+    table = PeopleSearchDocument.__table__
+    document = people_search_document(payload)
+
+    if document is None:
+        session.execute(table.delete().where(table.c.user_id == user_id))
+        return None
+
+    values = dict(document, user_id=user_id, updated_at=datetime.utcnow())
+    current = session.execute(
+        text('SELECT full_name, tagline, bio, skills, projects, experience FROM people_search_docs WHERE user_id = :id'),
+        {'id': user_id}
+    ).first()
+    if current is None:
+        session.execute(table.insert().values(**values))
+    elif tuple(current) != tuple(document[field] for field in PEOPLE_SEARCH_FIELDS):
+        # Only real text changes touch the FTS index
+        session.execute(table.update().where(table.c.user_id == user_id).values(**values))
+    return document
+
+class SearchResultCache:
+    """
+    Small per-process LRU of ranked result pages with a time-to-live
+
+    Ranking a term that matches a large share of profiles is the slow case,
+    and those broad terms are also the most repeated queries. Entries are
+    never invalidated, so a profile edit shows up in results within ttl.
+    """
+
+    def __init__(self, ttl=60, size=1024):
+        self.ttl = ttl
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+people_search_cache = SearchResultCache()
+
+def _highlight(snippet):
+    """Escape user text and turn the snippet markers into <mark> tags"""
+    if not snippet:
+        return Markup('')
+    return Markup(str(escape(snippet)).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>'))
+
+def search_people(query, page=1, per_page=SEARCH_PAGE_SIZE, backend='like', cache=None,
+                  max_candidates=MAX_RANKED_CANDIDATES):
+    """
+    Ranked full-text search over individuals' profiles
+
+    Every term must match (as a prefix) somewhere in the name, tagline,
+    bio, skills, projects or experience. Name and skill hits rank highest,
+    bio hits lowest (BM25 on SQLite, ts_rank_cd on Postgres). Soft-deleted
+    accounts are excluded through the small ix_users_deleted_at index
+    rather than a per-match join.
+
+    Scoring costs time per matching profile, so a term matching more than
+    max_candidates profiles is ranked over the newest max_candidates of
+    them only, which bounds the slowest (broadest) searches. Pass a
+    SearchResultCache to reuse recently ranked pages.
+
+    Returns:
+        (results, has_more) - results are (user, snippet) pairs in rank
+        order, snippet being escaped HTML with the matches in <mark>
+    """
+    terms = search_terms(query)
+    if not terms:
+        return [], False
+
+    page = max(1, page)
+    key = (backend, tuple(terms), page, per_page, max_candidates)
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        rows, has_more = cached
+    else:
+        rows, has_more = _rank_people(terms, page, per_page, backend, max_candidates)
+        if cache is not None:
+            cache.put(key, (rows, has_more))
+    if not rows:
+        return [], has_more
+
+    users = {user.id: user for user in User.query.filter(User.id.in_([user_id for user_id, _ in rows]))}
+    return [(users[user_id], _highlight(snippet)) for user_id, snippet in rows if user_id in users], has_more
+
+def _rank_people(terms, page, per_page, backend, max_candidates=MAX_RANKED_CANDIDATES):
+    """One page of (user_id, raw snippet) in rank order, plus whether more pages exist"""
+    params = {'limit': per_page + 1, 'offset': (page - 1) * per_page, 'candidates': max_candidates}
+
+    if backend == 'sqlite':
+        params['match'] = ' AND '.join(f'"{term}"*' for term in terms)
+        # The newest candidates are a rowid range, which FTS5 can seek to; the floor
+        # query walks rowids downwards and stops, without scoring anything
+        rows = db.session.execute(text(
+            f"""SELECT people_fts.rowid,
+                       snippet(people_fts, -1, '{_MARK_START}', '{_MARK_END}', '…', 16)
+                FROM people_fts
+                WHERE people_fts MATCH :match
+                  AND people_fts.rowid >= coalesce((
+                      SELECT rowid FROM people_fts WHERE people_fts MATCH :match
+                      ORDER BY rowid DESC LIMIT 1 OFFSET :candidates - 1
+                  ), 0)
+                  AND people_fts.rowid NOT IN (SELECT id FROM users WHERE deleted_at IS NOT NULL)
+                ORDER BY bm25(people_fts, {_SQLITE_PEOPLE_WEIGHTS}), people_fts.rowid
+                LIMIT :limit OFFSET :offset"""
+        ), params).all()
+    elif backend == 'postgresql':
+        params['tsquery'] = ' & '.join(f'{term}:*' for term in terms)
+        # ts_headline re-parses the text, so it only runs on the page's rows
+        rows = db.session.execute(text(
+            f"""SELECT ranked.user_id,
+                       ts_headline('simple', concat_ws(' … ', d.full_name, d.skills, d.tagline,
+                                                       d.experience, d.projects, d.bio),
+                                   to_tsquery('simple', :tsquery),
+                                   'StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords=16, MinWords=6')
+                FROM (
+                    SELECT c.user_id, ts_rank_cd(c.search_vector, to_tsquery('simple', :tsquery)) AS rank
+                    FROM (
+                        SELECT d.user_id, d.search_vector
+                        FROM people_search_docs d
+                        WHERE d.search_vector @@ to_tsquery('simple', :tsquery)
+                          AND d.user_id NOT IN (SELECT id FROM users WHERE deleted_at IS NOT NULL)
+                        ORDER BY d.user_id DESC
+                        LIMIT :candidates
+                    ) c
+                    ORDER BY rank DESC, c.user_id
+                    LIMIT :limit OFFSET :offset
+                ) ranked
+                JOIN people_search_docs d ON d.user_id = ranked.user_id
+                ORDER BY ranked.rank DESC, ranked.user_id"""
+        ), params).all()
+    else:
+        docs = PeopleSearchDocument.query.join(User, User.id == PeopleSearchDocument.user_id) \
+            .filter(User.deleted_at.is_(None))
+        for term in terms:
+            pattern = f'%{term}%'
+            docs = docs.filter(or_(*[getattr(PeopleSearchDocument, field).ilike(pattern)
+                                     for field in PEOPLE_SEARCH_FIELDS]))
+        rows = [(doc.user_id, doc.tagline or doc.skills[:120])
+                for doc in docs.order_by(PeopleSearchDocument.user_id)
+                .limit(params['limit']).offset(params['offset'])]
+
+    return [tuple(row) for row in rows[:per_page]], len(rows) > per_page
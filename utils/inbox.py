@@ -0,0 +1,225 @@
+import base64
+import csv
+import io
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+from models import db, User, Message
+
+INBOX_PAGE_SIZE = 50
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+EXPORT_COLUMNS = ('id', 'created_at', 'name', 'email', 'phone', 'subject', 'message', 'is_read', 'archived_at')
+EXPORT_BATCH_SIZE = 1000
+
+# Bulk operations touch at most this many rows per request
+BULK_ACTIONS = ('read', 'unread', 'archive', 'unarchive', 'delete')
+BULK_MAX_ROWS = 5000
+
+def encode_cursor(message):
+    """Encode a message's (created_at, id) position as an opaque URL-safe cursor"""
+    raw = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor back into (created_at, id), or None if it is malformed"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, message_id = base64.urlsafe_b64decode(padded).decode('utf-8').split('|', 1)
+        return datetime.fromisoformat(created_at), int(message_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def paginate_inbox(recipient_id, cursor=None, limit=INBOX_PAGE_SIZE, archived=False):
+    """
+    Fetch one page of a recipient's inbox, newest first
+
+    Uses keyset pagination over (recipient_id, created_at, id), which is
+    served directly by ix_messages_recipient_created_id, so deep pages cost
+    the same as the first one.
+
+    Args:
+        recipient_id: Inbox owner
+        cursor: Value from a previous page's next_cursor, or None for the newest page
+        limit: Page size
+        archived: List the archive instead of the inbox
+
+    Returns:
+        (messages, next_cursor) - next_cursor is None on the last page
+    """
+    query = Message.query.filter(Message.recipient_id == recipient_id)
+    if archived:
+        query = query.filter(Message.archived_at.isnot(None))
+    else:
+        query = query.filter(Message.archived_at.is_(None))
+
+    position = decode_cursor(cursor)
+    if position:
+        created_at, message_id = position
+        query = query.filter(or_(
+            Message.created_at < created_at,
+            and_(Message.created_at == created_at, Message.id < message_id)
+        ))
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1).all()
+
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+def adjust_unread_count(user_id, delta):
+    """Atomically shift a user's unread counter (caller commits)"""
+    if delta:
+        User.query.filter_by(id=user_id).update(
+            {User.unread_message_count: User.unread_message_count + delta},
+            synchronize_session=False
+        )
+
+def recount_unread(user_id):
+    """Recompute a user's unread counter from the messages table (caller commits)"""
+    count = Message.query.filter_by(recipient_id=user_id, is_read=False).count()
+    User.query.filter_by(id=user_id).update(
+        {User.unread_message_count: count},
+        synchronize_session=False
+    )
+    return count
+
+def bulk_update_messages(recipient_id, action, ids=None, older_than=None, sender=None, limit=BULK_MAX_ROWS):
+    """
+    Apply one action to many messages with a single UPDATE or DELETE
+
+    Messages are selected by id list and/or filters; at least one selector
+    is required so a malformed request can never touch the whole inbox.
+    Rows the action would not change are excluded up front, so the row cap
+    only counts real work and repeating a capped request continues where
+    the previous one stopped.
+
+    Archiving also marks a message read, which keeps the unread counter
+    equal to the number of unread messages in the inbox.
+
+    Args:
+        recipient_id: Inbox owner
+        action: One of BULK_ACTIONS
+        ids: Message ids to target
+        older_than: Only messages created before this datetime
+        sender: Only messages from this email address (case-insensitive)
+        limit: Row cap, never above BULK_MAX_ROWS
+
+    Returns:
+        Number of rows affected (caller commits)
+    """
+    if action not in BULK_ACTIONS:
+        raise ValueError(f"Unknown action. Allowed: {', '.join(BULK_ACTIONS)}")
+    if not (ids or older_than or sender):
+        raise ValueError("Select messages by id, age or sender")
+
+    selector = db.select(Message.id).where(Message.recipient_id == recipient_id)
+    if ids:
+        selector = selector.where(Message.id.in_([int(message_id) for message_id in ids]))
+    if older_than:
+        selector = selector.where(Message.created_at < older_than)
+    if sender:
+        selector = selector.where(db.func.lower(Message.email) == sender.strip().lower())
+
+    if action == 'read':
+        selector = selector.where(Message.is_read.is_(False))
+        values = {Message.is_read: True}
+    elif action == 'unread':
+        selector = selector.where(Message.is_read.is_(True), Message.archived_at.is_(None))
+        values = {Message.is_read: False}
+    elif action == 'archive':
+        selector = selector.where(Message.archived_at.is_(None))
+        values = {Message.archived_at: datetime.utcnow(), Message.is_read: True}
+    elif action == 'unarchive':
+        selector = selector.where(Message.archived_at.isnot(None))
+        values = {Message.archived_at: None}
+
+    # A LIMITed id subquery keeps this one statement on both SQLite and Postgres
+    selector = selector.order_by(Message.id).limit(max(1, min(limit, BULK_MAX_ROWS)))
+
+    if action == 'delete':
+        statement = db.delete(Message).where(Message.id.in_(selector))
+    else:
+        statement = db.update(Message).where(Message.id.in_(selector)).values(values)
+
+    affected = db.session.execute(statement, execution_options={'synchronize_session': False}).rowcount
+
+    if action == 'read':
+        adjust_unread_count(recipient_id, -affected)
+    elif action == 'unread':
+        adjust_unread_count(recipient_id, affected)
+    elif affected and action in ('archive', 'delete'):
+        recount_unread(recipient_id)
+
+    return affected
+
+def _csv_safe(value):
+    """Neutralise values a spreadsheet would evaluate as a formula"""
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + value
+    return value
+
+def iter_message_export(recipient_id, fmt, start=None, end=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yield a recipient's messages as CSV or JSON Lines text chunks
+
+    Plain column rows are read through a server-side cursor
+    (stream_results/yield_per; a named cursor on Postgres), and each batch
+    is encoded and yielded before the next is fetched. Memory use stays
+    flat regardless of inbox size and the first bytes go out immediately.
+
+    Args:
+        recipient_id: Inbox owner
+        fmt: 'csv' or 'jsonl'
+        start: Only messages created at or after this datetime
+        end: Only messages created before this datetime
+        batch_size: Rows fetched and encoded per chunk
+
+    Yields:
+        str chunks
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format. Allowed: {', '.join(EXPORT_FORMATS)}")
+
+    columns = [getattr(Message, column) for column in EXPORT_COLUMNS]
+    statement = db.select(*columns).where(Message.recipient_id == recipient_id)
+    if start:
+        statement = statement.where(Message.created_at >= start)
+    if end:
+        statement = statement.where(Message.created_at < end)
+    statement = statement.order_by(Message.created_at, Message.id)
+
+    result = db.session.execute(
+        statement,
+        execution_options={'stream_results': True, 'yield_per': batch_size}
+    )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+
+    try:
+        for rows in result.partitions():
+            for row in rows:
+                record = dict(zip(EXPORT_COLUMNS, row))
+                for key in ('created_at', 'archived_at'):
+                    if record[key]:
+                        record[key] = record[key].isoformat()
+                if writer:
+                    writer.writerow([_csv_safe(record[column]) for column in EXPORT_COLUMNS])
+                else:
+                    buffer.write(json.dumps(record, ensure_ascii=False))
+                    buffer.write('\n')
+
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+        # Header-only CSV when the range is empty
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        result.close()
@@ -0,0 +1,283 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy.exc import DataError, IntegrityError
+from utils.counters import BatchFlusher
+
+# A row the database refuses (too long, bad value, vanished recipient) or a
+# malformed record; anything else, such as a lost connection, is retried
+_REJECTED_ROW_ERRORS = (DataError, IntegrityError, KeyError, TypeError, ValueError)
+
+class ContactIngestBuffer(BatchFlusher):
+    """
+    Write-behind buffer for contact-form submissions
+
+    submit() appends the submission to a per-process append log on local
+    disk and returns immediately. A background flusher seals the log every
+    CONTACT_INGEST_FLUSH_INTERVAL seconds (or as soon as
+    CONTACT_INGEST_BATCH_SIZE submissions are waiting) and inserts the whole
+    segment in one executemany transaction.
+
+    Duplicates (same recipient, sender email and body within
+    CONTACT_INGEST_DEDUPE_WINDOW seconds) are dropped twice: in memory at
+    submit time, and against the messages table at flush time, which also
+    covers other workers and replays after a crash.
+
+    Segments left behind by a dead process are claimed by atomic rename and
+    replayed by whichever process flushes next. If the database rejects a
+    batch, its rows are retried one at a time and the ones still rejected
+    are moved to dead-letter/ in the ingest directory, so one bad
+    submission never holds back the rest of its segment.
+    """
+
+    thread_name = 'contact-ingest-flusher'
+
+    def __init__(self, app=None):
+        super().__init__()
+        self._token = None
+        self._lock = threading.Lock()
+        self._segment = None
+        self._segment_path = None
+        self._sequence = 0
+        self._pending = 0
+        self._recent = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        enabled = app.config.get('CONTACT_INGEST_ENABLED', True)
+        flush_interval = app.config.get('CONTACT_INGEST_FLUSH_INTERVAL', 2.0)
+        self.directory = app.config['CONTACT_INGEST_DIR']
+        self.batch_size = app.config.get('CONTACT_INGEST_BATCH_SIZE', 200)
+        self.window = app.config.get('CONTACT_INGEST_DEDUPE_WINDOW', 600)
+        self.fsync = app.config.get('CONTACT_INGEST_FSYNC', True)
+        # Segments untouched for this long belong to a dead process
+        self.recovery_age = max(30.0, flush_interval * 10)
+
+        if enabled:
+            os.makedirs(self.directory, exist_ok=True)
+        self._start(app, enabled, flush_interval)
+
+    @staticmethod
+    def dedupe_key(recipient_id, email, message):
+        """Identity of a submission for duplicate detection"""
+        normalized = ' '.join((message or '').split()).lower()
+        raw = f"{recipient_id}\0{(email or '').strip().lower()}\0{normalized}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def submit(self, recipient_id, name, email, phone, subject, message):
+        """
+        Accept a contact submission
+
+        Returns:
+            False if it was dropped as a duplicate, True otherwise
+        """
+        key = self.dedupe_key(recipient_id, email, message)
+        record = {
+            'recipient_id': recipient_id,
+            'name': name,
+            'email': email,
+            'phone': phone,
+            'subject': subject,
+            'message': message,
+            'created_at': datetime.utcnow().isoformat()
+        }
+
+        now = time.time()
+        with self._lock:
+            seen = self._recent.get(key)
+            if seen is not None and now - seen < self.window:
+                return False
+            self._recent[key] = now
+
+            if self.enabled:
+                self._ensure_flusher()
+                self._append(record)
+                self._pending += 1
+                if self._pending >= self.batch_size:
+                    self._wakeup.set()
+                return True
+
+        # Synchronous mode still goes through the same dedupe and insert path
+        return self._write_batch([record]) > 0
+
+    def flush(self):
+        """Seal the active segment and write every claimable segment to the table"""
+        with self._lock:
+            self._seal()
+            cutoff = time.time() - self.window
+            self._recent = {key: seen for key, seen in self._recent.items() if seen >= cutoff}
+
+        if not self.enabled:
+            return 0
+        return super().flush()
+
+    def _flush_pending(self):
+        written, error = 0, None
+        for path in self._claim_segments():
+            try:
+                written += self._write_segment(path)
+            except Exception as e:
+                error = error or e  # Left on disk for the next cycle; carry on with the others
+        if error is not None:
+            raise error
+        return written
+
+    # Segment files
+
+    def _process_token(self):
+        # Re-derived after fork so parent and child never share a segment name
+        if self._token is None or not self._token.startswith(f"{os.getpid()}-"):
+            self._token = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            self._segment = None
+            self._pending = 0
+        return self._token
+
+    def _append(self, record):
+        token = self._process_token()
+        if self._segment is None:
+            self._segment_path = os.path.join(self.directory, f"{token}.log")
+            self._segment = open(self._segment_path, 'a', encoding='utf-8')
+        self._segment.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._segment.flush()
+        if self.fsync:
+            os.fsync(self._segment.fileno())
+
+    def _seal(self):
+        """Close the active segment and rename it so the flusher can take it (lock held)"""
+        if self._segment is None:
+            return
+        self._segment.close()
+        self._sequence += 1
+        os.replace(self._segment_path, f"{self._segment_path[:-4]}-{self._sequence}.sealed")
+        self._segment = None
+        self._pending = 0
+
+    def _claim_segments(self):
+        """Own sealed segments, plus segments of dead processes claimed by rename"""
+        token = self._process_token()
+        claimed = []
+        now = time.time()
+
+        for path in sorted(glob.glob(os.path.join(self.directory, '*'))):
+            name = os.path.basename(path)
+            if not name.endswith(('.log', '.sealed')):
+                continue
+            if name.startswith(f"{token}-") and name.endswith('.sealed'):
+                # Keep our pending segments fresh so nobody mistakes them for orphans
+                os.utime(path)
+                claimed.append(path)
+                continue
+            if name.startswith(token):
+                continue  # Our own active segment
+            try:
+                if now - os.path.getmtime(path) < self.recovery_age:
+                    continue
+                target = os.path.join(self.directory, f"{token}-recovered-{name}.sealed")
+                os.replace(path, target)
+                claimed.append(target)
+            except FileNotFoundError:
+                continue  # Another process claimed it first
+
+        return claimed
+
+    def _write_segment(self, path):
+        records = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # Torn last line from a crash mid-write
+        try:
+            written = self._write_batch(records) if records else 0
+        except _REJECTED_ROW_ERRORS:
+            written, rejected = 0, []
+            for record in records:
+                try:
+                    written += self._write_batch([record])
+                except _REJECTED_ROW_ERRORS as e:
+                    rejected.append((record, e))
+            self._dead_letter(path, rejected)
+        os.remove(path)
+        return written
+
+    def _dead_letter(self, path, rejected):
+        """Keep submissions the database refused, with the reason, for manual review"""
+        if not rejected:
+            return
+        directory = os.path.join(self.directory, 'dead-letter')
+        os.makedirs(directory, exist_ok=True)
+        target = os.path.join(directory, f"{os.path.basename(path).rsplit('.', 1)[0]}.jsonl")
+        with open(target, 'a', encoding='utf-8') as f:
+            for record, error in rejected:
+                entry = {key: value for key, value in record.items() if key != 'key'}
+                if isinstance(entry.get('created_at'), datetime):
+                    entry['created_at'] = entry['created_at'].isoformat()
+                entry['error'] = f"{type(error).__name__}: {getattr(error, 'orig', None) or error}"
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        print(f"Error storing {len(rejected)} contact submission(s), moved to {target}")
+
+    # Database
+
+    def _write_batch(self, records):
+        """Drop duplicates and insert the rest in one transaction; returns rows inserted"""
+        from models import db, User, Message
+        from utils.inbox import adjust_unread_count
+
+        for record in records:
+            record['created_at'] = datetime.fromisoformat(record['created_at']) \
+                if isinstance(record['created_at'], str) else record['created_at']
+            record['key'] = self.dedupe_key(record['recipient_id'], record['email'], record['message'])
+
+        window = timedelta(seconds=self.window)
+        recipient_ids = {record['recipient_id'] for record in records}
+        since = min(record['created_at'] for record in records) - window
+
+        with self.app.app_context():
+            try:
+                live_recipients = set(db.session.scalars(
+                    db.select(User.id).where(User.id.in_(recipient_ids))
+                ))
+
+                # Latest stored timestamp per key among recent messages to the same recipients
+                last_seen = {}
+                existing = db.session.execute(
+                    db.select(Message.recipient_id, Message.email, Message.message, Message.created_at)
+                    .where(Message.recipient_id.in_(recipient_ids), Message.created_at >= since)
+                )
+                for recipient_id, email, message, created_at in existing:
+                    key = self.dedupe_key(recipient_id, email, message)
+                    last_seen[key] = max(created_at, last_seen.get(key, created_at))
+
+                rows = []
+                for record in sorted(records, key=lambda r: r['created_at']):
+                    if record['recipient_id'] not in live_recipients:
+                        continue
+                    previous = last_seen.get(record['key'])
+                    if previous is not None and abs(record['created_at'] - previous) < window:
+                        continue
+                    last_seen[record['key']] = record['created_at']
+                    rows.append({column: record[column] for column in (
+                        'recipient_id', 'name', 'email', 'phone', 'subject', 'message', 'created_at'
+                    )})
+
+                if rows:
+                    db.session.execute(db.insert(Message), rows)
+                    for recipient_id, count in Counter(row['recipient_id'] for row in rows).items():
+                        adjust_unread_count(recipient_id, count)
+                db.session.commit()
+                return len(rows)
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
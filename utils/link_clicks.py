@@ -0,0 +1,242 @@
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import event, func, select
+from utils.counters import BatchFlusher, upsert_increments
+
+# Link kinds: token prefix -> stored kind. Stored kinds match link_click_daily.kind
+TOKEN_KINDS = {'s': 'social', 'p': 'project', 'e': 'experience', 'o': 'other', 'w': 'previous_work'}
+KIND_CODES = {kind: code for code, kind in TOKEN_KINDS.items()}
+
+def _link_models():
+    from models import (SocialLink, Project, ProjectLink, Experience, ExperienceLink, Other, OtherLink,
+                        PreviousWork, PreviousWorkLink)
+
+    # kind -> (link model, parent model or None, foreign key to the parent)
+    return {
+        'social': (SocialLink, None, None),
+        'project': (ProjectLink, Project, 'project_id'),
+        'experience': (ExperienceLink, Experience, 'experience_id'),
+        'other': (OtherLink, Other, 'other_id'),
+        'previous_work': (PreviousWorkLink, PreviousWork, 'previous_work_id'),
+    }
+
+class LinkClickBuffer(BatchFlusher):
+    """
+    Signed /go/<token> redirects for profile links, with buffered click counts
+
+    Profile templates render outbound links through outbound_url(), which
+    signs the link's kind, id, owner and target URL into the token, so
+    whichever worker gets the click redirects without touching the
+    database. Tokens older than LINK_REDIRECT_CACHE_SECONDS (a copied link,
+    a page left open) and links this worker has seen change are looked up
+    instead: one indexed query, then cached for the same time. Clicks are
+    appended to a deque (atomic in CPython, so recording takes no lock) and
+    a background thread drains it into the link_click_daily aggregates in
+    one executemany upsert.
+    """
+
+    thread_name = 'link-click-flusher'
+
+    def __init__(self, app=None):
+        super().__init__()
+        self.signer = None
+        self.cache_seconds = 300
+        self.cache_size = 50000
+        self.max_pending = 5000
+        self._targets = {}
+        self._revocations = {}
+        self._clicks = deque()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from models import db
+
+        self.signer = URLSafeTimedSerializer(app.config['SECRET_KEY'], salt='outbound-link')
+        self.cache_seconds = app.config.get('LINK_REDIRECT_CACHE_SECONDS', 300)
+        self.cache_size = app.config.get('LINK_REDIRECT_CACHE_SIZE', 50000)
+        self.max_pending = app.config.get('LINK_CLICKS_MAX_PENDING', 5000)
+        app.add_template_global(self.outbound_url, 'outbound_url')
+
+        session_class = db.session.session_factory.class_
+        for name, handler in (('after_flush', self._track_flush), ('after_commit', self._evict_pending),
+                              ('after_rollback', self._discard_pending)):
+            if not event.contains(session_class, name, handler):
+                event.listen(session_class, name, handler)
+
+        self._start(app, app.config.get('LINK_CLICKS_ENABLED', True),
+                    app.config.get('LINK_CLICKS_FLUSH_INTERVAL', 30.0))
+
+    # Tokens and targets
+
+    def outbound_url(self, kind, link, user_id):
+        """Tracked URL of a rendered link"""
+        from flask import url_for
+
+        return url_for('profile.go', token=self.sign(kind, link.id, link.url, user_id))
+
+    def sign(self, kind, link_id, url, user_id):
+        return self.signer.dumps([KIND_CODES[kind], link_id, user_id, url])
+
+    def unsign(self, token):
+        """(kind, link id, url, owner user id, seconds since signing) of a valid token, or None"""
+        try:
+            (code, link_id, user_id, url), signed_at = self.signer.loads(token, return_timestamp=True)
+        except (BadSignature, TypeError, ValueError):
+            return None
+        kind = TOKEN_KINDS.get(code)
+        if kind is None:
+            return None
+        return kind, link_id, url, user_id, time.time() - signed_at.timestamp()
+
+    def _remember(self, kind, link_id, url, user_id):
+        targets = self._targets
+        if len(targets) >= self.cache_size:
+            try:
+                # Oldest entry first (dicts keep insertion order)
+                targets.pop(next(iter(targets)), None)
+            except (StopIteration, RuntimeError):
+                pass
+        targets[(kind, link_id)] = (url, user_id, time.monotonic() + self.cache_seconds)
+
+    def resolve(self, kind, link_id, url=None, user_id=None, age=None):
+        """
+        (url, owner user id) of a link, or None if it no longer exists
+
+        The target signed into a token (url, user_id, age) is used as is
+        while the token is younger than LINK_REDIRECT_CACHE_SECONDS, unless
+        this worker has since committed a change to the link or its owner.
+        """
+        now = time.monotonic()
+        if not any(self._revocations.get(key, 0) > now for key in ((kind, link_id), ('user', user_id))):
+            if url is not None and age is not None and age < self.cache_seconds:
+                return url, user_id
+            target = self._targets.get((kind, link_id))
+            if target is not None and target[2] > now:
+                return target[0], target[1]
+
+        from models import db, User
+
+        model, parent, foreign_key = _link_models()[kind]
+        if parent is None:
+            query = select(model.url, model.user_id)
+            owner = model.user_id
+        else:
+            query = select(model.url, parent.user_id).join(parent, parent.id == getattr(model, foreign_key))
+            owner = parent.user_id
+        row = db.session.execute(
+            query.join(User, User.id == owner).where(model.id == link_id, User.deleted_at.is_(None))
+        ).first()
+        if row is None:
+            self._targets.pop((kind, link_id), None)
+            return None
+        self._remember(kind, link_id, row[0], row[1])
+        return row[0], row[1]
+
+    # Clicks
+
+    def record(self, user_id, kind, link_id, when=None):
+        """Count one click on a link; never blocks on other requests"""
+        if self._forked():
+            # Clicks copied into a forked child belong to the parent
+            self._clicks = deque()
+        self._clicks.append((user_id, (when or datetime.utcnow()).date(), kind, link_id))
+        if len(self._clicks) >= self.max_pending:
+            self._wakeup.set()
+
+    def pending(self):
+        return len(self._clicks)
+
+    def _flush_pending(self):
+        from models import db, LinkClickDaily
+
+        clicks, counts = self._clicks, Counter()
+        while True:
+            try:
+                counts[clicks.popleft()] += 1
+            except IndexError:
+                break
+        if not counts:
+            return 0
+        rows = [{'user_id': user_id, 'day': day, 'kind': kind, 'link_id': link_id, 'clicks': n}
+                for (user_id, day, kind, link_id), n in sorted(counts.items())]
+        try:
+            with self.app.app_context():
+                try:
+                    upsert_increments(db.session, LinkClickDaily.__table__, rows,
+                                      ('user_id', 'day', 'kind', 'link_id'), 'clicks')
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+                finally:
+                    db.session.remove()
+        except Exception:
+            for key, n in counts.items():
+                clicks.extend([key] * n)
+            raise
+        return sum(counts.values())
+
+    # Edited or deleted links and soft-deleted owners are revoked in this worker
+    # when the change commits: the cached target goes, and tokens signed before
+    # are looked up again. Other workers see it after LINK_REDIRECT_CACHE_SECONDS
+
+    def _track_flush(self, session, flush_context):
+        from models import User
+
+        kinds = {model: kind for kind, (model, parent, foreign_key) in _link_models().items()}
+        for obj in list(session.dirty) + list(session.deleted):
+            kind = kinds.get(type(obj))
+            if kind is not None:
+                session.info.setdefault('link_cache_evictions', set()).add((kind, obj.id))
+            elif isinstance(obj, User) and obj.deleted_at is not None:
+                session.info.setdefault('link_cache_evictions', set()).add(('user', obj.id))
+
+    def _evict_pending(self, session):
+        evictions = session.info.pop('link_cache_evictions', ())
+        if not evictions:
+            return
+        now = time.monotonic()
+        if len(self._revocations) >= self.cache_size:
+            self._revocations = {key: until for key, until in self._revocations.items() if until > now}
+        for key in evictions:
+            self._targets.pop(key, None)
+            self._revocations[key] = now + self.cache_seconds
+
+    def _discard_pending(self, session, previous_transaction=None):
+        session.info.pop('link_cache_evictions', None)
+
+def link_click_stats(user_id, days=30, today=None):
+    """
+    Clicks on each of a user's links over the last `days` days, most clicked first
+
+    Read from the link_click_daily aggregates; links deleted since are
+    reported without label or url.
+    """
+    from models import db, LinkClickDaily
+
+    today = today or datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    rows = db.session.execute(
+        select(LinkClickDaily.kind, LinkClickDaily.link_id, func.sum(LinkClickDaily.clicks))
+        .where(LinkClickDaily.user_id == user_id, LinkClickDaily.day >= start)
+        .group_by(LinkClickDaily.kind, LinkClickDaily.link_id)
+    ).all()
+
+    ids_by_kind = {}
+    for kind, link_id, clicks in rows:
+        ids_by_kind.setdefault(kind, []).append(link_id)
+    details = {}
+    for kind, ids in ids_by_kind.items():
+        model = _link_models()[kind][0]
+        for link in db.session.scalars(select(model).where(model.id.in_(ids))):
+            label = getattr(link, 'label', None) or getattr(link, 'platform', None)
+            details[(kind, link.id)] = {'label': label, 'url': link.url}
+
+    links = [dict(kind=kind, id=link_id, clicks=int(clicks),
+                  **details.get((kind, link_id), {'label': None, 'url': None}))
+             for kind, link_id, clicks in rows]
+    links.sort(key=lambda link: (-link['clicks'], link['kind'], link['id']))
+    return {'days': days, 'total': sum(link['clicks'] for link in links), 'links': links}
@@ -0,0 +1,30 @@
+import re
+
+# Video URL formats we can embed, as (provider, compiled pattern capturing the id)
+VIDEO_PATTERNS = (
+    ('youtube', re.compile(
+        r'^(?:https?://)?(?:www\.|m\.|music\.)?'
+        r'(?:youtube(?:-nocookie)?\.com/(?:watch\?(?:[^#]*&)?v=|embed/|shorts/|live/|v/)|youtu\.be/)'
+        r'([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])',
+        re.IGNORECASE
+    )),
+)
+
+def parse_video_url(url):
+    """
+    Identify the video behind a URL
+
+    Args:
+        url: URL pasted by the user (may be None or blank)
+
+    Returns:
+        (provider, video_id), or (None, None) if the URL is not a supported video
+    """
+    if not url:
+        return None, None
+    url = url.strip()
+    for provider, pattern in VIDEO_PATTERNS:
+        match = pattern.match(url)
+        if match:
+            return provider, match.group(1)
+    return None, None
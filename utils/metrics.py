@@ -0,0 +1,315 @@
+import glob
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import Counter
+from flask import Response, abort, before_render_template, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from utils.counters import BatchFlusher
+
+# Histogram upper bounds (+Inf is implied)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)  # SQL statements per request
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# The request being timed on this thread; SQL events only touch this
+_current = threading.local()
+
+class _RequestTimer:
+    __slots__ = ('started', 'query_started', 'sql_queries', 'sql_seconds', 'template_seconds', 'template_starts')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_started = None
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_starts = []
+
+class _EndpointStats:
+    __slots__ = ('requests', 'seconds', 'latency', 'sql_queries', 'sql_seconds', 'query_counts',
+                 'template_seconds', 'bytes')
+
+    def __init__(self):
+        self.requests = 0
+        self.seconds = 0.0
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)  # Per bucket, not cumulative
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.query_counts = [0] * (len(QUERY_COUNT_BUCKETS) + 1)
+        self.template_seconds = 0.0
+        self.bytes = 0
+
+    def merge(self, data):
+        for name in self.__slots__:
+            value = data.get(name)
+            if value is None:
+                continue
+            if isinstance(value, list):
+                setattr(self, name, [a + b for a, b in zip(getattr(self, name), value)])
+            else:
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class RequestMetrics(BatchFlusher):
+    """
+    Per-endpoint request, SQL and template timings, exposed on /metrics
+
+    Each worker aggregates in memory (a lock around a few additions per
+    request; SQL statements only bump fields of a thread-local timer) and a
+    background thread writes its totals to METRICS_DIR/<worker>.json every
+    METRICS_WRITE_INTERVAL seconds. /metrics sums the files of all workers,
+    so any worker can answer a scrape. The totals of a worker that has not
+    written for a while (it exited or was killed) are folded into the
+    scraping worker's own, so counters never go backwards and the directory
+    does not grow with worker restarts.
+
+    Off unless METRICS_ENABLED is set, so scripts, migrations and tests do
+    not write worker files. /metrics answers 404 until METRICS_TOKEN is
+    set, then requires it as a bearer token.
+    """
+
+    thread_name = 'metrics-writer'
+
+    def __init__(self, app=None):
+        super().__init__()
+        self.directory = None
+        self.token = None
+        self._token = None
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._statuses = Counter()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from extensions import limiter
+
+        if not app.config.get('METRICS_ENABLED', False):
+            return
+        self.directory = app.config['METRICS_DIR']
+        self.token = app.config.get('METRICS_TOKEN')
+        os.makedirs(self.directory, exist_ok=True)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        before_render_template.connect(self._template_started, app)
+        template_rendered.connect(self._template_finished, app)
+        for name, handler in (('before_cursor_execute', _before_cursor_execute),
+                              ('after_cursor_execute', _after_cursor_execute)):
+            if not event.contains(Engine, name, handler):
+                event.listen(Engine, name, handler)
+        app.add_url_rule('/metrics', 'metrics', limiter.exempt(self.metrics_view))
+
+        interval = app.config.get('METRICS_WRITE_INTERVAL', 5.0)
+        # Files untouched for this long belong to a dead worker
+        self.retire_age = max(60.0, interval * 10)
+        self._start(app, True, interval)
+
+    # Request hooks
+
+    def _start_request(self):
+        _current.timer = _RequestTimer()
+
+    def _finish_request(self, response):
+        timer = getattr(_current, 'timer', None)
+        if timer is None:
+            return response
+        _current.timer = None
+        endpoint = request.url_rule.endpoint if request.url_rule is not None else 'unmatched'
+        self.record(endpoint, request.method, response.status_code, time.perf_counter() - timer.started,
+                    timer.sql_queries, timer.sql_seconds, timer.template_seconds, response.content_length or 0)
+        return response
+
+    def _template_started(self, sender, template, context, **extra):
+        timer = getattr(_current, 'timer', None)
+        if timer is not None:
+            timer.template_starts.append(time.perf_counter())
+
+    def _template_finished(self, sender, template, context, **extra):
+        timer = getattr(_current, 'timer', None)
+        if timer is not None and timer.template_starts:
+            elapsed = time.perf_counter() - timer.template_starts.pop()
+            if not timer.template_starts:
+                timer.template_seconds += elapsed  # Includes nested renders once
+
+    def record(self, endpoint, method, status, seconds, sql_queries=0, sql_seconds=0.0, template_seconds=0.0,
+               nbytes=0):
+        with self._lock:
+            if self._forked():
+                # Totals copied into a forked child belong to the parent
+                self._stats, self._statuses, self._token = {}, Counter(), None
+            stats = self._stats.get((endpoint, method))
+            if stats is None:
+                stats = self._stats[(endpoint, method)] = _EndpointStats()
+            stats.requests += 1
+            stats.seconds += seconds
+            stats.latency[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            stats.sql_queries += sql_queries
+            stats.sql_seconds += sql_seconds
+            stats.query_counts[bisect_left(QUERY_COUNT_BUCKETS, sql_queries)] += 1
+            stats.template_seconds += template_seconds
+            stats.bytes += nbytes
+            self._statuses[(endpoint, method, status)] += 1
+
+    # Worker files
+
+    def _process_token(self):
+        # Re-derived after fork so parent and child never share a file
+        if self._token is None or not self._token.startswith(f"{os.getpid()}-"):
+            self._token = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        return self._token
+
+    def _snapshot(self):
+        with self._lock:
+            return {
+                'endpoints': [[endpoint, method, stats.as_dict()]
+                              for (endpoint, method), stats in self._stats.items()],
+                'statuses': [[endpoint, method, status, count]
+                             for (endpoint, method, status), count in self._statuses.items()]
+            }
+
+    def _merge(self, snapshot):
+        with self._lock:
+            for endpoint, method, data in snapshot.get('endpoints', ()):
+                stats = self._stats.get((endpoint, method))
+                if stats is None:
+                    stats = self._stats[(endpoint, method)] = _EndpointStats()
+                stats.merge(data)
+            for endpoint, method, status, count in snapshot.get('statuses', ()):
+                self._statuses[(endpoint, method, status)] += count
+
+    def _flush_pending(self):
+        token = self._process_token()
+        path = os.path.join(self.directory, f"{token}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._snapshot(), f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+        retired = self._retire_dead_workers(token)
+        if retired:
+            # Rewrite before deleting, so the folded totals are always in some file
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._snapshot(), f, separators=(',', ':'))
+            os.replace(tmp, path)
+            for claimed in retired:
+                os.remove(claimed)
+        return len(self._stats)
+
+    def _retire_dead_workers(self, token):
+        """Fold files of workers that stopped writing into ours; returns the claimed paths"""
+        claimed = []
+        now = time.time()
+        for path in glob.glob(os.path.join(self.directory, '*')):
+            name = os.path.basename(path)
+            if name.startswith(token) or not name.endswith(('.json', '.claim')):
+                continue
+            try:
+                if now - os.path.getmtime(path) < self.retire_age:
+                    continue
+                target = os.path.join(self.directory, f"{token}-retired-{name}.claim")
+                os.replace(path, target)
+            except FileNotFoundError:
+                continue  # Another worker claimed it first
+            try:
+                with open(target, encoding='utf-8') as f:
+                    self._merge(json.load(f))
+            except ValueError:
+                pass  # Torn write of a crashed worker; nothing to recover
+            claimed.append(target)
+        return claimed
+
+    def collect(self):
+        """Totals of all workers as {(endpoint, method): _EndpointStats} and a status Counter"""
+        self.flush()
+        stats, statuses = {}, Counter()
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (FileNotFoundError, ValueError):
+                continue  # Replaced or being retired while we listed
+            for endpoint, method, data in snapshot.get('endpoints', ()):
+                stats.setdefault((endpoint, method), _EndpointStats()).merge(data)
+            for endpoint, method, status, count in snapshot.get('statuses', ()):
+                statuses[(endpoint, method, status)] += count
+        return stats, statuses
+
+    # Exposition
+
+    def metrics_view(self):
+        if not self.token:
+            abort(404)
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {self.token}".encode()):
+            return Response('Unauthorized\n', 401, {'WWW-Authenticate': 'Bearer'}, mimetype='text/plain')
+        return Response(render_prometheus(*self.collect()), content_type=CONTENT_TYPE)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timer = getattr(_current, 'timer', None)
+    if timer is not None:
+        timer.query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timer = getattr(_current, 'timer', None)
+    if timer is not None and timer.query_started is not None:
+        timer.sql_queries += 1
+        timer.sql_seconds += time.perf_counter() - timer.query_started
+        timer.query_started = None
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+def _histogram(lines, name, buckets, counts, total, labels):
+    cumulative = 0
+    for bound, count in zip(list(buckets) + ['+Inf'], counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f"{name}_sum{_labels(**labels)} {total}")
+    lines.append(f"{name}_count{_labels(**labels)} {cumulative}")
+
+def render_prometheus(stats, statuses, prefix='pehchaan'):
+    """Prometheus text exposition (format 0.0.4) of collected totals"""
+    lines = []
+    keys = sorted(stats)
+
+    lines += [f"# HELP {prefix}_http_requests_total Requests handled, by endpoint and status",
+              f"# TYPE {prefix}_http_requests_total counter"]
+    for (endpoint, method, status), count in sorted(statuses.items()):
+        lines.append(f"{prefix}_http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}")
+
+    lines += [f"# HELP {prefix}_http_request_duration_seconds Time from the first before_request hook to the response",
+              f"# TYPE {prefix}_http_request_duration_seconds histogram"]
+    for endpoint, method in keys:
+        s = stats[(endpoint, method)]
+        _histogram(lines, f"{prefix}_http_request_duration_seconds", LATENCY_BUCKETS, s.latency, s.seconds,
+                   {'endpoint': endpoint, 'method': method})
+
+    lines += [f"# HELP {prefix}_sql_queries_per_request SQL statements executed per request",
+              f"# TYPE {prefix}_sql_queries_per_request histogram"]
+    for endpoint, method in keys:
+        s = stats[(endpoint, method)]
+        _histogram(lines, f"{prefix}_sql_queries_per_request", QUERY_COUNT_BUCKETS, s.query_counts, s.sql_queries,
+                   {'endpoint': endpoint, 'method': method})
+
+    for name, field, help_text in (
+            ('sql_duration_seconds_total', 'sql_seconds', 'Time spent executing SQL statements'),
+            ('template_render_seconds_total', 'template_seconds', 'Time spent rendering templates'),
+            ('http_response_bytes_total', 'bytes', 'Response body bytes sent (streamed bodies not counted)')):
+        lines += [f"# HELP {prefix}_{name} {help_text}", f"# TYPE {prefix}_{name} counter"]
+        for endpoint, method in keys:
+            lines.append(f"{prefix}_{name}{_labels(endpoint=endpoint, method=method)} "
+                         f"{getattr(stats[(endpoint, method)], field)}")
+    return '\n'.join(lines) + '\n'
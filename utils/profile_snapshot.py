@@ -0,0 +1,300 @@
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import visitors
+from utils.database import dialect_insert
+from utils.fulltext import save_people_search_document
+from models import (
+    db, User, ProfileSnapshot, Skill, SocialLink, Project, ProjectImage, ProjectLink,
+    ProjectTechnology, Experience, ExperienceImage, ExperienceLink, Education, GalleryImage, Other,
+    OtherImage, OtherLink, Service, ServiceImage, PreviousWork, PreviousWorkImage, PreviousWorkLink
+)
+
+# Bump when the payload layout changes; older snapshots are rebuilt on read
+SNAPSHOT_FORMAT = 2
+
+# User columns rendered on the public profile (never credentials or inbox state)
+PUBLIC_USER_FIELDS = (
+    'id', 'username', 'email', 'role', 'full_name', 'profile_image', 'banner_image',
+    'profile_tag', 'tagline', 'bio', 'resume_pdf', 'business_category', 'country',
+    'state', 'district', 'address', 'maps_embed', 'whatsapp_number'
+)
+
+# Top-level sections: (relationship name, model, child collections)
+SECTIONS = (
+    ('skills', Skill, ()),
+    ('social_links', SocialLink, ()),
+    ('projects', Project, ('images', 'links')),
+    ('experiences', Experience, ('images', 'links')),
+    ('education', Education, ()),
+    ('gallery_images', GalleryImage, ()),
+    ('others', Other, ('images', 'links')),
+    ('services', Service, ('images',)),
+    ('previous_works', PreviousWork, ('images', 'links')),
+)
+
+# Model properties the templates read in addition to columns
+EXTRA_PROPERTIES = {
+    Experience: ('company', 'role'),
+}
+
+# How a changed row finds its profile: (parent model or None for users, foreign key)
+OWNERS = {
+    User: (None, 'id'),
+    Skill: (None, 'user_id'),
+    SocialLink: (None, 'user_id'),
+    Project: (None, 'user_id'),
+    Experience: (None, 'user_id'),
+    Education: (None, 'user_id'),
+    GalleryImage: (None, 'user_id'),
+    Other: (None, 'user_id'),
+    Service: (None, 'user_id'),
+    PreviousWork: (None, 'user_id'),
+    ProjectImage: (Project, 'project_id'),
+    ProjectLink: (Project, 'project_id'),
+    ProjectTechnology: (Project, 'project_id'),
+    ExperienceImage: (Experience, 'experience_id'),
+    ExperienceLink: (Experience, 'experience_id'),
+    OtherImage: (Other, 'other_id'),
+    OtherLink: (Other, 'other_id'),
+    ServiceImage: (Service, 'service_id'),
+    PreviousWorkImage: (PreviousWork, 'previous_work_id'),
+    PreviousWorkLink: (PreviousWork, 'previous_work_id'),
+}
+
+_SKIPPED_COLUMNS = {'user_id', 'project_id', 'experience_id', 'other_id', 'service_id',
+                    'previous_work_id', 'created_at'}
+
+_PENDING_KEY = 'profile_snapshot_owners'
+
+def _serialize_row(obj, children=()):
+    data = {column.key: getattr(obj, column.key) for column in obj.__mapper__.column_attrs
+            if column.key not in _SKIPPED_COLUMNS}
+    for name in EXTRA_PROPERTIES.get(type(obj), ()):
+        data[name] = getattr(obj, name)
+    for name in children:
+        data[name] = [_serialize_row(child) for child in getattr(obj, name)]
+    return data
+
+def build_profile_snapshot(user_id, session=None):
+    """
+    Assemble the public-profile payload of a user from the normalized tables
+
+    Uses one query per section plus one per child collection, and refreshes
+    already-loaded objects so it sees changes flushed earlier in the
+    transaction.
+
+    Returns:
+        Payload dict, or None if the user does not exist
+    """
+    session = session or db.session
+    user = session.execute(
+        select(User).where(User.id == user_id).execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+    if user is None:
+        return None
+
+    payload = {field: getattr(user, field) for field in PUBLIC_USER_FIELDS}
+    for name, model, children in SECTIONS:
+        query = select(model).where(model.user_id == user_id).order_by(model.order, model.id)
+        query = query.options(*[selectinload(getattr(model, child)) for child in children])
+        rows = session.execute(query.execution_options(populate_existing=True)).scalars().all()
+        payload[name] = [_serialize_row(row, children) for row in rows]
+    return payload
+
+def encode_snapshot(payload):
+    """Canonical JSON, so equal payloads always compare equal"""
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+def save_profile_snapshot(user_id, session=None):
+    """
+    Rebuild and upsert one user's snapshot inside the current transaction
+
+    Locks the user row first (Postgres), so two concurrent profile writes
+    serialize and the later one reads the earlier one's committed rows.
+    The user's people-search document is refreshed from the same payload.
+    """
+    session = session or db.session
+    session.execute(select(User.id).where(User.id == user_id).with_for_update())
+    payload = build_profile_snapshot(user_id, session)
+    table = ProfileSnapshot.__table__
+
+    save_people_search_document(user_id, payload, session)
+    if payload is None:
+        session.execute(table.delete().where(table.c.user_id == user_id))
+        return None
+
+    values = {
+        'user_id': user_id,
+        'format': SNAPSHOT_FORMAT,
+        'version': 1,
+        'data': encode_snapshot(payload),
+        'built_at': datetime.utcnow()
+    }
+    insert = dialect_insert(session)
+    if insert is not None:
+        statement = insert(table).values(**values)
+        session.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={
+                'format': statement.excluded.format,
+                'version': table.c.version + 1,
+                'data': statement.excluded.data,
+                'built_at': statement.excluded.built_at
+            }
+        ))
+    else:
+        updated = session.execute(
+            table.update().where(table.c.user_id == user_id)
+            .values(format=values['format'], version=table.c.version + 1,
+                    data=values['data'], built_at=values['built_at'])
+        ).rowcount
+        if not updated:
+            session.execute(table.insert().values(**values))
+    return payload
+
+def _as_namespace(value):
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: _as_namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_as_namespace(item) for item in value]
+    return value
+
+def load_profile_snapshot(user, snapshot, persist=True):
+    """
+    Template-ready view of a user's public profile
+
+    Attribute access mirrors the ORM objects (user.projects[0].images ...),
+    so the public templates render from it unchanged. A missing or
+    outdated-format snapshot is built on the spot and, if persist is set,
+    stored for the next request.
+    """
+    if snapshot is not None and snapshot.format == SNAPSHOT_FORMAT:
+        payload = json.loads(snapshot.data)
+    elif persist:
+        payload = save_profile_snapshot(user.id)
+        db.session.commit()
+    else:
+        payload = build_profile_snapshot(user.id)
+    return _as_namespace(payload)
+
+# Rebuild on write
+
+def _bound_value(whereclause, column_name):
+    """Value compared to column_name in a filter_by()-style WHERE clause, if any"""
+    if whereclause is None:
+        return None
+    for node in visitors.iterate(whereclause):
+        left, right = getattr(node, 'left', None), getattr(node, 'right', None)
+        if getattr(left, 'name', None) == column_name and hasattr(right, 'effective_value'):
+            return right.effective_value
+    return None
+
+def _pending(session):
+    return session.info.setdefault(_PENDING_KEY, set())
+
+def _track_flush(session, flush_context):
+    pending = _pending(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        owner = OWNERS.get(type(obj))
+        if owner is None:
+            continue
+        if isinstance(obj, User) and obj not in session.deleted and not any(
+            inspect(obj).attrs[field].history.has_changes() for field in PUBLIC_USER_FIELDS
+        ):
+            continue  # Login timestamps, password changes, inbox counters...
+        parent, column = owner
+        value = getattr(obj, column)
+        if value is not None:
+            pending.add((parent, value))
+
+def _track_bulk(orm_execute_state):
+    # Query(...).filter_by(parent_id=...).delete()/update() bypasses the unit of work
+    if not (orm_execute_state.is_delete or orm_execute_state.is_update):
+        return
+    mapper = orm_execute_state.bind_mapper
+    model = mapper.class_ if mapper is not None else None
+    if model is None or model is User or model not in OWNERS:
+        return
+    parent, column = OWNERS[model]
+    value = _bound_value(orm_execute_state.statement.whereclause, column)
+    if value is not None:
+        _pending(orm_execute_state.session).add((parent, value))
+
+def _rebuild_pending(session):
+    session.flush()
+    pending = session.info.pop(_PENDING_KEY, set())
+    if not pending:
+        return
+
+    user_ids = {value for parent, value in pending if parent is None}
+    by_parent = {}
+    for parent, value in pending:
+        if parent is not None:
+            by_parent.setdefault(parent, set()).add(value)
+    for parent, ids in by_parent.items():
+        user_ids.update(session.scalars(select(parent.user_id).where(parent.id.in_(ids))))
+
+    for user_id in sorted(user_ids):
+        save_profile_snapshot(user_id, session)
+    # Our own upserts must not queue another round
+    session.info.pop(_PENDING_KEY, None)
+
+def _discard_pending(session, previous_transaction=None):
+    session.info.pop(_PENDING_KEY, None)
+
+def init_profile_snapshots(app):
+    """Rebuild affected profile snapshots inside every commit that touches profile rows"""
+    session_class = db.session.session_factory.class_
+    for name, handler in (('after_flush', _track_flush), ('do_orm_execute', _track_bulk),
+                          ('before_commit', _rebuild_pending), ('after_rollback', _discard_pending)):
+        if not event.contains(session_class, name, handler):
+            event.listen(session_class, name, handler)
+
+# Consistency checker
+
+def check_profile_snapshots(batch_size=500, repair=True, log=print):
+    """
+    Compare every stored snapshot with a fresh build and rebuild the ones that drifted
+
+    Missing and outdated-format snapshots count as drifted. Users are walked
+    in id batches with a commit per batch.
+
+    Returns:
+        Dict with checked, missing, drifted and repaired counts
+    """
+    stats = {'checked': 0, 'missing': 0, 'drifted': 0, 'repaired': 0}
+    last_id = 0
+
+    while True:
+        user_ids = db.session.scalars(
+            select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+        ).all()
+        if not user_ids:
+            break
+        last_id = user_ids[-1]
+
+        stored = {row.user_id: row for row in db.session.scalars(
+            select(ProfileSnapshot).where(ProfileSnapshot.user_id.in_(user_ids))
+        )}
+        for user_id in user_ids:
+            stats['checked'] += 1
+            snapshot = stored.get(user_id)
+            if snapshot is None:
+                stats['missing'] += 1
+            elif snapshot.format != SNAPSHOT_FORMAT or \
+                    snapshot.data != encode_snapshot(build_profile_snapshot(user_id)):
+                stats['drifted'] += 1
+                log(f"Snapshot of user {user_id} drifted (version {snapshot.version})")
+            else:
+                continue
+            if repair:
+                save_profile_snapshot(user_id)
+                stats['repaired'] += 1
+
+        db.session.commit()
+        db.session.expunge_all()
+
+    return stats
@@ -0,0 +1,215 @@
+import cProfile
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from flask import g, request
+from itsdangerous import BadSignature, TimestampSigner
+
+PROFILE_HEADER = 'X-Profile-Request'
+
+_UNSAFE = re.compile(r'[^A-Za-z0-9_.-]+')
+
+def _frame_name(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+class StackSampler:
+    """Collects the stacks of one thread every interval seconds, as collapsed-stack counts"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+def collapse_cprofile(profiler, max_depth=100):
+    """
+    Collapsed stacks (in microseconds) approximated from a cProfile run
+
+    cProfile records caller/callee pairs rather than whole stacks, so each
+    function's time is split between its callers in proportion to the
+    time spent under each, as flameprof and similar tools do.
+    """
+    stats = pstats.Stats(profiler).stats
+    callees = {}
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    stacks = Counter()
+
+    def name(func):
+        filename, line, function = func
+        return f"{os.path.basename(filename)}:{function}" if filename != '~' else function.strip('<>')
+
+    def visit(func, path, budget, depth):
+        cc, nc, tt, ct, callers = stats[func]
+        share = budget / ct if ct else 0.0
+        path = path + [name(func)]
+        if tt * share >= 1e-6:
+            stacks[';'.join(path)] += int(tt * share * 1e6)
+        if depth >= max_depth:
+            return
+        for callee, edge_time in callees.get(func, ()):
+            if callee in stats and name(callee) not in path:
+                visit(callee, path, edge_time * share, depth + 1)
+
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        if not callers:
+            visit(func, [], ct, 0)
+    return stacks
+
+class RequestProfiler:
+    """
+    Profiles a sample of live requests into collapsed-stack files
+
+    A request is profiled when it draws under PROFILING_SAMPLE_RATE (only
+    for PROFILING_ENDPOINTS, if set) or carries a PROFILE_HEADER token
+    minted by scripts/profile_token.py. It runs under a stack sampler
+    thread (PROFILING_MODE = 'sampler', cheap enough for production) or
+    cProfile ('cprofile', exact call counts but slows the request down).
+    Output is one <time>-<endpoint>-<ms>ms.collapsed file per request in
+    PROFILING_DIR, readable by flamegraph.pl and speedscope; the oldest
+    files are deleted to stay within PROFILING_MAX_BYTES and
+    PROFILING_MAX_FILES. At most one request per worker is profiled at a
+    time.
+
+    With PROFILING_ENABLED off no hooks are registered at all.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._busy = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PROFILING_ENABLED', False)
+        if not self.enabled:
+            return
+        self.directory = app.config['PROFILING_DIR']
+        self.mode = app.config.get('PROFILING_MODE', 'sampler')
+        self.sample_rate = app.config.get('PROFILING_SAMPLE_RATE', 0.0)
+        self.endpoints = set(app.config.get('PROFILING_ENDPOINTS') or ())
+        self.interval = app.config.get('PROFILING_INTERVAL_MS', 5) / 1000.0
+        self.max_bytes = app.config.get('PROFILING_MAX_BYTES', 50 * 1024 * 1024)
+        self.max_files = app.config.get('PROFILING_MAX_FILES', 500)
+        self.token_max_age = app.config.get('PROFILING_TOKEN_MAX_AGE', 3600)
+        self.signer = token_signer(app.config['SECRET_KEY'])
+        os.makedirs(self.directory, exist_ok=True)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._abandon_request)
+
+    def _wanted(self):
+        token = request.headers.get(PROFILE_HEADER)
+        if token:
+            try:
+                self.signer.unsign(token, max_age=self.token_max_age)
+                return True
+            except BadSignature:
+                return False
+        if self.endpoints and request.endpoint not in self.endpoints:
+            return False
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _start_request(self):
+        if not self._wanted() or not self._busy.acquire(blocking=False):
+            return
+        if self.mode == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = StackSampler(threading.get_ident(), self.interval)
+            profiler.start()
+        g.request_profiler = (profiler, time.perf_counter())
+
+    def _stop(self):
+        profiler, started = g.pop('request_profiler')
+        try:
+            if isinstance(profiler, cProfile.Profile):
+                profiler.disable()
+                stacks = collapse_cprofile(profiler)
+            else:
+                stacks = profiler.stop()
+        finally:
+            self._busy.release()
+        return stacks, time.perf_counter() - started
+
+    def _finish_request(self, response):
+        if 'request_profiler' not in g:
+            return response
+        stacks, elapsed = self._stop()
+        try:
+            response.headers['X-Profile-Id'] = self._write(stacks, elapsed)
+        except Exception as e:
+            print(f"Error writing request profile: {e}")
+        return response
+
+    def _abandon_request(self, exc):
+        # The request failed before after_request; release the worker's slot
+        if 'request_profiler' in g:
+            self._stop()
+
+    def _write(self, stacks, elapsed):
+        name = (f"{datetime.utcnow():%Y%m%dT%H%M%S.%f}-{_UNSAFE.sub('_', request.endpoint or 'unmatched')}"
+                f"-{elapsed * 1000:.0f}ms-{os.getpid()}.collapsed")
+        path = os.path.join(self.directory, name)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        os.replace(tmp, path)
+        self._enforce_budget()
+        return name
+
+    def _enforce_budget(self):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.collapsed'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        files.sort()
+        total = sum(size for _, _, size in files)
+        while files and (total > self.max_bytes or len(files) > self.max_files):
+            _, oldest, size = files.pop(0)
+            try:
+                os.remove(os.path.join(self.directory, oldest))
+            except FileNotFoundError:
+                pass  # Another worker pruned it
+            total -= size
+
+def token_signer(secret_key):
+    return TimestampSigner(secret_key, salt='request-profiling')
+
+def profile_token(secret_key):
+    """Value for the PROFILE_HEADER of a request that should be profiled"""
+    return token_signer(secret_key).sign('profile').decode()
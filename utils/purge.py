@@ -0,0 +1,218 @@
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from config import Config
+from models import db, User
+
+# User columns holding upload paths (relative to static/uploads/)
+USER_FILE_COLUMNS = ('profile_image', 'banner_image', 'resume_pdf')
+
+def deletion_cutoff(now=None, grace_days=None):
+    """Accounts soft-deleted before this moment are past their grace period"""
+    grace_days = Config.ACCOUNT_DELETION_GRACE_DAYS if grace_days is None else grace_days
+    return (now or datetime.utcnow()) - timedelta(days=grace_days)
+
+def _dependent_tables():
+    """
+    Every table that hangs off users, as (table, fk column, parent table), children first
+
+    Derived from the model metadata, so tables added later are purged too.
+    """
+    users = User.__table__
+    ordered = []
+
+    def visit(parent):
+        for table in db.metadata.sorted_tables:
+            for fk in table.foreign_keys:
+                if fk.column.table is parent and table is not parent:
+                    visit(table)
+                    ordered.append((table, fk.parent, parent))
+
+    visit(users)
+    return ordered
+
+def _owner_ids_query(table, fk_column, parent, user_ids, dependents):
+    """Subquery of parent ids owned by user_ids, walking up to users"""
+    if parent is User.__table__:
+        return user_ids
+    grand_fk, grand_parent = next((fk, gp) for t, fk, gp in dependents if t is parent)
+    return select(parent.c.id).where(
+        grand_fk.in_(_owner_ids_query(parent, grand_fk, grand_parent, user_ids, dependents))
+    )
+
+def _collect_files(user_rows, user_ids, dependents):
+    """Upload paths and QR codes belonging to a batch of users"""
+    uploads = [getattr(row, column) for row in user_rows for column in USER_FILE_COLUMNS]
+    for table, fk_column, parent in dependents:
+        if 'image_path' in table.c:
+            owned = _owner_ids_query(table, fk_column, parent, user_ids, dependents)
+            uploads.extend(db.session.scalars(select(table.c.image_path).where(fk_column.in_(owned))))
+    return {
+        'uploads': sorted({path for path in uploads if path}),
+        'qr_codes': sorted({row.username for row in user_rows})
+    }
+
+class PurgeMetrics:
+    """Counters for one purge run, written to PURGE_METRICS_FILE as JSON"""
+
+    def __init__(self):
+        self.started_at = datetime.utcnow()
+        self.batches = 0
+        self.users = 0
+        self.rows = {}
+        self.files_deleted = 0
+        self.files_missing = 0
+        self.bytes_freed = 0
+        self.journals_replayed = 0
+        self.remaining = 0
+        self.oldest_remaining_days = None
+        self.duration_seconds = 0.0
+
+    def as_dict(self):
+        data = dict(vars(self))
+        data['started_at'] = self.started_at.isoformat()
+        return data
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, indent=2)
+        os.replace(tmp, path)
+
+def _remove_files(files, metrics):
+    """Delete a batch's files; missing files count as already purged"""
+    for path in files['uploads']:
+        _remove_path(os.path.join(Config.UPLOAD_FOLDER, path), metrics)
+
+    # A purged username can be taken again; never delete a live user's QR code
+    reused = set(db.session.scalars(select(User.username).where(User.username.in_(files['qr_codes']))))
+    for username in files['qr_codes']:
+        if username not in reused:
+            _remove_path(os.path.join(Config.QR_CODE_FOLDER, f"{username}.png"), metrics)
+
+def _remove_path(path, metrics):
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+        metrics.files_deleted += 1
+        metrics.bytes_freed += size
+    except FileNotFoundError:
+        metrics.files_missing += 1
+    except OSError as e:
+        print(f"Error deleting file {path}: {e}")
+
+def _replay_journals(journal_dir, metrics):
+    """
+    Finish batches whose rows were committed but whose files were not removed
+
+    A journal whose users still exist belongs to a batch that rolled back;
+    it is dropped and the batch is simply selected again.
+    """
+    for name in sorted(os.listdir(journal_dir)):
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(journal_dir, name)
+        with open(path, encoding='utf-8') as f:
+            journal = json.load(f)
+        still_there = db.session.scalar(
+            select(db.func.count()).select_from(User).where(User.id.in_(journal['user_ids']))
+        )
+        if not still_there:
+            _remove_files(journal['files'], metrics)
+            metrics.journals_replayed += 1
+        os.remove(path)
+
+def purge_expired_users(batch_size=100, max_batches=None, pause=0.1, now=None, dry_run=False, log=print):
+    """
+    Permanently delete accounts soft-deleted longer than the grace period
+
+    Each batch selects the oldest expired users through the partial
+    ix_users_deleted_at index, deletes them and every dependent row in one
+    transaction, then removes their uploads and QR codes. The file list is
+    journaled before the commit, so a crash between commit and file removal
+    is finished by the next run. Re-running is always safe.
+
+    Args:
+        batch_size: Users per transaction
+        max_batches: Stop after this many batches (None = until done)
+        pause: Seconds to sleep between batches
+        now: Reference time (default: utcnow)
+        dry_run: Only count what would be purged
+        log: Progress callback
+
+    Returns:
+        PurgeMetrics for the run
+    """
+    metrics = PurgeMetrics()
+    started = time.perf_counter()
+    cutoff = deletion_cutoff(now)
+    users = User.__table__
+    dependents = _dependent_tables()
+    journal_dir = Config.PURGE_JOURNAL_DIR
+    os.makedirs(journal_dir, exist_ok=True)
+
+    expired = select(users.c.id, users.c.username, *[users.c[c] for c in USER_FILE_COLUMNS]).where(
+        users.c.deleted_at.isnot(None), users.c.deleted_at < cutoff
+    ).order_by(users.c.deleted_at, users.c.id)
+
+    if not dry_run:
+        _replay_journals(journal_dir, metrics)
+
+    while max_batches is None or metrics.batches < max_batches:
+        if dry_run:
+            batch = expired.limit(batch_size).offset(metrics.users)
+        else:
+            # Row locks keep the batch stable until commit; a second runner skips it
+            batch = expired.limit(batch_size).with_for_update(skip_locked=True)
+        user_rows = db.session.execute(batch).all()
+        if not user_rows:
+            break
+        user_ids = [row.id for row in user_rows]
+        metrics.batches += 1
+        metrics.users += len(user_ids)
+
+        if dry_run:
+            continue
+
+        try:
+            files = _collect_files(user_rows, user_ids, dependents)
+            journal = os.path.join(journal_dir, f"{int(time.time())}-{uuid.uuid4().hex[:8]}.json")
+            with open(journal, 'w', encoding='utf-8') as f:
+                json.dump({'user_ids': user_ids, 'files': files}, f)
+
+            for table, fk_column, parent in dependents:
+                owned = _owner_ids_query(table, fk_column, parent, user_ids, dependents)
+                deleted = db.session.execute(table.delete().where(fk_column.in_(owned))).rowcount
+                metrics.rows[table.name] = metrics.rows.get(table.name, 0) + deleted
+            deleted = db.session.execute(users.delete().where(
+                users.c.id.in_(user_ids), users.c.deleted_at.isnot(None), users.c.deleted_at < cutoff
+            )).rowcount
+            metrics.rows['users'] = metrics.rows.get('users', 0) + deleted
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        _remove_files(files, metrics)
+        if os.path.exists(journal):
+            os.remove(journal)
+        log(f"Purged batch {metrics.batches}: {len(user_ids)} users, {metrics.files_deleted} files so far")
+        time.sleep(pause)
+
+    remaining = db.session.execute(
+        select(db.func.count(), db.func.min(users.c.deleted_at)).where(
+            users.c.deleted_at.isnot(None), users.c.deleted_at < cutoff
+        )
+    ).one()
+    metrics.remaining = remaining[0] - (metrics.users if dry_run else 0)
+    if remaining[1] is not None:
+        metrics.oldest_remaining_days = ((now or datetime.utcnow()) - remaining[1]).days
+    metrics.duration_seconds = round(time.perf_counter() - started, 3)
+
+    if not dry_run:
+        metrics.write(Config.PURGE_METRICS_FILE)
+    return metrics
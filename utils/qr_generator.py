@@ -1,6 +1,7 @@
 import qrcode
 import os
 from config import Config
+from utils.view_counter import QR_REFERRAL_PARAM, QR_REFERRAL_VALUE
 
 def generate_qr_code(username):
     """Generate QR code for user profile URL"""
@@ -12,8 +13,8 @@ def generate_qr_code(username):
         border=4,
     )
     
-    # Profile URL
-    url = f"https://pehchaan-h9ub.onrender.com/{username}"
+    # Profile URL, tagged so views from scanned codes can be told apart
+    url = f"https://pehchaan-h9ub.onrender.com/{username}?{QR_REFERRAL_PARAM}={QR_REFERRAL_VALUE}"
     qr.add_data(url)
     qr.make(fit=True)
     
@@ -0,0 +1,149 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_WHITESPACE = re.compile(r'\s+')
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r'(?:\?|%s|%\(\w+\)s|:\w+)'
+_PLACEHOLDER_LISTS = re.compile(rf'\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)')
+
+# The request being inspected on this thread
+_current = threading.local()
+
+class RepeatedQueryError(AssertionError):
+    """Raised in strict mode when a request repeats a statement shape too often"""
+
+def fingerprint(statement):
+    """Shape of a SQL statement: literals and placeholder lists collapsed, whitespace normalized"""
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _LITERALS.sub('?', shape)
+    return _PLACEHOLDER_LISTS.sub('(...)', shape)
+
+def statement_origin():
+    """Innermost template line or project source line on the current stack"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        template = frame.f_globals.get('__jinja_template__')
+        if template is not None:
+            name = os.path.relpath(template.filename, _ROOT) if template.filename else template.name
+            return f"{name}:{template.get_corresponding_lineno(frame.f_lineno)}"
+        filename = frame.f_code.co_filename
+        if filename.startswith(_ROOT) and 'site-packages' not in filename and filename != __file__:
+            return f"{os.path.relpath(filename, _ROOT)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'outside the project'
+
+def explain(cursor, statement, parameters, dialect):
+    """Query plan lines of a SELECT, run on the same DBAPI connection (no statement events fire)"""
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect == 'sqlite' else 'EXPLAIN '
+    plan_cursor = cursor.connection.cursor()
+    try:
+        plan_cursor.execute(prefix + statement, parameters)
+        return [str(row[-1]) for row in plan_cursor.fetchall()]
+    finally:
+        plan_cursor.close()
+
+class QueryInspector:
+    """
+    Opt-in N+1 detector and slow-query log for development and staging
+
+    Every statement of a request is fingerprinted (literals and IN lists
+    collapsed) and attributed to the innermost template line or project
+    source line that issued it. At the end of the request, shapes seen at
+    least QUERY_DEBUG_REPEAT_THRESHOLD times are reported as likely N+1
+    loads; with QUERY_DEBUG_STRICT they raise RepeatedQueryError instead,
+    which fails the test that made the request. Statements slower than
+    QUERY_DEBUG_SLOW_MS are logged with their query plan whether or not
+    they run inside a request.
+
+    Walks the stack for every statement, so keep it off in production.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.log = print
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('QUERY_DEBUG_ENABLED', False)
+        if not self.enabled:
+            return
+        self.threshold = app.config.get('QUERY_DEBUG_REPEAT_THRESHOLD', 5)
+        self.slow_seconds = app.config.get('QUERY_DEBUG_SLOW_MS', 100) / 1000.0
+        self.explain = app.config.get('QUERY_DEBUG_EXPLAIN', True)
+        self.strict = app.config.get('QUERY_DEBUG_STRICT', False)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        for name, handler in (('before_cursor_execute', self._before_execute),
+                              ('after_cursor_execute', self._after_execute)):
+            if not event.contains(Engine, name, handler):
+                event.listen(Engine, name, handler)
+
+    # Statement events
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_debug_started', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('query_debug_started')
+        elapsed = time.perf_counter() - started.pop() if started else 0.0
+        statements = getattr(_current, 'statements', None)
+        if statements is None and elapsed < self.slow_seconds:
+            return
+
+        origin = statement_origin()
+        if statements is not None:
+            statements.append((fingerprint(statement), origin))
+        if elapsed >= self.slow_seconds:
+            self._log_slow(cursor, statement, parameters, executemany, conn.dialect.name, elapsed, origin)
+
+    def _log_slow(self, cursor, statement, parameters, executemany, dialect, elapsed, origin):
+        where = f" in {request.endpoint}" if getattr(_current, 'statements', None) is not None else ''
+        lines = [f"[queries] slow statement, {elapsed * 1000:.1f} ms{where} from {origin}:",
+                 f"    {_WHITESPACE.sub(' ', statement).strip()}",
+                 f"    parameters: {parameters!r}"[:500]]
+        if self.explain and not executemany and statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            try:
+                lines.append('    plan:')
+                lines += [f"      {line}" for line in explain(cursor, statement, parameters, dialect)]
+            except Exception as e:
+                lines.append(f"      (EXPLAIN failed: {e})")
+        self.log('\n'.join(lines))
+
+    # Request hooks
+
+    def _start_request(self):
+        _current.statements = []
+
+    def _finish_request(self, response):
+        statements = getattr(_current, 'statements', None)
+        _current.statements = None
+        if not statements:
+            return response
+
+        shapes = Counter(shape for shape, origin in statements)
+        repeated = [(shape, count) for shape, count in shapes.most_common() if count >= self.threshold]
+        if not repeated:
+            return response
+
+        lines = [f"[queries] {request.method} {request.path} ({request.endpoint}) ran {len(statements)} statements; "
+                 f"repeated shapes, likely N+1:"]
+        for shape, count in repeated:
+            origins = Counter(origin for other, origin in statements if other == shape)
+            lines.append(f"    {count}x {shape[:300]}")
+            lines += [f"        {n}x from {origin}" for origin, n in origins.most_common(3)]
+        report = '\n'.join(lines)
+        if self.strict:
+            raise RepeatedQueryError(report)
+        self.log(report)
+        return response
@@ -0,0 +1,124 @@
+import random
+import time
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Flask session key holding the time until which this browser reads from the primary
+PRIMARY_PIN_KEY = '_db_primary_until'
+
+def read_only(view):
+    """Mark a view as safe to serve from a read replica (apply below @route)"""
+    view._db_read_only = True
+    return view
+
+class RoutingSession(Session):
+    """
+    Session that sends reads of @read_only views to a replica
+
+    Flushes and Core INSERT/UPDATE/DELETE statements always use the primary,
+    and once a request has written anything its remaining reads do too.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or getattr(clause, 'is_dml', False):
+                g.db_wrote = True
+                g.db_use_replica = False
+            elif g.get('db_use_replica'):
+                router = current_app.extensions.get('replica_router')
+                engine = router.replica_engine() if router else None
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+class ReplicaRouter:
+    """
+    Routes read-only requests to the replica binds in SQLALCHEMY_REPLICA_URIS
+
+    A request uses a replica when its view is marked @read_only, the method
+    is safe, and the browser has not written anything in the last
+    REPLICA_READ_YOUR_WRITES_SECONDS (read-your-writes, tracked in the Flask
+    session so it holds across workers). Replicas are health-checked at most
+    every REPLICA_HEALTH_CHECK_INTERVAL seconds; one that fails is skipped
+    for REPLICA_RETRY_AFTER seconds and its reads fall back to the primary.
+    """
+
+    def __init__(self, app=None):
+        self.bind_keys = []
+        self._health = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Call after db.init_app so the replica engines exist"""
+        from models import db
+
+        self.bind_keys = sorted(key for key in app.config.get('SQLALCHEMY_BINDS', {}) if key.startswith('replica_'))
+        self.window = app.config.get('REPLICA_READ_YOUR_WRITES_SECONDS', 10)
+        self.health_interval = app.config.get('REPLICA_HEALTH_CHECK_INTERVAL', 5)
+        self.retry_after = app.config.get('REPLICA_RETRY_AFTER', 30)
+        self._health = {}
+        app.extensions['replica_router'] = self
+
+        if not self.bind_keys:
+            return
+
+        with app.app_context():
+            for key in self.bind_keys:
+                event.listen(db.engines[key], 'handle_error', self._on_engine_error(key))
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _before_request(self):
+        view = current_app.view_functions.get(request.endpoint)
+        g.db_use_replica = (
+            request.method in READ_ONLY_METHODS
+            and getattr(view, '_db_read_only', False)
+            and session.get(PRIMARY_PIN_KEY, 0) < time.time()
+        )
+
+    def _after_request(self, response):
+        if g.get('db_wrote'):
+            session[PRIMARY_PIN_KEY] = time.time() + self.window
+        return response
+
+    def replica_engine(self):
+        """Healthy replica engine for this request (chosen once), or None for the primary"""
+        if 'db_replica_engine' not in g:
+            from models import db
+
+            g.db_replica_engine = None
+            for key in random.sample(self.bind_keys, len(self.bind_keys)):
+                engine = db.engines[key]
+                if self._is_healthy(key, engine):
+                    g.db_replica_engine = engine
+                    break
+        return g.db_replica_engine
+
+    def _is_healthy(self, key, engine):
+        healthy, checked_at = self._health.get(key, (True, 0.0))
+        now = time.monotonic()
+        if now - checked_at < (self.health_interval if healthy else self.retry_after):
+            return healthy
+
+        try:
+            with engine.connect() as conn:
+                # Also catches an empty or unmigrated replica
+                conn.execute(text('SELECT 1 FROM users LIMIT 1'))
+            healthy = True
+        except Exception as e:
+            print(f"Error reaching replica {key}: {e}")
+            healthy = False
+        self._health[key] = (healthy, now)
+        return healthy
+
+    def _on_engine_error(self, key):
+        def mark_down(context):
+            # Lost connections take the replica out of rotation until the next check
+            if context.is_disconnect or context.connection is None:
+                self._health[key] = (False, time.monotonic())
+        return mark_down
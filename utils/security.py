@@ -44,7 +44,7 @@ def is_username_available(username):
     
     # If user is soft-deleted, check grace period (30 days)
     if existing_user.deleted_at:
-        grace_period = timedelta(days=30)
+        grace_period = timedelta(days=Config.ACCOUNT_DELETION_GRACE_DAYS)
         if datetime.utcnow() - existing_user.deleted_at > grace_period:
             # Grace period expired, username can be reused
             return True
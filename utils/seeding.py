@@ -0,0 +1,375 @@
+import bcrypt
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, select, text
+from models import (
+    db, User, PeopleSearchDocument, ProfileViewDaily, LinkClickDaily, Skill, SocialLink, Project, Technology,
+    ProjectTechnology, ProjectLink, ProjectImage, Experience, ExperienceImage, ExperienceLink, Education,
+    GalleryImage, Other, OtherImage, OtherLink, Service, ServiceImage, PreviousWork, PreviousWorkImage,
+    PreviousWorkLink, Message
+)
+from utils.directory import rebuild_directory_facets
+from utils.fulltext import people_search_document
+from utils.media import parse_video_url
+from utils.technologies import technology_key
+
+SEED_PASSWORD = 'seed-password'
+
+# Tables in insert order (parents first); each gets explicit ids after the current maximum
+TABLES = (
+    User, PeopleSearchDocument, Skill, SocialLink, Project, ProjectTechnology, ProjectLink, ProjectImage,
+    Experience, ExperienceImage, ExperienceLink, Education, GalleryImage, Other, OtherImage, OtherLink,
+    Service, ServiceImage, PreviousWork, PreviousWorkImage, PreviousWorkLink, Message, ProfileViewDaily,
+    LinkClickDaily
+)
+
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Diya', 'Ananya', 'Ishaan', 'Meera', 'Kabir', 'Riya', 'Arjun', 'Sai',
+               'Priya', 'Rohan', 'Kavya', 'Vihaan', 'Anika', 'Karthik', 'Neha', 'Farhan', 'Zoya', 'Manpreet', 'Tara']
+LAST_NAMES = ['Sharma', 'Iyer', 'Nair', 'Reddy', 'Gupta', 'Das', 'Menon', 'Singh', 'Rao', 'Patel', 'Khan',
+              'Joshi', 'Mehta', 'Bose', 'Kulkarni', 'Pillai', 'Chopra', 'Ahmed', 'Verma', 'Thomas']
+SKILL_CATEGORIES = {
+    'Languages': ['Python', 'JavaScript', 'TypeScript', 'Java', 'Go', 'Rust', 'C++', 'Kotlin', 'Swift', 'PHP', 'Ruby'],
+    'Frameworks': ['React', 'Django', 'Flask', 'Spring Boot', 'Node.js', 'Next.js', 'Vue', 'Angular', 'Laravel',
+                   'FastAPI', 'Flutter', 'React Native'],
+    'Data': ['PostgreSQL', 'MySQL', 'MongoDB', 'Redis', 'Pandas', 'Spark', 'Kafka', 'Elasticsearch', 'SQLite'],
+    'Cloud': ['AWS', 'GCP', 'Azure', 'Docker', 'Kubernetes', 'Terraform', 'Linux', 'Nginx', 'GitHub Actions'],
+    'Design': ['Figma', 'Photoshop', 'Illustrator', 'Blender', 'After Effects', 'Canva', 'UI Design', 'UX Research'],
+    'Business': ['Marketing', 'SEO', 'Sales', 'Accounting', 'Excel', 'Content Writing', 'Public Speaking'],
+}
+SKILLS = [(name, category) for category, names in SKILL_CATEGORIES.items() for name in names]
+# Popular skills are used far more than the long tail, as in real profiles
+SKILL_WEIGHTS = [1.0 / (rank + 3) for rank in range(len(SKILLS))]
+TECHNOLOGIES = [name for name, category in SKILLS if category in ('Languages', 'Frameworks', 'Data', 'Cloud')]
+TECHNOLOGY_WEIGHTS = [1.0 / (rank + 2) for rank in range(len(TECHNOLOGIES))]
+COMPANIES = ['Infosys', 'TCS', 'Wipro', 'Zoho', 'Flipkart', 'Swiggy', 'Razorpay', 'Freshworks', 'Ola', 'Paytm',
+             'Zomato', 'CRED', 'Meesho', 'HCL', 'Tech Mahindra', 'Byju\'s', 'PhonePe', 'Dream11']
+POSITIONS = ['Software Engineer', 'Senior Engineer', 'Intern', 'Designer', 'Data Analyst', 'Product Manager',
+             'QA Engineer', 'DevOps Engineer', 'Marketing Associate', 'Team Lead']
+INSTITUTES = ['IIT Bombay', 'IIT Madras', 'NIT Trichy', 'BITS Pilani', 'Anna University', 'VIT Vellore',
+              'Delhi University', 'Mumbai University', 'IIIT Hyderabad', 'Manipal Institute of Technology']
+COURSES = ['B.Tech Computer Science', 'B.Sc Mathematics', 'BCA', 'MCA', 'M.Tech', 'B.Des', 'MBA', 'B.Com']
+BUSINESS_CATEGORIES = ['Restaurant', 'Bakery', 'Salon', 'Boutique', 'Electronics', 'Consulting', 'Photography',
+                       'Fitness', 'Tuition', 'Interior Design', 'Printing', 'Travel Agency', 'Pharmacy', 'Grocery']
+PLATFORMS = ['linkedin', 'github', 'twitter', 'instagram', 'youtube', 'facebook', 'custom']
+WORDS = ('build scalable fast secure simple modern mobile web app platform dashboard api service data pipeline '
+         'analytics realtime payments booking inventory chat search recommendation automation cloud open source '
+         'community customer quality design research launch growth team users business local delivery order '
+         'tracking portal learning students health fitness food travel events photos video music game').split()
+VIDEO_IDS = ['dQw4w9WgXcQ', 'M7lc1UVf-VE', 'aqz-KE-bpKQ', 'ysz5S6PUM-U', 'jNQXAC9IVRw', 'kJQP7kiw5Fk']
+VIEW_SOURCES = ('direct', 'qr', 'search', 'social', 'internal', 'other')
+VIEW_SOURCE_WEIGHTS = (40, 15, 15, 20, 5, 5)
+
+def _load_locations():
+    path = os.path.join(os.path.dirname(__file__), '..', 'data', 'locations.json')
+    with open(path, encoding='utf-8') as f:
+        states = json.load(f).get('india', {}).get('states', {})
+    return [(state, districts) for state, districts in states.items() if districts]
+
+def _count(rng, mean, cap):
+    """Geometric-ish count: most profiles have a few items, some have many"""
+    if mean <= 0:
+        return 0
+    p = 1.0 / (mean + 1)
+    n = 0
+    while n < cap and rng.random() > p:
+        n += 1
+    return n
+
+def _sentence(rng, low, high):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high))).capitalize() + '.'
+
+def placeholder_paths(count):
+    """Upload-relative paths of the placeholder images seeded rows point at"""
+    return [f'seed/placeholder-{n:02d}.png' for n in range(count)]
+
+def write_placeholder_images(upload_folder, count):
+    """Write the small solid-colour PNGs behind placeholder_paths(count)"""
+    from PIL import Image
+
+    rng = random.Random('placeholders')
+    for relative in placeholder_paths(count):
+        colour = tuple(rng.randrange(40, 220) for _ in range(3))
+        path = os.path.join(upload_folder, relative)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            Image.new('RGB', (64, 64), colour).save(path, optimize=True)
+
+class _Generator:
+    """Builds the rows of one user at a time; ids continue from next_ids"""
+
+    def __init__(self, seed, as_of, next_ids, technology_ids, images, password_hash, locations):
+        self.seed = seed
+        self.as_of = as_of
+        self.next_ids = next_ids
+        self.technology_ids = technology_ids
+        self.images = images
+        self.password_hash = password_hash
+        self.locations = locations
+
+    def _id(self, model):
+        value = self.next_ids[model]
+        self.next_ids[model] += 1
+        return value
+
+    def _when(self, rng, days=730, after=None):
+        start = after or self.as_of - timedelta(days=days)
+        span = max(1, int((self.as_of - start).total_seconds()))
+        return start + timedelta(seconds=rng.randrange(span))
+
+    def _video(self, rng, share):
+        if rng.random() >= share:
+            return {'youtube_url': None, 'video_provider': None, 'video_id': None}
+        url = f'https://www.youtube.com/watch?v={rng.choice(VIDEO_IDS)}'
+        provider, video_id = parse_video_url(url)
+        return {'youtube_url': url, 'video_provider': provider, 'video_id': video_id}
+
+    def _images(self, rng, rows, model, fk, parent_id, count, created_at):
+        for order in range(count):
+            rows[model].append({'id': self._id(model), fk: parent_id, 'image_path': rng.choice(self.images),
+                                'order': order, 'created_at': created_at})
+
+    def _links(self, rng, rows, model, fk, parent_id, count, slug):
+        for order in range(count):
+            rows[model].append({'id': self._id(model), fk: parent_id, 'label': rng.choice(['Demo', 'Case study',
+                                'Article', 'Certificate', 'Source']), 'url': f'https://example.com/{slug}/{order}',
+                                'order': order})
+
+    def user(self, n, rows):
+        """Append every row of synthetic user number n (stable for a given seed)"""
+        rng = random.Random(f'{self.seed}:{n}')
+        user_id = self._id(User)
+        business = rng.random() < 0.2
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        username = f'{first}{last}{user_id}'.lower()  # Unique across runs, ids never repeat
+        created_at = self._when(rng)
+        state, districts = rng.choice(self.locations)
+        user = {
+            'id': user_id, 'email': f'{username}@example.com', 'username': username,
+            'password_hash': self.password_hash, 'phone': f'9{rng.randrange(10 ** 9):09d}',
+            'role': 'business' if business else 'individual',
+            'full_name': f'{first} {last}' if not business else f'{last} {rng.choice(BUSINESS_CATEGORIES)}',
+            'profile_image': rng.choice(self.images) if rng.random() < 0.7 else None,
+            'banner_image': rng.choice(self.images) if rng.random() < 0.3 else None,
+            'profile_tag': None, 'tagline': _sentence(rng, 3, 8) if rng.random() < 0.8 else None,
+            'bio': ' '.join(_sentence(rng, 6, 16) for _ in range(rng.randint(1, 4))) if rng.random() < 0.85 else None,
+            'resume_pdf': None, 'business_category': rng.choice(BUSINESS_CATEGORIES) if business else None,
+            'country': 'India', 'state': state if business or rng.random() < 0.6 else None,
+            'district': None, 'address': None, 'maps_embed': None,
+            'whatsapp_number': f'9{rng.randrange(10 ** 9):09d}' if business else None,
+            'deleted_at': self._when(rng, after=created_at) if rng.random() < 0.01 else None,
+            'unread_message_count': 0, 'created_at': created_at, 'updated_at': created_at,
+        }
+        if user['state']:
+            user['district'] = rng.choice(districts)
+        if business:
+            user['address'] = f'{rng.randint(1, 400)}, {rng.choice(WORDS).title()} Road, {user["district"]}'
+        rows[User].append(user)
+
+        search = {'role': user['role'], 'full_name': user['full_name'], 'tagline': user['tagline'],
+                  'bio': user['bio'], 'skills': [], 'projects': [], 'experiences': []}
+        for order in range(_count(rng, 1.5, 6)):
+            platform = rng.choice(PLATFORMS)
+            rows[SocialLink].append({'id': self._id(SocialLink), 'user_id': user_id, 'platform': platform,
+                                     'url': f'https://{platform}.example.com/{username}', 'order': order,
+                                     'label': 'Website' if platform == 'custom' else None, 'created_at': created_at})
+        for order in range(_count(rng, 2 if business else 1.5, 20)):
+            rows[GalleryImage].append({'id': self._id(GalleryImage), 'user_id': user_id,
+                                       'image_path': rng.choice(self.images), 'order': order,
+                                       'created_at': self._when(rng, after=created_at)})
+        if business:
+            self._business(rng, rows, user_id, created_at, username)
+        else:
+            self._individual(rng, rows, user_id, created_at, username, search)
+        self._messages(rng, rows, user)
+        self._stats(rng, rows, user_id)
+
+        document = people_search_document(search)
+        if document is not None and user['deleted_at'] is None:
+            rows[PeopleSearchDocument].append(dict(document, user_id=user_id, updated_at=created_at))
+
+    def _individual(self, rng, rows, user_id, created_at, username, search):
+        skills = {}
+        for name, category in rng.choices(SKILLS, SKILL_WEIGHTS, k=max(1, _count(rng, 8, 30))):
+            skills.setdefault(name, category)
+        for order, (name, category) in enumerate(skills.items()):
+            rows[Skill].append({'id': self._id(Skill), 'user_id': user_id, 'name': name, 'category': category,
+                                'experience_duration': f'{rng.randint(1, 8)} years' if rng.random() < 0.4 else None,
+                                'order': order, 'created_at': created_at})
+            search['skills'].append({'name': name, 'category': category})
+
+        for order in range(_count(rng, 3, 15)):
+            project_id = self._id(Project)
+            when = self._when(rng, after=created_at)
+            technologies = list(dict.fromkeys(rng.choices(TECHNOLOGIES, TECHNOLOGY_WEIGHTS, k=rng.randint(1, 6))))
+            project = {'id': project_id, 'user_id': user_id, 'title': _sentence(rng, 2, 4)[:-1].title(),
+                       'description': ' '.join(_sentence(rng, 8, 20) for _ in range(rng.randint(1, 3))),
+                       'live_demo_url': f'https://{username}-{order}.example.app' if rng.random() < 0.4 else None,
+                       'github_url': f'https://github.com/{username}/project-{order}' if rng.random() < 0.6 else None,
+                       'technologies': ', '.join(technologies), 'order': order, 'created_at': when,
+                       **self._video(rng, 0.1)}
+            rows[Project].append(project)
+            search['projects'].append(project)
+            for position, name in enumerate(technologies):
+                rows[ProjectTechnology].append({'project_id': project_id, 'order': position,
+                                                'technology_id': self.technology_ids[technology_key(name)]})
+            self._images(rng, rows, ProjectImage, 'project_id', project_id, _count(rng, 2, 6), when)
+            self._links(rng, rows, ProjectLink, 'project_id', project_id, _count(rng, 1, 4), f'{username}/p{order}')
+
+        for order in range(_count(rng, 2, 8)):
+            experience_id = self._id(Experience)
+            start = rng.randint(2010, 2025)
+            experience = {'id': experience_id, 'user_id': user_id, 'company_name': rng.choice(COMPANIES),
+                          'position': rng.choice(POSITIONS), 'description': _sentence(rng, 10, 30),
+                          'start_date': f'Jan {start}', 'end_date': 'Present' if order == 0 else f'Dec {start + 1}',
+                          'order': order, 'created_at': created_at, **self._video(rng, 0.03)}
+            rows[Experience].append(experience)
+            search['experiences'].append(experience)
+            self._images(rng, rows, ExperienceImage, 'experience_id', experience_id, _count(rng, 0.5, 3), created_at)
+            self._links(rng, rows, ExperienceLink, 'experience_id', experience_id, _count(rng, 0.5, 3),
+                        f'{username}/e{order}')
+
+        for order in range(rng.randint(1, 3)):
+            start = rng.randint(2005, 2022)
+            rows[Education].append({'id': self._id(Education), 'user_id': user_id,
+                                    'institute_name': rng.choice(INSTITUTES), 'course': rng.choice(COURSES),
+                                    'start_date': str(start), 'end_date': str(start + rng.randint(2, 4)),
+                                    'grade': f'{rng.uniform(6, 10):.1f} CGPA' if rng.random() < 0.5 else None,
+                                    'description': None, 'order': order, 'created_at': created_at})
+
+        for order in range(_count(rng, 1, 6)):
+            other_id = self._id(Other)
+            rows[Other].append({'id': other_id, 'user_id': user_id, 'title': _sentence(rng, 2, 5)[:-1].title(),
+                                'description': _sentence(rng, 6, 18), 'achieved_date': str(rng.randint(2012, 2025)),
+                                'order': order, 'created_at': created_at, **self._video(rng, 0.05)})
+            self._images(rng, rows, OtherImage, 'other_id', other_id, _count(rng, 0.5, 3), created_at)
+            self._links(rng, rows, OtherLink, 'other_id', other_id, _count(rng, 0.5, 3), f'{username}/o{order}')
+
+    def _business(self, rng, rows, user_id, created_at, username):
+        for order in range(1 + _count(rng, 4, 15)):
+            service_id = self._id(Service)
+            rows[Service].append({'id': service_id, 'user_id': user_id, 'title': _sentence(rng, 2, 4)[:-1].title(),
+                                  'description': _sentence(rng, 10, 30), 'category': rng.choice(BUSINESS_CATEGORIES),
+                                  'price_range': f'₹{rng.randint(1, 50) * 100} - ₹{rng.randint(51, 200) * 100}',
+                                  'order': order, 'created_at': created_at, **self._video(rng, 0.05)})
+            self._images(rng, rows, ServiceImage, 'service_id', service_id, 1 + _count(rng, 1, 4), created_at)
+
+        for order in range(_count(rng, 3, 12)):
+            work_id = self._id(PreviousWork)
+            rows[PreviousWork].append({'id': work_id, 'user_id': user_id, 'title': _sentence(rng, 2, 5)[:-1].title(),
+                                       'description': _sentence(rng, 8, 24), 'price_range': None, 'order': order,
+                                       'created_at': self._when(rng, after=created_at), **self._video(rng, 0.08)})
+            self._images(rng, rows, PreviousWorkImage, 'previous_work_id', work_id, _count(rng, 2, 5), created_at)
+            self._links(rng, rows, PreviousWorkLink, 'previous_work_id', work_id, _count(rng, 0.5, 3),
+                        f'{username}/w{order}')
+
+    def _messages(self, rng, rows, user):
+        # Heavy tail: most inboxes are nearly empty, a few popular profiles get hundreds
+        count = min(int(rng.paretovariate(1.2)) - 1, 500)
+        unread = 0
+        for _ in range(count):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            created_at = self._when(rng, after=user['created_at'])
+            is_read = rng.random() < 0.6
+            unread += not is_read
+            rows[Message].append({
+                'id': self._id(Message), 'recipient_id': user['id'], 'name': f'{first} {last}',
+                'email': f'{first}.{last}{rng.randrange(1000)}@example.com'.lower(),
+                'phone': f'9{rng.randrange(10 ** 9):09d}' if rng.random() < 0.5 else None,
+                'subject': _sentence(rng, 2, 6)[:-1], 'message': _sentence(rng, 8, 40), 'is_read': is_read,
+                'archived_at': self._when(rng, after=created_at) if is_read and rng.random() < 0.15 else None,
+                'created_at': created_at
+            })
+        user['unread_message_count'] = unread
+
+    def _stats(self, rng, rows, user_id):
+        if rng.random() >= 0.3:
+            return
+        today = self.as_of.date()
+        for day_offset in range(30):
+            day = today - timedelta(days=day_offset)
+            for source in dict.fromkeys(rng.choices(VIEW_SOURCES, VIEW_SOURCE_WEIGHTS, k=rng.randint(0, 3))):
+                rows[ProfileViewDaily].append({'user_id': user_id, 'day': day, 'source': source,
+                                               'views': max(1, int(rng.expovariate(1 / 6)))})
+        for link in rows[SocialLink][-3:]:
+            if link['user_id'] == user_id and rng.random() < 0.5:
+                rows[LinkClickDaily].append({'user_id': user_id, 'day': today - timedelta(days=rng.randrange(30)),
+                                             'kind': 'social', 'link_id': link['id'],
+                                             'clicks': rng.randint(1, 20)})
+
+def _next_ids(connection):
+    next_ids = {}
+    for model in TABLES + (Technology,):
+        id_column = model.__table__.c.get('id')
+        if id_column is not None:
+            next_ids[model] = (connection.execute(select(func.max(id_column))).scalar() or 0) + 1
+    return next_ids
+
+def _ensure_technologies(connection, as_of):
+    table = Technology.__table__
+    existing = dict(connection.execute(select(table.c.name_key, table.c.id)).all())
+    missing = [{'name': name, 'name_key': technology_key(name), 'created_at': as_of}
+               for name in TECHNOLOGIES if technology_key(name) not in existing]
+    if missing:
+        connection.execute(table.insert(), missing)
+    return dict(connection.execute(select(table.c.name_key, table.c.id)).all())
+
+def _reset_sequences(connection):
+    # Explicit ids leave PostgreSQL's serial sequences behind
+    for model in TABLES + (Technology,):
+        table = model.__table__
+        if 'id' in table.c:
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table.name}), 1))"
+            ))
+
+def seed_dataset(users, seed=42, batch_users=1000, as_of=None, images=None, log=print):
+    """
+    Insert `users` synthetic profiles with every dependent row, in batches
+
+    The same seed and as_of always produce the same rows (ids continue
+    after whatever the tables already hold, and usernames and emails end
+    in the user id, so seeding a database again adds more accounts
+    rather than colliding with the first run's). Rows go in with one
+    executemany per table per batch, bypassing the ORM session hooks;
+    directory_facets is recounted at the end and people_search_docs is
+    written directly, while profile snapshots are built on first view
+    (or by scripts/check_profile_snapshots.py). Every account's password
+    is SEED_PASSWORD.
+
+    Returns:
+        Dict of table name -> rows inserted
+    """
+    as_of = as_of or datetime(2026, 1, 1)
+    # Fixed salt, so reruns write identical rows; hashed once, as bcrypt per user would dominate the run
+    password_hash = bcrypt.hashpw(SEED_PASSWORD.encode('utf-8'), b'$2b$04$pehchaanseedsaltpehche').decode('utf-8')
+    totals = {model.__tablename__: 0 for model in TABLES}
+    started = time.perf_counter()
+
+    with db.engine.begin() as connection:
+        technology_ids = _ensure_technologies(connection, as_of)
+        next_ids = _next_ids(connection)
+    generator = _Generator(seed, as_of, next_ids, technology_ids, images or placeholder_paths(16), password_hash, _load_locations())
+
+    for start in range(0, users, batch_users):
+        rows = {model: [] for model in TABLES}
+        for n in range(start, min(start + batch_users, users)):
+            generator.user(n, rows)
+        with db.engine.begin() as connection:
+            for model in TABLES:
+                if rows[model]:
+                    connection.execute(model.__table__.insert(), rows[model])
+                    totals[model.__tablename__] += len(rows[model])
+        inserted = sum(totals.values())
+        elapsed = time.perf_counter() - started
+        log(f"  {min(start + batch_users, users)}/{users} users, {inserted} rows, "
+            f"{elapsed:.0f}s ({inserted / elapsed:.0f} rows/s)")
+
+    with db.engine.begin() as connection:
+        totals['directory_facets'] = rebuild_directory_facets(connection)
+        if connection.dialect.name == 'postgresql':
+            _reset_sequences(connection)
+    return totals
@@ -0,0 +1,164 @@
+import hashlib
+import json
+from sqlalchemy.orm import selectinload
+from models import (
+    Skill, SocialLink, Project, Experience, Education, GalleryImage,
+    Other, Service, PreviousWork
+)
+
+def serialize_links(links):
+    """Serialize proof links (label/url pairs)"""
+    return [{'label': link.label, 'url': link.url} for link in links]
+
+def serialize_images(images):
+    """Serialize attached images as upload-relative paths"""
+    return [{'id': img.id, 'image_path': img.image_path} for img in images]
+
+def serialize_skill(skill):
+    """Serialize a skill"""
+    return {
+        'id': skill.id,
+        'name': skill.name,
+        'category': skill.category or '',
+        'order': skill.order
+    }
+
+def serialize_social_link(link):
+    """Serialize a social link"""
+    return {
+        'id': link.id,
+        'platform': link.platform,
+        'url': link.url,
+        'label': link.label or '',
+        'order': link.order
+    }
+
+def serialize_project(project):
+    """Serialize a project with its images and links"""
+    return {
+        'id': project.id,
+        'title': project.title,
+        'description': project.description,
+        'demo_url': project.live_demo_url or '',
+        'github_url': project.github_url or '',
+        'youtube_url': project.youtube_url or '',
+        'technologies': project.technologies or '',
+        'images': serialize_images(project.images),
+        'links': serialize_links(project.links)
+    }
+
+def serialize_experience(exp):
+    """Serialize an experience with its images and links"""
+    return {
+        'id': exp.id,
+        'company_name': exp.company_name,
+        'position': exp.position,
+        'description': exp.description or '',
+        'start_date': exp.start_date or '',
+        'end_date': exp.end_date or 'Present',
+        'youtube_url': exp.youtube_url or '',
+        'images': serialize_images(exp.images),
+        'links': serialize_links(exp.links)
+    }
+
+def serialize_education(edu):
+    """Serialize an education entry"""
+    return {
+        'id': edu.id,
+        'institute_name': edu.institute_name,
+        'course': edu.course,
+        'start_date': edu.start_date or '',
+        'end_date': edu.end_date or 'Present',
+        'grade': edu.grade or '',
+        'description': edu.description or ''
+    }
+
+def serialize_gallery_image(image):
+    """Serialize a gallery image"""
+    return {
+        'id': image.id,
+        'image_path': image.image_path,
+        'order': image.order
+    }
+
+def serialize_other(item):
+    """Serialize an achievement with its images and links"""
+    return {
+        'id': item.id,
+        'title': item.title,
+        'description': item.description or '',
+        'achieved_date': item.achieved_date or '',
+        'youtube_url': item.youtube_url or '',
+        'images': serialize_images(item.images),
+        'links': serialize_links(item.links)
+    }
+
+def serialize_service(service):
+    """Serialize a service with its images"""
+    return {
+        'id': service.id,
+        'title': service.title,
+        'description': service.description,
+        'category': service.category or '',
+        'price_range': service.price_range or '',
+        'youtube_url': service.youtube_url or '',
+        'images': serialize_images(service.images)
+    }
+
+def serialize_previous_work(work):
+    """Serialize a previous work item with its images and links"""
+    return {
+        'id': work.id,
+        'title': work.title,
+        'description': work.description or '',
+        'price_range': work.price_range or '',
+        'youtube_url': work.youtube_url or '',
+        'images': serialize_images(work.images),
+        'links': serialize_links(work.links)
+    }
+
+def build_dashboard_snapshot(user):
+    """
+    Collect every dashboard section of a user in one payload
+
+    Each section is fetched with a single query and its child collections
+    with one selectinload query each, so the total query count is fixed
+    no matter how many items the user has.
+
+    Args:
+        user: User whose sections are collected
+
+    Returns:
+        Dict keyed by section name
+    """
+    def section(model, *children):
+        query = model.query.filter_by(user_id=user.id)
+        if children:
+            query = query.options(*[selectinload(child) for child in children])
+        return query.order_by(model.order, model.id).all()
+
+    return {
+        'user': {
+            'id': user.id,
+            'username': user.username,
+            'role': user.role,
+            'full_name': user.full_name or '',
+            'profile_tag': user.profile_tag or '',
+            'tagline': user.tagline or '',
+            'bio': user.bio or ''
+        },
+        'skills': [serialize_skill(s) for s in section(Skill)],
+        'social_links': [serialize_social_link(l) for l in section(SocialLink)],
+        'projects': [serialize_project(p) for p in section(Project, Project.images, Project.links)],
+        'experiences': [serialize_experience(e) for e in section(Experience, Experience.images, Experience.links)],
+        'education': [serialize_education(e) for e in section(Education)],
+        'gallery': [serialize_gallery_image(g) for g in section(GalleryImage)],
+        'others': [serialize_other(o) for o in section(Other, Other.images, Other.links)],
+        'services': [serialize_service(s) for s in section(Service, Service.images)],
+        'previous_works': [serialize_previous_work(w) for w in section(PreviousWork, PreviousWork.images, PreviousWork.links)]
+    }
+
+def snapshot_etag(snapshot):
+    """Stable content hash of a snapshot, used as its ETag"""
+    encoded = json.dumps(snapshot, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
@@ -0,0 +1,115 @@
+from sqlalchemy import func, select
+from utils.database import dialect_insert
+from models import db, User, Project, Technology, ProjectTechnology
+
+MAX_TECHNOLOGIES = 20
+MAX_NAME_LENGTH = 50
+
+# Project.technologies (the display copy) is a String(255)
+MAX_DISPLAY_LENGTH = 255
+
+def technology_key(name):
+    """Case- and whitespace-insensitive identity of a technology name"""
+    return ' '.join(name.split()).lower()
+
+def parse_technologies(raw):
+    """
+    Split a comma-separated input into clean, de-duplicated technology names
+
+    Keeps the first spelling of each name and the user's order, and drops
+    names once the list would no longer fit Project.technologies.
+    """
+    names, seen, length = [], set(), 0
+    for part in (raw or '').split(','):
+        name = ' '.join(part.split())[:MAX_NAME_LENGTH]
+        key = technology_key(name)
+        if not key or key in seen:
+            continue
+        length += len(name) + (2 if names else 0)
+        if len(names) >= MAX_TECHNOLOGIES or length > MAX_DISPLAY_LENGTH:
+            break
+        seen.add(key)
+        names.append(name)
+    return names
+
+def ensure_technologies(executor, names):
+    """
+    Get or create the tags for names
+
+    Works on a Session or a Core Connection; concurrent creators of the same
+    tag are resolved by the unique name_key.
+
+    Returns:
+        Dict of technology_key(name) -> technology id
+    """
+    wanted = {technology_key(name): name for name in names}
+    if not wanted:
+        return {}
+
+    table = Technology.__table__
+    lookup = select(table.c.name_key, table.c.id).where(table.c.name_key.in_(wanted))
+    ids = dict(executor.execute(lookup).all())
+    missing = [{'name': name, 'name_key': key} for key, name in wanted.items() if key not in ids]
+    if not missing:
+        return ids
+
+    insert = dialect_insert(executor)
+    if insert is not None:
+        executor.execute(insert(table).on_conflict_do_nothing(index_elements=[table.c.name_key]), missing)
+    else:
+        executor.execute(table.insert(), missing)
+    return dict(executor.execute(lookup).all())
+
+def set_project_technologies(project, raw):
+    """
+    Replace a project's tags with those in a comma-separated input
+
+    Only the difference is written: tags that stay keep their rows (their
+    order is updated if it changed), removed tags are deleted and new ones
+    inserted. Also refreshes the Project.technologies display copy.
+    """
+    names = parse_technologies(raw)
+    ids = ensure_technologies(db.session, names)
+    wanted = [ids[technology_key(name)] for name in names]
+
+    current = {link.technology_id: link for link in project.technology_links}
+    for technology_id, link in current.items():
+        if technology_id not in wanted:
+            project.technology_links.remove(link)
+    for order, technology_id in enumerate(wanted):
+        link = current.get(technology_id)
+        if link is None:
+            project.technology_links.append(ProjectTechnology(technology_id=technology_id, order=order))
+        elif link.order != order:
+            link.order = order
+
+    project.technologies = ', '.join(names) or None
+    return names
+
+def technology_counts(prefix=None, limit=50):
+    """Most used technologies as [(name, project count)], optionally filtered by name prefix"""
+    counts = select(ProjectTechnology.technology_id, func.count().label('projects')) \
+        .group_by(ProjectTechnology.technology_id).subquery()
+    query = select(Technology.name, counts.c.projects) \
+        .join(counts, counts.c.technology_id == Technology.id) \
+        .order_by(counts.c.projects.desc(), Technology.name_key).limit(limit)
+    if prefix:
+        query = query.where(Technology.name_key.startswith(technology_key(prefix), autoescape=True))
+    return db.session.execute(query).all()
+
+def users_with_technology(name, limit=50, after_id=0):
+    """
+    Active users with at least one project tagged name, ordered by id
+
+    Pass the last id of the previous page as after_id for the next page.
+    """
+    technology_id = db.session.scalar(select(Technology.id).where(Technology.name_key == technology_key(name)))
+    if technology_id is None:
+        return []
+    user_ids = select(Project.user_id) \
+        .join(ProjectTechnology, ProjectTechnology.project_id == Project.id) \
+        .where(ProjectTechnology.technology_id == technology_id)
+    return db.session.scalars(
+        select(User).where(User.id.in_(user_ids), User.id > after_id, User.deleted_at.is_(None))
+        .order_by(User.id).limit(limit)
+    ).all()
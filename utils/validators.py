@@ -1,23 +1,11 @@
 import re
 from wtforms.validators import ValidationError
+from utils.media import parse_video_url
 
 def validate_youtube_url(url):
     """Extract YouTube video ID from URL"""
-    if not url:
-        return None
-    
-    # Patterns for different YouTube URL formats
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/)([a-zA-Z0-9_-]{11})',
-        r'youtube\.com\/embed\/([a-zA-Z0-9_-]{11})',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    
-    return None
+    provider, video_id = parse_video_url(url)
+    return video_id if provider == 'youtube' else None
 
 def validate_phone_number(phone):
     """Validate phone number format (Indian + international)"""
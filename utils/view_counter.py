@@ -0,0 +1,142 @@
+import re
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+from utils.counters import BatchFlusher, upsert_increments
+
+# Query parameter the generated QR codes add to the profile URL (?ref=qr)
+QR_REFERRAL_PARAM = 'ref'
+QR_REFERRAL_VALUE = 'qr'
+
+# Referrer buckets stored in profile_view_daily.source
+VIEW_SOURCES = ('qr', 'direct', 'search', 'social', 'internal', 'other')
+
+_SEARCH_HOSTS = ('google.', 'bing.com', 'duckduckgo.com', 'yahoo.', 'yandex.', 'ecosia.org', 'baidu.com')
+_SOCIAL_HOSTS = ('linkedin.com', 'lnkd.in', 'twitter.com', 'x.com', 't.co', 'facebook.com', 'fb.me',
+                 'instagram.com', 'whatsapp.com', 'wa.me', 'reddit.com', 'youtube.com', 't.me', 'github.com')
+
+_BOT_PATTERN = re.compile(r'bot|crawl|spider|slurp|preview|fetch|monitor|curl|wget|python-requests', re.IGNORECASE)
+
+def _host_matches(host, domains):
+    return any(host == d or host.endswith('.' + d) or (d.endswith('.') and d in host) for d in domains)
+
+def classify_view_source(args, referrer, own_host):
+    """Referrer bucket of a profile hit from its query string and Referer header"""
+    if args.get(QR_REFERRAL_PARAM) == QR_REFERRAL_VALUE:
+        return 'qr'
+    if not referrer:
+        return 'direct'
+    host = (urlsplit(referrer).hostname or '').lower()
+    if not host:
+        return 'direct'
+    if host == (own_host or '').split(':')[0].lower():
+        return 'internal'
+    if _host_matches(host, _SEARCH_HOSTS):
+        return 'search'
+    if _host_matches(host, _SOCIAL_HOSTS):
+        return 'social'
+    return 'other'
+
+def is_bot(user_agent):
+    """Crawlers and link unfurlers should not count as profile views"""
+    return not user_agent or bool(_BOT_PATTERN.search(user_agent))
+
+class ProfileViewCounter(BatchFlusher):
+    """
+    Per-process profile view counters with a periodic batched flush
+
+    record() only increments an in-memory Counter keyed by (user, UTC day,
+    source), so a profile hit never writes to the database. A background
+    thread swaps the counter out every VIEW_COUNTER_FLUSH_INTERVAL seconds
+    (or once VIEW_COUNTER_MAX_PENDING keys are waiting) and adds it to the
+    profile_view_daily aggregates in one executemany upsert. A failed flush
+    puts its counts back for the next attempt; counts still in memory when
+    a worker is killed are lost, which is acceptable for view statistics.
+    """
+
+    thread_name = 'profile-view-flusher'
+
+    def __init__(self, app=None):
+        super().__init__()
+        self.max_pending = 5000
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_pending = app.config.get('VIEW_COUNTER_MAX_PENDING', 5000)
+        self._start(app, app.config.get('VIEW_COUNTER_ENABLED', True),
+                    app.config.get('VIEW_COUNTER_FLUSH_INTERVAL', 30.0))
+
+    def record(self, user_id, source, when=None):
+        """Count one view of user_id's profile"""
+        day = (when or datetime.utcnow()).date()
+        with self._lock:
+            if self._forked():
+                # Counts copied into a forked child belong to the parent
+                self._counts = Counter()
+            self._counts[(user_id, day, source)] += 1
+            if len(self._counts) >= self.max_pending:
+                self._wakeup.set()
+
+    def pending(self):
+        with self._lock:
+            return sum(self._counts.values())
+
+    def _flush_pending(self):
+        from models import db, ProfileViewDaily
+
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        if not counts:
+            return 0
+        rows = [{'user_id': user_id, 'day': day, 'source': source, 'views': views}
+                for (user_id, day, source), views in sorted(counts.items())]
+        try:
+            with self.app.app_context():
+                try:
+                    upsert_increments(db.session, ProfileViewDaily.__table__, rows,
+                                      ('user_id', 'day', 'source'), 'views')
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+                finally:
+                    db.session.remove()
+        except Exception:
+            with self._lock:
+                self._counts.update(counts)
+            raise
+        return sum(counts.values())
+
+def profile_view_stats(user_id, days=30, today=None):
+    """
+    View totals of one profile over the last `days` days, from the daily aggregates
+
+    Returns:
+        Dict with total, by_source and a zero-filled per-day series (oldest first)
+    """
+    from models import db, ProfileViewDaily
+
+    today = today or datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    rows = db.session.execute(
+        db.select(ProfileViewDaily.day, ProfileViewDaily.source, ProfileViewDaily.views)
+        .where(ProfileViewDaily.user_id == user_id, ProfileViewDaily.day >= start)
+    ).all()
+
+    per_day = Counter()
+    by_source = Counter({source: 0 for source in VIEW_SOURCES})
+    for day, source, views in rows:
+        per_day[day] += views
+        by_source[source] += views
+
+    return {
+        'days': days,
+        'total': sum(by_source.values()),
+        'by_source': dict(by_source),
+        'daily': [{'day': (start + timedelta(days=n)).isoformat(), 'views': per_day[start + timedelta(days=n)]}
+                  for n in range(days)]
+    }